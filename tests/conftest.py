@@ -0,0 +1,6 @@
+import pytest
+from vts_core.synthetic import write_grid_zone
+
+@pytest.fixture
+def grid_zone(tmp_path):
+    return write_grid_zone(tmp_path / "zones" / "T_Zone")
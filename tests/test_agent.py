@@ -53,4 +53,41 @@ def test_agent_lifecycle(mock_store, mock_vehicle):
         date="2023-01-01", 
         device_id="DEV01"
     )
-    assert "2023-01-01" in outfile
\ No newline at end of file
+    assert "2023-01-01" in outfile
+
+def test_fast_forward_emits_the_same_records(tmp_path):
+    import random
+    from datetime import timedelta
+    config = VehicleConfig(imei="1", name="T", device_id="D", zone_id="Z", type="V",
+                           depot_location=(0.0, 0.0), max_speed_knots=25.0, sampling_interval_seconds=25)
+    route = LineString([(0, 0), (0, 0.03), (0.02, 0.03)])
+    stops = [{"at_meter": 1200.0, "duration_min": 20, "duration_max": 40, "type": "WORK"},
+             {"at_meter": 3000.0, "duration_min": 5, "duration_max": 15, "type": "TRANSIT"}]
+    day = datetime(2023, 1, 1)
+    events = [{"timestamp": day + timedelta(hours=6, minutes=3), "lat": 0.001, "lon": 0.0},
+              {"timestamp": day + timedelta(hours=9, minutes=20, seconds=7), "lat": 0.01, "lon": 0.0},
+              {"timestamp": day + timedelta(hours=21), "lat": 0.03, "lon": 0.02}]
+
+    runs = []
+    for fast in (False, True):
+        agent = VehicleAgent(config, SimulationStore(base_dir=str(tmp_path / str(fast)), enable_legacy_logs=False))
+        agent.rng = random.Random(4)
+        agent.record_trajectory = True
+        agent.fast_forward = fast
+        agent.start_24h_cycle("2023-01-01", route, 8, 18, stops=[dict(s) for s in stops], external_events=events)
+        ticks = 0
+        while agent.is_active:
+            agent.tick()
+            ticks += 1
+        runs.append((agent.telemetry_buffer, agent.trajectory_knots, ticks, agent.day_stats()))
+
+    (slow_records, slow_knots, slow_ticks, slow_stats), (fast_records, fast_knots, fast_ticks, fast_stats) = runs
+    assert fast_records == slow_records
+    assert fast_knots == slow_knots
+    assert fast_ticks < slow_ticks / 5
+
+    # Event counters replace the per-event prints
+    assert fast_stats == slow_stats
+    assert fast_stats["stops"] == 2 and fast_stats["checkpoints"] == 3
+    assert fast_stats["records"] == len(fast_records)
+    assert fast_stats["driving_s"] > 0 and fast_stats["km"] > 0
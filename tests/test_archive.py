@@ -0,0 +1,59 @@
+import gzip
+import multiprocessing as mp
+from vts_core.store import SimulationStore
+from vts_core.synthetic import telemetry_records
+from vts_core.sinks import make_batch, build_sinks, format_nmea_lines
+from vts_core.archive import TrackerArchive, archive_path, extract_day, compact_archive, append_days
+
+def test_archive_round_trip(tmp_path):
+    store = SimulationStore(base_dir=str(tmp_path), sinks=build_sinks("parquet,archive?codec=gzip", tmp_path))
+    plain = {}
+    for i, day in enumerate(["2023-01-02", "2023-01-03", "2023-02-01"]):
+        records = telemetry_records(120, day, seed=i, interval_s=97) # Spans several hours
+        store.write_telemetry("123456789012345", day, records, vehicle_name="V01")
+        plain[day] = "".join(store._format_log_line(r, "123456789012345") + "\n" for r in records)
+    store.close()
+    assert not (tmp_path / "tracker/V01/2023/01").exists() # No plain day files
+    archive = archive_path(tmp_path / "tracker", "V01", "2023-01-02", "gzip")
+    assert TrackerArchive(archive).days() == ["2023-01-02", "2023-01-03"]
+    for day, text in plain.items():
+        assert extract_day(tmp_path / "tracker", "V01", day) == text
+    # 120 points 97 s apart from 07:00 cover hours 07-10
+    eight = extract_day(tmp_path / "tracker", "V01", "2023-01-03", hours=[8])
+    assert eight and all(line.split(",")[2][6:8] == "08" for line in eight.splitlines())
+    assert extract_day(tmp_path / "tracker", "V01", "2023-01-03", hours=[7, 8, 9, 10]) == plain["2023-01-03"]
+    # Independent gzip members: the whole archive reads like the concatenated days
+    assert gzip.decompress(archive.read_bytes()).decode() == plain["2023-01-02"] + plain["2023-01-03"]
+    assert extract_day(tmp_path / "tracker", "V01", "2023-01-04") is None
+
+def test_rewritten_day_and_compact(tmp_path):
+    archive = archive_path(tmp_path, "V01", "2023-01-02", "gzip")
+    old = format_nmea_lines(make_batch("1", "2023-01-02", telemetry_records(50), "V01").frame, "1")
+    new = format_nmea_lines(make_batch("1", "2023-01-02", telemetry_records(60, seed=5), "V01").frame, "1")
+    append_days(archive, {"2023-01-02": [l + "\n" for l in old]}, "gzip")
+    append_days(archive, {"2023-01-02": [l + "\n" for l in new]}, "gzip")
+    assert TrackerArchive(archive).read_day("2023-01-02").splitlines() == new
+    assert compact_archive(archive) > 0
+    assert TrackerArchive(archive).read_day("2023-01-02").splitlines() == new
+    assert gzip.decompress(archive.read_bytes()).decode().splitlines() == new
+
+def _append_many(archive, worker, days):
+    for d in range(1, days + 1):
+        append_days(archive, {f"2023-01-{d:02d}": [f"imei:{worker},tracker,2301{d:02d}0700{i:02d},,F;\n" for i in range(40)]}, "gzip", 1)
+
+def test_concurrent_writers(tmp_path):
+    # Two processes writing the same vehicle-month (e.g. the _A/_B configs of one vehicle)
+    archive = archive_path(tmp_path, "V01", "2023-01-01", "gzip")
+    ctx = mp.get_context("spawn")
+    procs = [ctx.Process(target=_append_many, args=(archive, w, 25)) for w in (1, 2)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(60)
+        assert p.exitcode == 0
+    reader = TrackerArchive(archive)
+    assert len(reader.days()) == 25
+    for day in reader.days():
+        lines = reader.read_day(day).splitlines()
+        assert len(lines) == 40 and len({l.split(",")[0] for l in lines}) == 1 # One writer's frame, intact
+    assert len(gzip.decompress(archive.read_bytes()).decode().splitlines()) == 2 * 25 * 40
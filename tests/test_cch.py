@@ -0,0 +1,29 @@
+import random
+import networkx as nx
+from vts_core.graph import RoadNetwork
+from vts_core.cch import CCHIndex, PerturbedNetwork
+
+def test_cch_matches_dijkstra_under_custom_metrics(grid_zone):
+    network = RoadNetwork(str(grid_zone / "roads.geojson"))
+    cch = CCHIndex(network)
+    rng = random.Random(7)
+    
+    for _ in range(3):
+        factors = [rng.uniform(0.5, 2.0) for _ in range(len(cch.base_weight))]
+        metric = cch.customise(cch.base_weight * factors)
+        g = nx.Graph()
+        for a, b, w in zip(cch.road_u.tolist(), cch.road_v.tolist(), (cch.base_weight * factors).tolist()):
+            g.add_edge(cch.nodes[a], cch.nodes[b], weight=w)
+        for _ in range(30):
+            s, t = rng.sample(network.node_list, 2)
+            path = metric.path_nodes(s, t)
+            assert path[0] == s and path[-1] == t
+            assert abs(nx.path_weight(g, path, "weight") - nx.shortest_path_length(g, s, t, weight="weight")) < 1e-6
+
+def test_perturbed_network_is_seeded(grid_zone):
+    network = RoadNetwork(str(grid_zone / "roads.geojson"))
+    s, t = network.node_list[0], network.node_list[-1]
+    p1 = PerturbedNetwork(network, random.Random(1)).shortest_path_nodes(s, t)
+    p2 = PerturbedNetwork(network, random.Random(1)).shortest_path_nodes(s, t)
+    assert p1 == p2
+    assert PerturbedNetwork(network, random.Random(1)).node_list is network.node_list
@@ -0,0 +1,79 @@
+import json
+import networkx as nx
+from vts_core.city import build_city_graph, save_city_graph, CityNetwork
+from tests.conftest import write_grid_zone
+
+def test_merged_city_graph_cross_zone_paths(tmp_path):
+    # B's first grid column lies on A's last one: shared nodes, duplicated roads
+    a = write_grid_zone(tmp_path / "A_Zone", origin=(77.60, 12.90))
+    b = write_grid_zone(tmp_path / "B_Zone", origin=(77.61, 12.90))
+    arrays = build_city_graph({"A_Zone": str(a / "roads.geojson"), "B_Zone": str(b / "roads.geojson")})
+    city = CityNetwork(save_city_graph(arrays, str(tmp_path / "city" / "city_graph.npz")))
+    
+    assert city.partitions == ["A_Zone", "B_Zone"]
+    assert len(city.node_list) == 6 * 11
+    assert len(arrays["edge_u"]) == 2 * 6 * 5 * 2 - 5 # duplicated border column dropped
+    assert len(arrays["sc_u"]) > 0
+    
+    west = city._get_nearest_node((12.90, 77.60))
+    east = city._get_nearest_node((12.91, 77.62))
+    assert city.partition_of(west) == 0 and city.partition_of(east) == 1
+    
+    path = city.shortest_path_nodes(west, east)
+    assert path[0] == west and path[-1] == east
+    assert all(city.graph.has_edge(u, v) for u, v in zip(path, path[1:]))
+    assert abs(nx.path_weight(city.graph, path, "weight") -
+               nx.shortest_path_length(city.graph, west, east, weight="weight")) < 1e-6
+    
+    coords, _ = city.assemble_path(path)
+    assert len(coords) > len(path)
+    
+    # Zone views sample only their own nodes but route across the city
+    view = city.zone_view("B_Zone")
+    assert all(city.partition_of(n) == 1 for n in view.node_list)
+    assert view.shortest_path_nodes(east, west)[-1] == west
+
+def _write_detour_zones(tmp_path):
+    """
+    Three zones in a row: the middle one joins its two boundary nodes by a direct
+    residential road and by a longer but faster primary-road detour.
+    """
+    roads = {"A_Zone": [((77.600, 12.900), (77.610, 12.900), "residential"),
+                        ((77.600, 12.900), (77.605, 12.903), "primary"), ((77.605, 12.903), (77.610, 12.900), "primary")],
+             "B_Zone": [((77.590, 12.900), (77.595, 12.900), "residential"), ((77.595, 12.900), (77.600, 12.900), "residential")],
+             "C_Zone": [((77.610, 12.900), (77.615, 12.900), "residential"), ((77.615, 12.900), (77.620, 12.900), "residential")]}
+    zones = {}
+    for zone, lines in roads.items():
+        features = [{"type": "Feature", "properties": {"highway": cls},
+                     "geometry": {"type": "LineString", "coordinates": [list(a), list(b)]}} for a, b, cls in lines]
+        (tmp_path / zone).mkdir()
+        (tmp_path / zone / "roads.geojson").write_text(json.dumps({"type": "FeatureCollection", "features": features}))
+        zones[zone] = str(tmp_path / zone / "roads.geojson")
+    return zones
+
+def _assert_exact(city, s, t):
+    for attr in ("weight", "time"):
+        path = city.shortest_path_nodes(s, t, weight=attr, attr=attr)
+        assert path[0] == s and path[-1] == t
+        assert abs(nx.path_weight(city.graph, path, attr) - nx.shortest_path_length(city.graph, s, t, weight=attr)) < 1e-6
+
+def test_overlay_queries_are_exact_and_leave_the_overlay_alone(tmp_path):
+    zones = {}
+    for i, x in enumerate((77.60, 77.61, 77.62)):
+        zones[f"Z{i}_Zone"] = str(write_grid_zone(tmp_path / f"Z{i}_Zone", origin=(x, 12.90)) / "roads.geojson")
+    city = CityNetwork(save_city_graph(build_city_graph(zones), str(tmp_path / "city_graph.npz")))
+    overlay_size = (city.overlay.number_of_nodes(), city.overlay.number_of_edges())
+    boundary = [n for n in city.node_list if n in city.overlay]
+    inner = [n for n in city.node_list if n not in city.overlay]
+    for s, t in [(inner[0], inner[-1]), (inner[-1], inner[0]), (boundary[0], inner[-1]), (inner[0], boundary[-1])]:
+        if city.partition_of(s) != city.partition_of(t):
+            _assert_exact(city, s, t)
+    assert (city.overlay.number_of_nodes(), city.overlay.number_of_edges()) == overlay_size
+
+    # Shortest and fastest shortcuts differ: the detour is longer but quicker
+    city = CityNetwork(save_city_graph(build_city_graph(_write_detour_zones(tmp_path)), str(tmp_path / "detour.npz")))
+    west, east = city._get_nearest_node((12.900, 77.590)), city._get_nearest_node((12.900, 77.620))
+    assert (city.partition_of(west), city.partition_of(east)) == (1, 2)
+    _assert_exact(city, west, east)
+    _assert_exact(city, east, west)
+    assert len(city.shortest_path_nodes(west, east, weight="time", attr="time")) == 7 # Through the detour's middle node
@@ -0,0 +1,56 @@
+import json
+import random
+import numpy as np
+from shapely.geometry import LineString
+from vts_core.config import VehicleConfig
+from vts_core.agent import VehicleAgent
+from vts_core.store import SimulationStore
+from vts_core.congestion import (load_congestion_config, build_congestion_table, BIN_SECONDS, BINS_PER_DAY,
+                                 DEFAULT_CURVES)
+
+def test_day_tables_are_seeded_smooth_and_peaked(tmp_path):
+    config = load_congestion_config(str(tmp_path))
+    table = build_congestion_table(config, "T_Zone", "2023-03-02")
+    assert table.factors.shape == (3, BINS_PER_DAY) and table.factors.dtype == np.float32
+
+    same = build_congestion_table(config, "T_Zone", "2023-03-02")
+    other = build_congestion_table(config, "T_Zone", "2023-03-03")
+    assert np.array_equal(table.factors, same.factors)
+    assert not np.array_equal(table.factors, other.factors)
+
+    # No jumps between 5-minute bins; the morning peak is slower than the night
+    assert np.abs(np.diff(table.factors, axis=1)).max() < 0.05
+    arterial = table.factors[0]
+    assert arterial[int(9.5 * 3600) // BIN_SECONDS] < arterial[3 * 3600 // BIN_SECONDS] - 0.2
+
+def test_scalar_and_vectorised_lookups_agree(tmp_path):
+    table = build_congestion_table(load_congestion_config(str(tmp_path)), "T_Zone", "2023-03-04")
+    rng = random.Random(1)
+    groups = [rng.randrange(3) for _ in range(500)]
+    times = [rng.uniform(0, 86400) for _ in range(500)] + [0, 86399]
+    groups += [0, 2]
+    assert np.allclose(table.factors_at(groups, times), [table.factor(g, t) for g, t in zip(groups, times)])
+    # Interpolation hits the stored value at every bin centre
+    centres = (np.arange(BINS_PER_DAY) + 0.5) * BIN_SECONDS
+    assert np.allclose(table.factors_at(1, centres), table.factors[1])
+
+def test_zone_override_file(tmp_path):
+    (tmp_path / "congestion.json").write_text(json.dumps({"curves": {"local": {"base": 0.5, "peaks": []}}, "noise": 0.0}))
+    config = load_congestion_config(str(tmp_path))
+    assert config["curves"]["arterial"] == DEFAULT_CURVES["arterial"]
+    table = build_congestion_table(config, "T_Zone", "2023-03-02")
+    assert np.allclose(table.factors[2], 0.5)
+
+def test_agent_drives_at_the_table_speed(tmp_path):
+    config = VehicleConfig(imei="1", name="T", device_id="D", zone_id="Z", type="V",
+                           depot_location=(0.0, 0.0), max_speed_knots=25.0)
+    agent = VehicleAgent(config, SimulationStore(base_dir=str(tmp_path), enable_legacy_logs=False))
+    agent.rng = random.Random(7)
+    table = build_congestion_table(load_congestion_config(str(tmp_path)), "T_Zone", "2023-03-02")
+    agent.start_24h_cycle("2023-01-01", LineString([(0, 0), (0, 0.05)]), 8, 18,
+                          speed_profile=[[2000.0, 40.0, 0], [5600.0, 20.0, 2]], road_caps=False, congestion=table)
+    while agent.t < 8 * 3600 + 60:
+        agent.tick()
+    assert agent.state == "DRIVING"
+    expected = 25.0 * table.factor(0, agent.t) * agent.driver_factor
+    assert abs(agent.current_speed - expected) < 1e-9
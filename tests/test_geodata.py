@@ -0,0 +1,24 @@
+import json
+import numpy as np
+from shapely.geometry import shape
+from vts_core.geodata import load_roads, load_localities
+
+def test_roads_and_localities_match_shapely(grid_zone):
+    roads_path = grid_zone / "roads.geojson"
+    feats = json.loads(roads_path.read_text())["features"]
+    roads = load_roads(str(roads_path))
+    
+    assert len(roads) == len(feats)
+    for i in (0, 1, len(feats) - 1):
+        geom = shape(feats[i]["geometry"])
+        assert roads.coords[roads.offsets[i]:roads.offsets[i + 1]].tolist() == [list(c) for c in geom.coords]
+        assert roads.lengths[i] == geom.length
+    assert roads.properties[0]["highway"] == feats[0]["properties"]["highway"]
+    
+    locs_path = grid_zone / "localities.geojson"
+    locs = load_localities(str(locs_path))
+    expected = [shape(f["geometry"]).centroid for f in json.loads(locs_path.read_text())["features"]]
+    assert locs.ids == ["T_LOC_01", "T_LOC_02", "T_LOC_03", "T_LOC_04"]
+    assert np.allclose(locs.lon, [c.x for c in expected]) and np.allclose(locs.lat, [c.y for c in expected])
+    
+    assert len(load_localities(str(grid_zone / "missing.geojson"))) == 0
@@ -0,0 +1,41 @@
+import pandas as pd
+from vts_core.golden import parse_options, run_cases, compare_outputs, format_report
+from vts_core.synthetic import write_vehicle_yaml
+
+def _run(grid_zone, tmp_path, name):
+    vehicle = write_vehicle_yaml(tmp_path / "V01.yaml", "GOLD_V01", 900000000000007, grid_zone, (12.904, 77.604))
+    out = tmp_path / name
+    drove = run_cases([(str(vehicle), str(grid_zone / "roads.geojson"), "2023-03-15")], str(out))
+    assert drove == 1
+    return out
+
+def test_same_configuration_is_identical(grid_zone, tmp_path):
+    a, b = _run(grid_zone, tmp_path, "a"), _run(grid_zone, tmp_path, "b")
+    report = compare_outputs(str(a), str(b))
+    assert report["ok"] and {f["kind"] for f in report["files"]} == {"parquet", "text"}
+    assert all(f["status"] == "identical" for f in report["files"])
+
+def test_column_and_text_differences_honour_tolerances(grid_zone, tmp_path):
+    a, b = _run(grid_zone, tmp_path, "a"), _run(grid_zone, tmp_path, "b")
+    parquet = next(b.glob("telemetry/**/*.parquet"))
+    df = pd.read_parquet(parquet)
+    df.loc[2, "lat"] += 1e-8
+    df.to_parquet(parquet, index=False)
+    tracker = next(b.glob("tracker/**/*.txt"))
+    lines = tracker.read_text().splitlines()
+    fields = lines[0].split(",")
+    fields[-2] = f"{float(fields[-2]) + 0.01:.2f}" # Speed field
+    tracker.write_text("\n".join([",".join(fields)] + lines[1:]) + "\n")
+
+    report = compare_outputs(str(a), str(b))
+    assert not report["ok"]
+    lat = next(c for f in report["files"] if f["kind"] == "parquet" for c in f["columns"])
+    assert (lat["column"], lat["mismatches"], lat["first_row"]) == ("lat", 1, 2)
+    assert "lat" in format_report(report) and "line 1" in format_report(report)
+
+    report = compare_outputs(str(a), str(b), tolerances={"lat": 1e-6}, text_tolerance=0.05)
+    assert report["ok"], format_report(report)
+
+def test_parse_options():
+    options = parse_options("router=cch, route_entropy=0.25,travel_time=true")
+    assert (options.router, options.route_entropy, options.travel_time, options.congestion) == ("cch", 0.25, True, False)
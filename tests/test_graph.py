@@ -0,0 +1,25 @@
+import numpy as np
+import networkx as nx
+from vts_core.graph import RoadNetwork
+
+def test_shared_geometry_buffer(grid_zone):
+    network = RoadNetwork(str(grid_zone / "roads.geojson"))
+    
+    # One stored geometry per road, read backwards for the reverse edge
+    assert len(network.geom_offsets) - 1 == network.graph.number_of_edges() // 2
+    u, v = next(iter(network.graph.edges))
+    fwd, _ = network.assemble_path([u, v])
+    back, _ = network.assemble_path([v, u])
+    assert np.array_equal(fwd, back[::-1])
+    
+    # Multi-edge paths share junction points exactly once
+    a, b = network.node_list[0], network.node_list[-1]
+    path = nx.shortest_path(network.graph, a, b, weight='weight')
+    coords, length = network.assemble_path(path)
+    expected = []
+    for x, y in zip(path, path[1:]):
+        seg, _ = network.assemble_path([x, y])
+        expected.extend(seg.tolist() if not expected else seg[1:].tolist())
+    assert coords.tolist() == expected
+    assert np.allclose(coords[0], a, atol=1e-5) and np.allclose(coords[-1], b, atol=1e-5)
+    assert abs(length - nx.path_weight(network.graph, path, weight='weight')) < 1e-6
@@ -0,0 +1,79 @@
+import pandas as pd
+import yaml
+from datetime import datetime
+from vts_core.store import SimulationStore
+from vts_core.sinks import build_sinks
+from vts_core.archive import extract_day
+from vts_core.nmea_import import build_vehicle_index, read_append_file, import_points, ROUTE_ID
+
+def _vehicles(tmp_path):
+    vehicles = tmp_path / "vehicles"
+    vehicles.mkdir()
+    # Same vehicle registered twice for consecutive windows, plus another vehicle
+    for suffix, imei, start, end in (("A", "111111111111111", "2022-05-01", "2022-12-31"),
+                                     ("B", "222222222222222", "2023-01-01", "2024-04-30")):
+        (vehicles / f"NE1_KA04A6216_JETTING_{suffix}.yaml").write_text(yaml.safe_dump({
+            "vehicle": {"name": "NE1_KA04A6216_JETTING", "imei": imei, "vehicle_number": "KA 04 A 6216"},
+            "simulation_window": {"start_date": start, "end_date": end}}))
+    (vehicles / "SE1_KA04AA9030.yaml").write_text(yaml.safe_dump({
+        "vehicle": {"name": "SE1_KA04AA9030_DESILTING", "imei": "333333333333333", "vehicle_number": "KA04AA9030"}}))
+    return build_vehicle_index(str(vehicles))
+
+def _dump(tmp_path, rows):
+    path = tmp_path / "Append_data.txt"
+    path.write_text("Vehicle Name\tDate\tTime\tdepot_lat/depot_lon\n" + "".join(r + "\n" for r in rows))
+    return str(path)
+
+def test_parse_resolves_vehicles_by_registration_and_window(tmp_path):
+    index = _vehicles(tmp_path)
+    points = read_append_file(_dump(tmp_path, [
+        "NE1_KA04A6216_JETTING\t26/01/2023\t13:55:17\t13.0113/77.5677",
+        "NE1_KA04A6216_JETTING\t02/06/2022\t08:00:00\t13.0113/77.5677",
+        "SE1_KA04AA9030_DESITING\t26/01/2023\t10:00:00\t12.9/77.6", # Typo in the name, registration still matches
+        "SE4_KA04A7681_DESILTING\t26/01/2023\t10:00:00\t12.9/77.6", # Unknown vehicle
+        "NE1_KA04A6216_JETTING\t31/02/2023\t10:00:00\t12.9/77.6", # Bad date
+        "NE1_KA04A6216_JETTING\t26/01/2023",
+    ]), index)
+    assert points["imei"].tolist() == ["222222222222222", "111111111111111", "333333333333333"]
+    assert points["vehicle_name"].tolist()[2] == "SE1_KA04AA9030_DESILTING"
+    assert points["date"].tolist() == ["2023-01-26", "2022-06-02", "2023-01-26"]
+
+def test_import_merges_in_time_order_once(tmp_path):
+    index = _vehicles(tmp_path)
+    out = tmp_path / "data"
+    store = SimulationStore(base_dir=str(out))
+    simulated = [{"timestamp": datetime(2023, 1, 26, h), "lat": 13.0, "lon": 77.5, "speed": 12.0, "heading": 90.0,
+                  "device_id": "NE1_KA04A6216_JETTING"} for h in (9, 12, 15)]
+    store.write_telemetry("222222222222222", "2023-01-26", simulated, vehicle_name="NE1_KA04A6216_JETTING")
+    store.save_daily_plan("2023-01-26", "222222222222222", route_id="RT_01")
+    dump = _dump(tmp_path, ["NE1_KA04A6216_JETTING\t26/01/2023\t13:55:17\t13.0113/77.5677",
+                            "NE1_KA04A6216_JETTING\t26/01/2023\t08:10:00\t13.0113/77.5677",
+                            "NE1_KA04A6216_JETTING\t27/01/2023\t08:10:00\t13.0113/77.5677"])
+
+    stats = import_points(read_append_file(dump, index), str(out))
+    assert stats == {"days": 2, "points": 3, "lines_added": 3, "plans_added": 1}
+    lines = (out / "tracker/NE1_KA04A6216_JETTING/2023/01/2023-01-26.txt").read_text().splitlines()
+    assert [l.split(",")[2] for l in lines] == ["230126081000", "230126090000", "230126120000", "230126135517", "230126150000"]
+    assert lines[0] == "imei:222222222222222,tracker,230126081000,,F,081000.000,A,1300.6780,N,07734.0620,E,0.00,0.00;"
+    df = pd.read_parquet(out / "telemetry/year=2023/month=01/222222222222222_2023-01-26.parquet")
+    assert len(df) == 5 and df["timestamp"].is_monotonic_increasing and df["speed"].tolist()[1] == 12.0
+    assert store.get_daily_plan("222222222222222", "2023-01-26")["route_id"] == "RT_01" # Simulated plan kept
+    assert store.get_daily_plan("222222222222222", "2023-01-27")["route_id"] == ROUTE_ID
+
+    # Importing the same dump again changes nothing
+    assert import_points(read_append_file(dump, index), str(out))["lines_added"] == 0
+    assert (out / "tracker/NE1_KA04A6216_JETTING/2023/01/2023-01-26.txt").read_text().splitlines() == lines
+    assert len(pd.read_parquet(out / "telemetry/year=2023/month=01/222222222222222_2023-01-26.parquet")) == 5
+
+def test_import_into_archived_day(tmp_path):
+    index = _vehicles(tmp_path)
+    out = tmp_path / "data"
+    store = SimulationStore(base_dir=str(out), sinks=build_sinks("archive?codec=gzip", out))
+    store.write_telemetry("222222222222222", "2023-01-26", [{"timestamp": datetime(2023, 1, 26, 9), "lat": 13.0, "lon": 77.5,
+                          "speed": 12.0, "heading": 90.0, "device_id": "NE1"}], vehicle_name="NE1_KA04A6216_JETTING")
+    store.close()
+    import_points(read_append_file(_dump(tmp_path, ["NE1_KA04A6216_JETTING\t26/01/2023\t08:10:00\t13.0113/77.5677"]), index),
+                  str(out), parquet=False, catalog=False)
+    assert not (out / "tracker/NE1_KA04A6216_JETTING/2023/01/2023-01-26.txt").exists()
+    text = extract_day(out / "tracker", "NE1_KA04A6216_JETTING", "2023-01-26")
+    assert [l.split(",")[2] for l in text.splitlines()] == ["230126081000", "230126090000"]
@@ -0,0 +1,36 @@
+import time
+import pytest
+from vts_core.store import SimulationStore
+from vts_core.pipeline import StreamingStore
+from vts_core.synthetic import telemetry_records
+
+def test_streaming_store_writes_what_the_store_writes(tmp_path):
+    plain = SimulationStore(base_dir=str(tmp_path / "plain"))
+    stream = StreamingStore(base_dir=str(tmp_path / "stream"), queue_days=2)
+    for day in ["2023-01-02", "2023-01-03", "2023-01-04"]:
+        for store in (plain, stream):
+            store.write_telemetry("123456789012345", day, telemetry_records(50, day), vehicle_name="V01")
+            store.buffer_daily_plan(day, "123456789012345", route_id="RT_01", distance_km=5.0)
+    plain.flush_daily_plans()
+    stream.close()
+    for rel in ["telemetry/year=2023/month=01/123456789012345_2023-01-03.parquet", "tracker/V01/2023/01/2023-01-03.txt"]:
+        assert (tmp_path / "stream" / rel).read_bytes() == (tmp_path / "plain" / rel).read_bytes()
+    assert len(stream.list_daily_plans()) == 3
+    assert stream.bytes_written == plain.bytes_written == sum(stream.bytes_by_day.values())
+
+def test_full_queue_blocks_the_producer(tmp_path):
+    stream = StreamingStore(base_dir=str(tmp_path), enable_legacy_logs=False, queue_days=1)
+    parquet = stream.sinks[0]
+    write = parquet._write_batches
+    parquet._write_batches = lambda batches: (time.sleep(0.05), write(batches))[1] # A slow disk
+    for i in range(4):
+        stream.write_telemetry("123456789012345", f"2023-01-0{i + 2}", telemetry_records(10), vehicle_name="V01")
+    assert stream.peak_depth <= 1 and stream.wait_s > 0.05
+    stream.close()
+    assert len(list((tmp_path / "telemetry").rglob("*.parquet"))) == 4
+
+def test_writer_errors_surface(tmp_path):
+    stream = StreamingStore(base_dir=str(tmp_path), enable_legacy_logs=False)
+    stream.write_telemetry("123456789012345", "20230102", telemetry_records(3), vehicle_name="V01")
+    with pytest.raises(RuntimeError, match="writer failed"):
+        stream.close()
@@ -0,0 +1,75 @@
+import pstats
+import pytest
+from vts_core.profiling import stage, start_profiler, merge_profiles, active_profiler
+
+def _work(n):
+    return sum(i * i for i in range(n))
+
+def test_stages_are_exclusive_and_parts_merge(tmp_path):
+    with stage("planning"): # No profiler: a no-op
+        _work(10)
+
+    for _ in range(2): # Two "tasks", as in a pool worker
+        profiler = start_profiler("cprofile", str(tmp_path))
+        with stage("planning"):
+            _work(1000)
+            with stage("graph_load"):
+                _work(20000)
+        profiler.stop()
+        profiler.dump()
+    assert active_profiler() is None
+
+    report = merge_profiles(str(tmp_path))
+    assert "planning" in open(report).read()
+    assert not list((tmp_path / "parts").iterdir())
+    planning = pstats.Stats(str(tmp_path / "planning.prof")).stats
+    graph_load = pstats.Stats(str(tmp_path / "graph_load.prof")).stats
+    genexpr_calls = lambda stats: sum(v[1] for k, v in stats.items() if k[2] == "<genexpr>")
+    assert genexpr_calls(planning) == 2 * 1001 and genexpr_calls(graph_load) == 2 * 20001
+
+def test_sampling_writes_collapsed_stacks(tmp_path):
+    profiler = start_profiler("sample", str(tmp_path), interval=0.001)
+    with stage("physics"):
+        _work(3_000_000)
+    profiler.stop()
+    profiler.dump()
+    merge_profiles(str(tmp_path))
+    lines = (tmp_path / "profile.collapsed").read_text().splitlines()
+    assert lines and any(l.startswith("physics;") and "test_profiling.py:_work" in l for l in lines)
+    assert all(int(l.rsplit(" ", 1)[1]) > 0 for l in lines)
+
+def test_stage_timing_is_exclusive(monkeypatch):
+    import time
+    from vts_core.profiling import enable_stage_timing, take_stage_times
+    clock = [100.0] # Patched clock: the stages "take" exactly what we advance it by
+    monkeypatch.setattr(time, "perf_counter", lambda: clock[0])
+    enable_stage_timing()
+    try:
+        with stage("planning"):
+            clock[0] += 0.02
+            with stage("graph_load"):
+                clock[0] += 0.03
+            clock[0] += 0.01
+        times = take_stage_times()
+        assert times == {"planning": pytest.approx(0.03), "graph_load": pytest.approx(0.03)} # Inclusive timing would give planning 0.06
+        assert take_stage_times() == {}
+    finally:
+        enable_stage_timing(False)
+    assert take_stage_times() == {}
+
+def test_stage_memory_peaks():
+    import tracemalloc
+    from vts_core.profiling import enable_stage_timing, take_stage_memory
+    enable_stage_timing(memory="tracemalloc")
+    try:
+        with stage("planning"):
+            blob = bytearray(8 * 1024 * 1024)
+            del blob
+        with stage("write"):
+            pass
+        mem = take_stage_memory()
+        assert mem["planning"] >= 8 and mem["write"] < mem["planning"] - 4 # Each stage gets its own peak
+        assert take_stage_memory() == {}
+    finally:
+        enable_stage_timing(False)
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,90 @@
+import yaml
+from vts_core.graph import RoadNetwork
+from vts_core.routes import compile_route_library, save_route_library, load_route_library
+from vts_core.engine import plan_mission_from_library, plan_mission_from_template, get_seeded_rng
+
+def compile_grid(grid_zone, tmp_path):
+    templates_dir = tmp_path / "routes" / "T_Zone"
+    templates_dir.mkdir(parents=True)
+    (templates_dir / "RT_T_01.yaml").write_text(yaml.dump({
+        "template_id": "RT_T_01",
+        "start_end": {"type": "depot", "locality_id": "T_LOC_01"},
+        "locality_pool": {"include": ["T_LOC_01", "T_LOC_02", "T_LOC_03", "T_LOC_99"], "exclude": ["T_LOC_01"]},
+        "daily_stops": {"min": 3, "max": 4},
+        "dwell_rules": {"min_minutes": 20, "max_minutes": 30}
+    }))
+    network = RoadNetwork(str(grid_zone / "roads.geojson"))
+    library = compile_route_library(
+        network, "T_Zone",
+        routes_file=str(grid_zone / "routes.json"),
+        templates_dir=str(templates_dir),
+        localities_path=str(grid_zone / "localities.geojson")
+    )
+    save_route_library(library, str(grid_zone))
+    return network
+
+def test_compile_and_cached_load(grid_zone, tmp_path):
+    network = compile_grid(grid_zone, tmp_path)
+    library = load_route_library(str(grid_zone))
+    
+    assert library.matches(network)
+    assert [r["route_id"] for r in library.routes] == ["RT_T_01"]
+    assert len(library.routes[0]["nodes"]) == 3
+    
+    tpl = library.templates["RT_T_01"]
+    # Excluded and unknown localities are dropped from the pool
+    assert [loc["locality_id"] for loc in tpl["localities"]] == ["T_LOC_02", "T_LOC_03"]
+    
+    # Base legs work in both directions
+    a, b = library.routes[0]["nodes"][:2]
+    assert library.leg_alternatives(a, b)[0] == library.leg_alternatives(b, a)[0][::-1]
+    
+    from vts_core.zones import ZoneRegistry
+    registry = ZoneRegistry()
+    assert registry.route_library(str(grid_zone)) is registry.route_library(str(grid_zone))
+
+def test_library_missions_are_deterministic(grid_zone, tmp_path):
+    network = compile_grid(grid_zone, tmp_path)
+    library = load_route_library(str(grid_zone))
+    home = network.node_list[0]
+    
+    m1 = plan_mission_from_library(network, library, home, library.routes[0]["nodes"], get_seeded_rng("V1", "2023-01-02"))
+    m2 = plan_mission_from_library(network, library, home, library.routes[0]["nodes"], get_seeded_rng("V1", "2023-01-02"))
+    assert list(m1["geometry"].coords) == list(m2["geometry"].coords)
+    assert len(m1["site_locations"]) == 3
+    
+    mission = plan_mission_from_template(network, library, library.templates["RT_T_01"], home, get_seeded_rng("V1", "2023-01-02"))
+    assert 3 <= len(mission["site_locations"]) <= 4
+    assert mission["dwell_minutes"] == (20, 30)
+    # No zero-length legs between consecutive stops
+    assert all(b > a for a, b in zip([0.0] + mission["site_locations"], mission["site_locations"]))
+
+def test_diverse_alternatives_and_entropy(grid_zone, tmp_path):
+    network = compile_grid(grid_zone, tmp_path)
+    library = load_route_library(str(grid_zone))
+    a, b = library.routes[0]["nodes"][:2]
+    
+    paths = library.leg_alternatives(a, b)
+    assert 1 < len(paths) <= 3
+    assert len({tuple(p) for p in paths}) == len(paths)
+    assert all(p[0] == a and p[-1] == b for p in paths)
+    
+    from vts_core.engine import pick_leg_path
+    rng = get_seeded_rng("V1", "2023-01-02")
+    assert all(pick_leg_path(library, a, b, rng, entropy=0.0) == paths[0] for _ in range(20))
+    picks = {tuple(pick_leg_path(library, a, b, rng, entropy=1.0)) for _ in range(50)}
+    assert tuple(paths[0]) not in picks and len(picks) == len(paths) - 1
+
+def test_library_rejects_an_edited_graph(grid_zone, tmp_path):
+    import json
+    network = compile_grid(grid_zone, tmp_path)
+    library = load_route_library(str(grid_zone))
+    # Shift every road a little: same node and edge counts, different node coordinates
+    roads = json.loads((grid_zone / "roads.geojson").read_text())
+    for f in roads["features"]:
+        f["geometry"]["coordinates"] = [[x + 0.0001, y] for x, y in f["geometry"]["coordinates"]]
+    (grid_zone / "roads.geojson").write_text(json.dumps(roads))
+    edited = RoadNetwork(str(grid_zone / "roads.geojson"))
+    assert len(edited.node_list) == len(network.node_list)
+    assert edited.graph.number_of_edges() == network.graph.number_of_edges()
+    assert library.matches(network) and not library.matches(edited)
@@ -0,0 +1,54 @@
+import os
+import re
+import sys
+import time
+import importlib
+from vts_core.config import EngineOptions
+from vts_core.synthetic import write_vehicle_yaml
+from vts_core.profiling import enable_stage_timing
+from vts_core.archive import extract_day
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+run_batch = importlib.import_module("run_batch")
+
+def test_stage_seconds_add_up_to_wall_time(tmp_path, grid_zone, monkeypatch):
+    close = run_batch.SimulationStore.close
+    def slow_close(store):
+        time.sleep(0.2) # A slow final flush must not land on a vehicle-day
+        close(store)
+    monkeypatch.setattr(run_batch.SimulationStore, "close", slow_close)
+    vehicle = write_vehicle_yaml(tmp_path / "vehicles" / "T1.yaml", "T1", "900000000000001", grid_zone, (12.904, 77.604))
+    enable_stage_timing(memory="rss")
+    try:
+        # A week with its Sunday; post-processing adds its own stages to each day
+        task = (str(vehicle), str(grid_zone.parent), None, "2023-03-06", "2023-03-12", str(tmp_path / "out"),
+                EngineOptions(), 0, None)
+        message, days = run_batch.process_vehicle_year(task)
+    finally:
+        enable_stage_timing(False)
+    assert message.startswith("✅") and len(days) >= 3
+    flush = re.search(r"\| flush ([\d.]+)s", message)
+    assert flush and float(flush.group(1)) >= 0.2
+    for day in days:
+        stages = day["stage_s"]
+        assert stages["post_process"] > 0 and stages["physics"] > 0
+        assert stages["other"] >= -1e-3 and stages["write"] < 0.2 # "other" is wall_s minus the stages (rounded to 4 places)
+        assert abs(sum(stages.values()) - day["wall_s"]) < 1e-3
+        assert day["mem_mb"]["physics"] > 0
+
+def test_failed_task_keeps_buffered_sink_output(tmp_path, grid_zone, monkeypatch):
+    vehicle = write_vehicle_yaml(tmp_path / "vehicles" / "T1.yaml", "T1", "900000000000001", grid_zone, (12.904, 77.604))
+    simulate, calls = run_batch.run_simulation_day, []
+    def failing_day(*args, **kwargs):
+        calls.append(args[2])
+        if len(calls) == 2:
+            raise RuntimeError("boom")
+        return simulate(*args, **kwargs)
+    monkeypatch.setattr(run_batch, "run_simulation_day", failing_day)
+    out = tmp_path / "out"
+    task = (str(vehicle), str(grid_zone.parent), None, "2023-03-06", "2023-03-08", str(out), EngineOptions(), 0,
+            "parquet,archive?codec=gzip")
+    message, days = run_batch.process_vehicle_year(task)
+    assert message.startswith("❌") and len(days) == 1
+    # The archive sink buffers a month; the day simulated before the failure still reaches it
+    assert extract_day(out / "tracker", "T1", calls[0]) is not None
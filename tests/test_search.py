@@ -0,0 +1,36 @@
+import random
+import networkx as nx
+from vts_core.graph import RoadNetwork
+from vts_core.search import dijkstra_path, astar_path, bidirectional_dijkstra_path, SearchNetwork
+
+def test_searches_return_shortest_paths_and_count_settled(grid_zone):
+    network = RoadNetwork(str(grid_zone / "roads.geojson"))
+    rng = random.Random(3)
+    stats = {"dijkstra": {}, "astar": {}, "bidirectional": {}}
+    
+    for _ in range(40):
+        s, t = rng.sample(network.node_list, 2)
+        expected = nx.shortest_path_length(network.graph, s, t, weight="weight")
+        for name, path in [
+            ("dijkstra", dijkstra_path(network.graph, s, t, stats=stats["dijkstra"])),
+            ("astar", astar_path(network, s, t, stats=stats["astar"])),
+            ("bidirectional", bidirectional_dijkstra_path(network.graph, s, t, stats=stats["bidirectional"])),
+        ]:
+            assert path[0] == s and path[-1] == t, name
+            assert abs(nx.path_weight(network.graph, path, "weight") - expected) < 1e-6, name
+    
+    assert stats["astar"]["settled"] < stats["dijkstra"]["settled"]
+    assert stats["bidirectional"]["settled"] < stats["dijkstra"]["settled"]
+
+def test_astar_stays_exact_under_noise(grid_zone):
+    network = RoadNetwork(str(grid_zone / "roads.geojson"))
+    rng = random.Random(5)
+    noise = {(u, v): rng.uniform(0.95, 1.05) for u, v in network.graph.edges}
+    weight = lambda u, v, d: network.graph[u][v]["weight"] * noise[(u, v)]
+    view = SearchNetwork(network, "astar")
+    for _ in range(20):
+        s, t = rng.sample(network.node_list, 2)
+        path = view.shortest_path_nodes(s, t, weight)
+        length = sum(weight(u, v, None) for u, v in zip(path, path[1:]))
+        assert abs(length - nx.shortest_path_length(network.graph, s, t, weight=weight)) < 1e-6
+    assert view.stats["queries"] == 20
@@ -0,0 +1,61 @@
+import socket
+from datetime import datetime
+import pandas as pd
+import pytest
+from vts_core.store import SimulationStore
+from vts_core.synthetic import telemetry_records
+from vts_core.sinks import make_batch, format_nmea_lines, build_sinks, Sink, CsvSink, StreamSink
+
+def test_nmea_lines_match_the_per_record_formatter(tmp_path):
+    store = SimulationStore(base_dir=str(tmp_path))
+    records = telemetry_records(500) + [{"timestamp": datetime(2023, 1, 2, 23, 59, 59), "lat": 12.999999999, "lon": 77.0, "speed": 0, "heading": 0, "device_id": "V01"}]
+    expected = [store._format_log_line(r, "123456789012345") for r in records]
+    assert format_nmea_lines(make_batch("123456789012345", "2023-01-02", records, "V01").frame, "123456789012345") == expected
+
+def test_several_sinks_in_one_pass(tmp_path):
+    store = SimulationStore(base_dir=str(tmp_path), sinks=build_sinks("parquet,nmea,csv,geojson,arrow", tmp_path))
+    for i, day in enumerate(["2023-01-02", "2023-01-03"]):
+        store.write_telemetry("123456789012345", day, telemetry_records(20, day, seed=i), vehicle_name="V01")
+    store.close()
+    assert len(pd.read_parquet(tmp_path / "telemetry/year=2023/month=01/123456789012345_2023-01-03.parquet")) == 20
+    assert len((tmp_path / "tracker/V01/2023/01/2023-01-02.txt").read_text().splitlines()) == 20
+    assert list(pd.read_csv(tmp_path / "csv/V01/2023/01/2023-01-02.csv").columns)[-1] == "imei"
+    assert (tmp_path / "exported_geojson/V01/2023-01-03.geojson").exists()
+    import pyarrow.ipc as ipc
+    arrow = store.sinks[-1].path
+    with open(arrow, "rb") as f:
+        table = ipc.open_stream(f).read_all()
+    assert table.num_rows == 40 and set(table.column("date").to_pylist()) == {"2023-01-02", "2023-01-03"}
+    assert store.bytes_written == sum(s.bytes_written for s in store.sinks)
+
+def test_flush_policy(tmp_path):
+    sink = CsvSink(tmp_path, flush_days=3)
+    for i in range(4):
+        written = sink.write(make_batch("1", f"2023-01-0{i + 2}", telemetry_records(5), "V01"))
+        assert (written > 0) == (i == 2)
+    assert len(list(tmp_path.rglob("*.csv"))) == 3
+    assert sink.close() > 0 and len(list(tmp_path.rglob("*.csv"))) == 4
+
+def test_udp_stream_sink():
+    server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server.bind(("127.0.0.1", 0))
+    server.settimeout(2)
+    sink = build_sinks(f"udp://127.0.0.1:{server.getsockname()[1]}?datagram_bytes=300", ".")[0]
+    assert isinstance(sink, StreamSink)
+    sink.write(make_batch("123456789012345", "2023-01-02", telemetry_records(10), "V01"))
+    sink.close()
+    lines = []
+    while len(lines) < 10:
+        data = server.recv(4096)
+        assert len(data) <= 300
+        lines += data.decode().splitlines()
+    server.close()
+    assert all(line.startswith("imei:123456789012345,tracker,") for line in lines)
+
+def test_unknown_sink():
+    with pytest.raises(ValueError, match="Unknown sink"):
+        build_sinks("parquet,kafka", ".")
+
+def test_sink_is_abstract(tmp_path):
+    with pytest.raises(TypeError):
+        Sink(tmp_path)
@@ -0,0 +1,51 @@
+import numpy as np
+import networkx as nx
+from shapely.geometry import LineString
+from vts_core.graph import RoadNetwork
+from vts_core.config import VehicleConfig
+from vts_core.agent import VehicleAgent
+from vts_core.store import SimulationStore
+from vts_core.search import SearchNetwork
+from vts_core.speeds import parse_maxspeed, free_flow_kmh, TravelTimeNetwork, FREE_FLOW_KMH, DEFAULT_KMH, LOCAL
+
+def test_free_flow_speeds_from_class_and_maxspeed():
+    assert parse_maxspeed("40") == 40.0
+    assert abs(parse_maxspeed("30 mph") - 48.28) < 0.01
+    assert np.isnan(parse_maxspeed("IN:urban")) and np.isnan(parse_maxspeed(None))
+
+    kmh = free_flow_kmh([{"highway": "primary"}, {"highway": "primary", "maxspeed": "60"},
+                         {"highway": "residential;service"}, {}])
+    assert kmh.tolist() == [FREE_FLOW_KMH["primary"], 60.0, FREE_FLOW_KMH["residential"], DEFAULT_KMH]
+
+def test_travel_time_routing_and_speed_profile(grid_zone):
+    network = RoadNetwork(str(grid_zone / "roads.geojson"))
+    for u, v, d in network.graph.edges(data=True):
+        assert abs(d["time"] - d["weight"] / (network.geom_kmh[d["geom"]] / 3.6)) < 1e-9
+
+    # Corner to corner: time routing prefers the primary rows, at no less length
+    s, t = min(network.node_list), max(network.node_list)
+    view = SearchNetwork(TravelTimeNetwork(network), "astar")
+    time_of = lambda p: nx.path_weight(network.graph, p, "time")
+    by_time = view.shortest_path_nodes(s, t, weight=lambda u, v, d: d[view.weight_attr])
+    by_length = network.shortest_path_nodes(s, t)
+    assert abs(time_of(by_time) - nx.shortest_path_length(network.graph, s, t, weight="time")) < 1e-6
+    assert time_of(by_time) < time_of(by_length)
+
+    geom_ids, _, length = network.path_edges(by_time)
+    profile = network.speed_profile(geom_ids)
+    assert abs(profile[-1][0] - length) < 0.01
+    assert all(a[1] != b[1] for a, b in zip(profile, profile[1:]))
+    assert {(k, g) for _, k, g in profile} <= {(FREE_FLOW_KMH["primary"], 0), (FREE_FLOW_KMH["residential"], LOCAL)}
+
+def test_agent_caps_speed_per_road(tmp_path):
+    config = VehicleConfig(imei="1", name="T", device_id="D", zone_id="Z", type="V",
+                           depot_location=(0.0, 0.0), max_speed_knots=25.0)
+    agent = VehicleAgent(config, SimulationStore(base_dir=str(tmp_path), enable_legacy_logs=False))
+    agent.start_24h_cycle("2023-01-01", LineString([(0, 0), (0, 0.01)]), 8, 18,
+                          speed_profile=[[300.0, 20.0], [1111.39, 60.0]])
+
+    assert abs(agent._top_speed_knots() - 20.0 / 1.852) < 1e-9
+    agent.path_progress_meters = 500.0
+    assert agent._top_speed_knots() == 25.0 # Vehicle top speed below the road's
+    agent.path_progress_meters = 5000.0
+    assert agent._top_speed_knots() == 25.0
@@ -36,6 +36,42 @@ def test_save_vehicle_and_plan(tmp_path):
     assert row is not None
     assert row[0] == "RT_01"
     
+def test_daily_plan_batch_and_roundtrip(tmp_path):
+    from shapely.geometry import LineString
+    store = SimulationStore(base_dir=str(tmp_path), plan_batch_size=2)
+    
+    path = LineString([(77.6505668, 12.9069791), (77.6474366, 12.9216405), (77.6383622, 12.9111225)])
+    stops = [{"at_meter": 1500.0, "duration_min": 45, "duration_max": 90, "type": "WORK"}]
+    store.buffer_daily_plan("2023-01-01", "123456789012345", route_id="RT_01", start_time="08:00:00",
+                            end_time="19:00:00", distance_km=3.2, site_locations=[1520.0], stops=stops, geometry=path)
+    # Not written until the batch fills (or flush)
+    assert store.get_daily_plan("123456789012345", "2023-01-01") is None
+    
+    store.buffer_daily_plan("2023-01-02", "123456789012345", route_id=None, start_time="09:00:00")
+    plan = store.get_daily_plan("123456789012345", "2023-01-01")
+    assert plan["route_id"] == "RT_01"
+    assert plan["stops"] == stops
+    assert plan["site_locations"] == [1520.0]
+    assert list(plan["geometry"].coords) == list(path.coords)
+    
+    audit = store.list_daily_plans(vehicle_imei="123456789012345", start_date="2023-01-02")
+    assert list(audit["date"]) == ["2023-01-02"]
+
+def test_speed_profile_column_added_to_old_db(tmp_path):
+    import sqlite3
+    conn = sqlite3.connect(tmp_path / "simulation_metadata.db")
+    conn.execute("""CREATE TABLE daily_plans (vehicle_imei TEXT NOT NULL, date TEXT NOT NULL, route_id TEXT,
+                    start_time TEXT, end_time TEXT, distance_km REAL, site_locations TEXT, stops TEXT,
+                    path_polyline TEXT, PRIMARY KEY (vehicle_imei, date))""")
+    conn.commit()
+    conn.close()
+
+    store = SimulationStore(base_dir=str(tmp_path))
+    store.save_daily_plan("2023-01-01", "1", route_id="RT_01", speed_profile=[[250.0, 20.0], [900.0, 40.0]])
+    assert store.get_daily_plan("1", "2023-01-01")["speed_profile"] == [[250.0, 20.0], [900.0, 40.0]]
+    store.save_daily_plan("2023-01-02", "1", route_id="RT_01")
+    assert store.get_daily_plan("1", "2023-01-02")["speed_profile"] is None
+
 def test_write_read_telemetry(tmp_path):
     store = SimulationStore(base_dir=str(tmp_path))
     
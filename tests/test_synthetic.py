@@ -0,0 +1,39 @@
+from vts_core.config import load_vehicle_config
+from vts_core.external_data import ExternalLogProvider
+from vts_core.synthetic import write_vehicle_yaml, write_external_log
+
+def test_synthetic_vehicle_and_external_log(grid_zone, tmp_path):
+    path = write_vehicle_yaml(tmp_path / "V01.yaml", "SYN_V01", 900000000000001, grid_zone, (12.90, 77.60))
+    config = load_vehicle_config(str(path))
+    assert (config.imei, config.zone_id, config.depot_location) == ("900000000000001", "T_Zone", (12.90, 77.60))
+    assert config.simulation_window["start_date"] == "2022-01-01"
+
+    csv = write_external_log(tmp_path / "external.csv", ["SYN_V01", "SYN_V02"], [(12.901, 77.602)], "2023-03-01", days=2, per_day=3)
+    provider = ExternalLogProvider(str(csv))
+    events = provider.get_events("syn_v01", "2023-03-02")
+    assert len(events) == 3 and all((e["lat"], e["lon"]) == (12.901, 77.602) for e in events)
+    assert [e["timestamp"] for e in events] == sorted(e["timestamp"] for e in events)
+
+def test_generated_zones_are_connected_and_deterministic(tmp_path):
+    from vts_core.graph import RoadNetwork
+    from vts_core.routes import load_predefined_routes
+    from vts_core.synthetic import generate_zone, generate_fleet, TOPOLOGIES
+
+    for topology in TOPOLOGIES:
+        zone_dir = tmp_path / topology / "SYN_Zone"
+        summary = generate_zone(zone_dir, nodes=300, topology=topology, localities=12, seed=3)
+        assert 280 <= summary["nodes"] <= 400 and summary["routes"] == 3
+        network = RoadNetwork(str(zone_dir / "roads.geojson"))
+        assert len(network.node_list) == summary["nodes"] # Nothing dropped as a disconnected island
+        assert set(network.geom_group.tolist()) == {0, 1, 2}
+        assert all(len(r["waypoints"]) == len(r["stops"]) >= 3 for r in load_predefined_routes(str(zone_dir)))
+
+        again = generate_zone(tmp_path / "again" / topology / "SYN_Zone", nodes=300, topology=topology, localities=12, seed=3)
+        assert again["points"] == summary["points"]
+        assert (zone_dir / "routes.json").read_text() == (tmp_path / "again" / topology / "SYN_Zone" / "routes.json").read_text()
+
+    fleet = generate_fleet(tmp_path / "vehicles", zone_dir, summary["points"], 30, depots=3)
+    configs = [load_vehicle_config(str(p)) for p in fleet]
+    assert len({c.imei for c in configs}) == 30 and all(len(c.imei) == 15 for c in configs)
+    assert len({c.depot_location for c in configs}) == 3
+    assert {c.zone_id for c in configs} == {"SYN_Zone"}
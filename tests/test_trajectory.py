@@ -0,0 +1,53 @@
+import pytest
+import numpy as np
+from vts_core.store import SimulationStore
+from vts_core.trajectory import Trajectory, METERS_PER_DEGREE
+
+def make_trajectory():
+    # ~1.1km straight road North, driven 09:00 -> 09:10, parked afterwards
+    path = [(77.0, 12.0), (77.0, 12.01)]
+    length_m = 0.01 * METERS_PER_DEGREE
+    return Trajectory(
+        imei="123456789012345", date="2023-01-02", device_id="DEV01", vehicle_name="TestCar",
+        shift_start_s=9 * 3600, shift_end_s=10 * 3600,
+        path=path,
+        knots_t=[0, 9 * 3600, 9 * 3600 + 600, 86340],
+        knots_d=[0.0, 0.0, length_m, length_m],
+        checkpoints=[(9 * 3600 + 1800, 12.5, 77.5)]
+    )
+
+def test_resample_interval_and_position():
+    traj = make_trajectory()
+    records = traj.resample(60)
+    
+    # 60 shift samples + 1 forced checkpoint
+    assert len(records) == 61
+    assert records[0]['timestamp'].strftime("%H:%M:%S") == "09:00:00"
+    
+    # Halfway through the drive we should be halfway up the road, heading North
+    mid = next(r for r in records if r['timestamp'].strftime("%H:%M:%S") == "09:05:00")
+    assert mid['lat'] == pytest.approx(12.005)
+    assert mid['lon'] == pytest.approx(77.0)
+    assert mid['heading'] == pytest.approx(0.0, abs=0.1)
+    # 1111m in 600s = 1.85 m/s = 3.6 knots
+    assert mid['speed'] == pytest.approx(3.6, abs=0.05)
+    
+    parked = records[-1]
+    assert parked['speed'] == 0.0
+    assert parked['lat'] == pytest.approx(12.01)
+
+    checkpoint = next(r for r in records if r['lat'] == 12.5)
+    assert checkpoint['timestamp'].strftime("%H:%M:%S") == "09:30:00"
+
+def test_store_roundtrip(tmp_path):
+    store = SimulationStore(base_dir=str(tmp_path))
+    traj = make_trajectory()
+    path = store.write_trajectory(traj.imei, traj.date, traj)
+    assert path.exists()
+    
+    loaded = store.read_trajectory(traj.imei, traj.date)
+    assert loaded.vehicle_name == "TestCar"
+    assert np.array_equal(loaded.knots_t, traj.knots_t)
+    assert loaded.resample(300) == traj.resample(300)
+    
+    assert store.read_trajectory(traj.imei, "2023-01-03") is None
@@ -0,0 +1,46 @@
+import os
+import pytest
+from vts_core.memory import rss_mb, plan_workers
+from vts_core.workers import RecyclingPool
+
+def _square(n):
+    return n * n, os.getpid()
+
+def _die(n):
+    if n == 3:
+        os._exit(1)
+    return n
+
+def _fail(n):
+    if n == 2:
+        raise ValueError(f"bad task {n}")
+    return n
+
+def test_workers_are_recycled_over_budget():
+    if not rss_mb():
+        pytest.skip("no RSS reading on this platform")
+    pool = RecyclingPool(2, budget_mb=1) # Any worker is above 1 MB: one task per worker
+    with pool:
+        results = list(pool.imap_unordered(_square, range(6)))
+    assert sorted(r for r, _ in results) == [n * n for n in range(6)]
+    assert len({pid for _, pid in results}) == 6
+    assert pool.recycled == 6 and pool.lost == 0 and pool.peak_rss_mb > 1
+
+def test_dead_worker_loses_only_its_task():
+    pool = RecyclingPool(2)
+    results = list(pool.imap_unordered(_die, range(6), lost=lambda task, reason: ("lost", task)))
+    assert sorted(r for r in results if r != ("lost", 3)) == [0, 1, 2, 4, 5]
+    assert ("lost", 3) in results and pool.lost == 1
+
+def test_task_errors_keep_their_type_and_traceback():
+    with pytest.raises(ValueError, match="bad task 2") as raised:
+        list(RecyclingPool(2).imap_unordered(_fail, range(4)))
+    assert "_fail" in str(raised.value.__cause__) # Worker-side traceback
+
+def test_plan_workers_fits_budget_and_available_memory():
+    artifacts = {"base_mb": 100.0, "external_mb": 20.0, "zones_mb": {"A": 50.0, "B": 30.0}}
+    plan = plan_workers(8, 40, 1000, artifacts, zone_cache_mb=512, available=2500)
+    assert plan["zone_cache_mb"] == 80.0 # Every zone fits
+    assert plan["processes"] == 2 # 2500 MB / 1000 MB per worker
+    tight = plan_workers(8, 3, 200, artifacts, zone_cache_mb=512)
+    assert tight["processes"] == 3 and tight["zone_cache_mb"] == 50.0 # At least the largest zone
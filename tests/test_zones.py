@@ -0,0 +1,25 @@
+import os
+from vts_core.zones import ZoneRegistry
+from tests.conftest import write_grid_zone
+
+def test_registry_lazy_lru_and_counters(tmp_path):
+    a = write_grid_zone(tmp_path / "A_Zone")
+    b = write_grid_zone(tmp_path / "B_Zone", origin=(77.70, 12.90))
+    registry = ZoneRegistry()
+    
+    net_a = registry.network(str(a / "roads.geojson"))
+    assert registry.network(str(a / "roads.geojson")) is net_a
+    assert len(registry.localities(str(a))) == 4
+    assert registry.route_library(str(a)) is None
+    assert registry.stats()["hits"] == 1 and registry.stats()["misses"] == 3
+    
+    # Budget below two zones: using B evicts A, the zone just used is kept
+    registry.max_bytes = registry.nbytes + 1
+    registry.network(str(b / "roads.geojson"))
+    assert registry.stats()["evictions"] == 1 and registry.stats()["zones"] == 1
+    assert registry.network(str(a / "roads.geojson")) is not net_a
+    
+    # Rewritten source files are reloaded
+    routes = registry.predefined_routes(str(a))
+    os.utime(a / "routes.json", (0, 0))
+    assert registry.predefined_routes(str(a)) is not routes
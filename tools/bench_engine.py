@@ -0,0 +1,345 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import glob
+import json
+import time
+import random
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime, timedelta
+
+import yaml
+import networkx as nx
+
+from vts_core.config import load_vehicle_config, EngineOptions
+from vts_core.graph import RoadNetwork
+from vts_core.store import SimulationStore
+from vts_core.zones import get_zone_registry
+from vts_core.cch import PerturbedNetwork
+from vts_core.search import SearchNetwork
+from vts_core.engine import find_stochastic_path_nodes, plan_vehicle_day, run_simulation_day
+from vts_core.external_data import ExternalLogProvider
+from vts_core.synthetic import generate_zone, generate_fleet, write_external_log, telemetry_records, TOPOLOGIES
+
+# End-to-end benchmark of the engine stages on a generated zone and on bundled
+# zones (or a tools/generate_synthetic.py city via --zones_dir / --vehicles_dir).
+# Results go to JSON (--json) so two commits can be compared (--compare).
+
+STAGES = ["graph_load", "nearest_node", "shortest_path", "plan_day", "vehicle_day",
+          "store_write", "nmea_format", "external_lookup", "ra12"]
+ROUTERS = ["dijkstra", "astar", "bidirectional", "cch"]
+DEFAULT_DATE = "2022-07-27"
+BENCH_BBOX = (12.9, 77.6, 12.95, 77.65) # Synthetic telemetry of the write benchmarks
+EXTERNAL_CSV = os.path.join("data", "external", "VTS Consolidated Report - Final Dataset.csv")
+
+def _ms(t0, n=1):
+    return round((time.perf_counter() - t0) * 1000 / max(n, 1), 4)
+
+def _best_ms(fn, n, repeat=3):
+    """Fastest of `repeat` runs of fn(), per item (micro stages are noisy)."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, _ms(t0, n))
+    return best
+
+def _dates(start, n):
+    d0 = datetime.strptime(start, "%Y-%m-%d")
+    return [(d0 + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(n)]
+
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True, timeout=30)
+        return out.stdout.strip() + ("-dirty" if dirty.stdout.strip() else "") if out.returncode == 0 else None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+# --- Datasets ---
+
+def synthetic_dataset(work_dir, nodes, topology, date):
+    """Generated zone (vts_core.synthetic) + one vehicle + manual check-in CSV, all under work_dir."""
+    zone_dir = os.path.join(work_dir, "zones", "BENCH_Zone")
+    zone = generate_zone(zone_dir, nodes=nodes, topology=topology, localities=max(4, nodes // 100))
+    vehicle = generate_fleet(os.path.join(work_dir, "vehicles"), zone_dir, zone["points"], 1)[0]
+    points = zone["points"][::max(len(zone["points"]) // 50, 1)]
+    external = write_external_log(os.path.join(work_dir, "external.csv"), [f"BENCH_V{i:05d}" for i in range(1, 41)],
+                                  points, date, days=30)
+    return {"name": f"synthetic_{topology}_{zone['nodes']}", "zone_dir": zone_dir, "vehicle": str(vehicle),
+            "external_csv": str(external), "zones_dir": os.path.dirname(zone_dir)}
+
+def bundled_vehicle(zone_name, vehicles_dir, date):
+    """First enabled vehicle of the zone whose simulation window covers `date`."""
+    for path in sorted(glob.glob(os.path.join(vehicles_dir, "*.yaml"))):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = yaml.safe_load(f)
+        except (OSError, yaml.YAMLError):
+            continue
+        if not isinstance(data, dict) or (data.get("zone") or {}).get("name") != zone_name:
+            continue
+        window = data.get("simulation_window") or {}
+        if (data.get("vehicle") or {}).get("enabled", True) and \
+                str(window.get("start_date", date)) <= date <= str(window.get("end_date", date)):
+            return path
+    return None
+
+def bundled_dataset(zone_dir, vehicles_dir, date):
+    vehicle = bundled_vehicle(os.path.basename(zone_dir), vehicles_dir, date)
+    if vehicle is None:
+        logging.warning(f"⚠️ No enabled vehicle for {zone_dir} on {date}; vehicle stages are skipped.")
+    return {"name": os.path.basename(zone_dir), "zone_dir": zone_dir, "vehicle": vehicle,
+            "external_csv": EXTERNAL_CSV, "zones_dir": os.path.dirname(zone_dir)}
+
+# --- Stages (each returns a dict of metrics; *_ms keys are compared between runs) ---
+
+def bench_graph_load(ds, ctx):
+    roads = os.path.join(ds["zone_dir"], "roads.geojson")
+    t0 = time.perf_counter()
+    network = RoadNetwork(roads)
+    ctx["network"] = network
+    return {"load_ms": _ms(t0), "nodes": len(network.node_list), "edges": network.graph.number_of_edges(),
+            "roads_mb": round(os.path.getsize(roads) / 1e6, 2)}
+
+def bench_nearest_node(ds, ctx):
+    network, rng = ctx["network"], random.Random(ctx["seed"])
+    xs = [x for x, _ in network.node_list]
+    ys = [y for _, y in network.node_list]
+    points = [(rng.uniform(min(ys), max(ys)), rng.uniform(min(xs), max(xs))) for _ in range(ctx["queries"])]
+    query_ms = _best_ms(lambda: [network._get_nearest_node(p) for p in points], len(points))
+    return {"query_ms": query_ms, "queries": len(points)}
+
+def bench_shortest_path(ds, ctx):
+    """Engine-style noisy leg searches per router (cch: one customised metric per query batch)."""
+    network, rng = ctx["network"], random.Random(ctx["seed"])
+    pairs = [tuple(rng.sample(network.node_list, 2)) for _ in range(ctx["queries"])]
+    out = {}
+    for router in ROUTERS:
+        t0 = time.perf_counter()
+        if router == "cch":
+            view = PerturbedNetwork(network, random.Random(ctx["seed"]))
+        elif router == "dijkstra":
+            view = network
+        else:
+            view = SearchNetwork(network, router)
+        setup_ms = _ms(t0)
+        t0 = time.perf_counter()
+        missing = sum(find_stochastic_path_nodes(view, a, b, rng) is None for a, b in pairs)
+        out[router] = {"query_ms": _ms(t0, len(pairs)), "setup_ms": setup_ms, "no_path": missing}
+    return out
+
+def bench_plan_day(ds, ctx):
+    if not ds["vehicle"]:
+        return None
+    config = load_vehicle_config(ds["vehicle"])
+    roads = os.path.join(ds["zone_dir"], "roads.geojson")
+    options = EngineOptions()
+    # First plan warms the zone registry (graph, library, routes); it is reported apart
+    t0 = time.perf_counter()
+    plan_vehicle_day(config, roads, ctx["date"], options)
+    cold_ms = _ms(t0)
+    dates = _dates(ctx["date"], ctx["days"])
+    t0 = time.perf_counter()
+    plans = [plan_vehicle_day(config, roads, d, options) for d in dates]
+    km = [p["distance_km"] for p in plans if p]
+    return {"cold_ms": cold_ms, "plan_ms": _ms(t0, len(dates)), "plans": len(km),
+            "mean_km": round(sum(km) / len(km), 2) if km else None}
+
+def bench_vehicle_day(ds, ctx):
+    if not ds["vehicle"]:
+        return None
+    roads = os.path.join(ds["zone_dir"], "roads.geojson")
+    out_dir = os.path.join(ctx["work_dir"], "out", ds["name"])
+    store = SimulationStore(base_dir=out_dir)
+    days, records = 0, 0
+    t0 = time.perf_counter()
+    for d in _dates(ctx["date"], ctx["days"]):
+        stats = run_simulation_day(ds["vehicle"], roads, d, output_dir=out_dir, options=EngineOptions(), store=store)
+        if stats:
+            days += 1
+            records += stats["records"]
+    store.flush_daily_plans()
+    ctx["out_dir"] = out_dir
+    return {"day_ms": _ms(t0, days), "days": days, "records_per_day": round(records / days, 1) if days else 0}
+
+def _bench_records(ctx):
+    return telemetry_records(ctx["records"], ctx["date"], ctx["seed"], start_hour=9, interval_s=25, device_id="BENCH", bbox=BENCH_BBOX)
+
+def bench_store_write(ds, ctx):
+    store = SimulationStore(base_dir=os.path.join(ctx["work_dir"], "store"))
+    records = _bench_records(ctx)
+    t0 = time.perf_counter()
+    store.write_telemetry("900000000000001", ctx["date"], records, vehicle_name="BENCH_V01")
+    write_ms = _ms(t0)
+    t0 = time.perf_counter()
+    for i, d in enumerate(_dates(ctx["date"], 100)):
+        store.buffer_daily_plan(d, "900000000000001", route_id="RT_BENCH", start_time="09:00:00", end_time="19:00:00",
+                                distance_km=10.0 + i, stops=[], site_locations=[])
+    store.flush_daily_plans()
+    return {"telemetry_ms": write_ms, "records": len(records), "plans_100_ms": _ms(t0)}
+
+def bench_nmea_format(ds, ctx):
+    store = SimulationStore(base_dir=os.path.join(ctx["work_dir"], "store"), enable_legacy_logs=False)
+    records = _bench_records(ctx)
+    line_ms = _best_ms(lambda: [store._format_log_line(r, "900000000000001") for r in records], len(records))
+    return {"line_us": round(line_ms * 1000, 3), "lines": len(records)}
+
+def bench_external_lookup(ds, ctx):
+    path = ds["external_csv"]
+    if not os.path.exists(path):
+        return None
+    ExternalLogProvider._shared_df = None # Measure the cold CSV load
+    t0 = time.perf_counter()
+    provider = ExternalLogProvider(path)
+    load_ms = _ms(t0)
+    if provider.df.empty:
+        return {"load_ms": load_ms, "rows": 0}
+    rng = random.Random(ctx["seed"])
+    names = sorted(provider.df["Vehicle Description"].astype(str).str.strip().unique())
+    days = sorted(provider.df["timestamp"].dt.strftime("%Y-%m-%d").unique())
+    queries = [(rng.choice(names), rng.choice(days)) for _ in range(ctx["queries"])]
+    t0 = time.perf_counter()
+    hits = sum(len(provider.get_events(n, d)) for n, d in queries)
+    return {"load_ms": load_ms, "rows": len(provider.df), "query_ms": _ms(t0, len(queries)), "events": hits}
+
+def bench_ra12(ds, ctx):
+    """Landmark index + lookups, and the full report over the telemetry written by the vehicle_day stage."""
+    import generate_ra12 as ra12
+    ra12.logger.setLevel(logging.ERROR) # The report's coverage warnings are about the data, not speed
+    zones_dir, saved = ds["zones_dir"], (ra12.TELEMETRY_DIR, ra12.OUTPUT_DIR, ra12.ZONES_DIR)
+    out_dir = os.path.join(ctx["work_dir"], "ra12", ds["name"])
+    os.makedirs(out_dir, exist_ok=True)
+    try:
+        ra12.ZONES_DIR = zones_dir
+        t0 = time.perf_counter()
+        index = ra12.LandmarkIndex()
+        index_ms = _ms(t0)
+        rng = random.Random(ctx["seed"])
+        network = ctx["network"]
+        points = [rng.choice(network.node_list) for _ in range(ctx["queries"])]
+        t0 = time.perf_counter()
+        for lon, lat in points:
+            index.get_nearest_address(lat, lon)
+        out = {"index_ms": index_ms, "landmarks": len(index.names), "lookup_ms": _ms(t0, len(points))}
+        if ctx.get("out_dir"):
+            ra12.TELEMETRY_DIR, ra12.OUTPUT_DIR = os.path.join(ctx["out_dir"], "telemetry"), out_dir
+            t0 = time.perf_counter()
+            ra12.generate_report()
+            out["report_ms"] = _ms(t0)
+        return out
+    finally:
+        ra12.TELEMETRY_DIR, ra12.OUTPUT_DIR, ra12.ZONES_DIR = saved
+
+BENCHES = {name: globals()[f"bench_{name}"] for name in STAGES}
+
+def run_dataset(ds, args, work_dir, stages):
+    get_zone_registry().clear()
+    ctx = {"seed": args.seed, "queries": args.queries, "days": args.days, "records": args.records,
+           "date": args.date, "work_dir": work_dir}
+    result = {"dataset": ds["name"], "vehicle": os.path.basename(ds["vehicle"]) if ds["vehicle"] else None, "stages": {}}
+    for stage in ["graph_load"] + [s for s in stages if s != "graph_load"]:
+        logging.info(f"⏱️ {ds['name']}: {stage}")
+        metrics = BENCHES[stage](ds, ctx)
+        if metrics is not None and (stage in stages):
+            result["stages"][stage] = metrics
+    return result
+
+# --- Comparison ---
+
+def _timings(results):
+    """{(dataset, stage, metric path): ms} for every *_ms / *_us metric."""
+    out = {}
+    def walk(prefix, d):
+        for k, v in d.items():
+            if isinstance(v, dict):
+                walk(prefix + (k,), v)
+            elif isinstance(v, (int, float)) and (k.endswith("_ms") or k.endswith("_us")):
+                out[prefix + (k,)] = v
+    for r in results["datasets"]:
+        walk((r["dataset"],), r["stages"])
+    return out
+
+def compare(old, new, threshold):
+    """Rows (key, old, new, ratio) for timings present in both runs, and the keys slower than threshold."""
+    a, b = _timings(old), _timings(new)
+    rows, slower = [], []
+    for key in sorted(set(a) & set(b)):
+        ratio = b[key] / a[key] if a[key] else None
+        rows.append((key, a[key], b[key], ratio))
+        # Sub-millisecond totals are noise; only flag timings that matter
+        if ratio is not None and ratio > threshold and b[key] - a[key] > 0.05:
+            slower.append(key)
+    return rows, slower
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every engine stage on synthetic and bundled zones")
+    parser.add_argument("--zones_dir", default="data/zones")
+    parser.add_argument("--vehicles_dir", default="configs/vehicles")
+    parser.add_argument("--zones", nargs="*", help="Bundled zones to run (default: the --top largest)")
+    parser.add_argument("--top", type=int, default=1, help="Largest N bundled zones (by roads.geojson size); 0 = synthetic only")
+    parser.add_argument("--synthetic_nodes", type=int, default=900, help="Intersections of the generated zone (0 = skip)")
+    parser.add_argument("--synthetic_topology", default="grid", choices=TOPOLOGIES)
+    parser.add_argument("--stages", nargs="*", default=STAGES, choices=STAGES)
+    parser.add_argument("--date", default=DEFAULT_DATE)
+    parser.add_argument("--days", type=int, default=3, help="Vehicle-days for plan_day / vehicle_day")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--records", type=int, default=2000, help="Telemetry records for store_write / nmea_format")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Earlier --json result to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Slowdown ratio reported as a regression")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    work_dir = tempfile.mkdtemp(prefix="vts_bench_")
+    try:
+        datasets = []
+        if args.synthetic_nodes > 0:
+            datasets.append(synthetic_dataset(work_dir, args.synthetic_nodes, args.synthetic_topology, args.date))
+        if args.zones:
+            zone_dirs = [os.path.join(args.zones_dir, z) for z in args.zones]
+        else:
+            files = sorted(glob.glob(os.path.join(args.zones_dir, "*", "roads.geojson")), key=os.path.getsize, reverse=True)
+            zone_dirs = [os.path.dirname(f) for f in files[:args.top]]
+        datasets += [bundled_dataset(z, args.vehicles_dir, args.date) for z in zone_dirs]
+
+        results = {"revision": git_revision(), "created": datetime.now().isoformat(timespec="seconds"),
+                   "python": platform.python_version(), "platform": platform.platform(), "networkx": nx.__version__,
+                   "args": {k: v for k, v in vars(args).items() if k not in ("json", "compare")},
+                   "datasets": [run_dataset(ds, args, work_dir, args.stages) for ds in datasets]}
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    for r in results["datasets"]:
+        print(f"\n📊 {r['dataset']} ({r['vehicle'] or 'no vehicle'})")
+        for stage, metrics in r["stages"].items():
+            print(f"   {stage:<16}{json.dumps(metrics)}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results written to {args.json}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            old = json.load(f)
+        rows, slower = compare(old, results, args.threshold)
+        print(f"\n🔍 vs {old.get('revision')} ({old.get('created')})")
+        print(f"{'timing':<58}{'old':>11}{'new':>11}{'ratio':>8}")
+        for key, a, b, ratio in rows:
+            flag = "  ❌" if key in slower else ""
+            print(f"{'/'.join(key):<58}{a:>11}{b:>11}{(f'{ratio:.2f}' if ratio else '-'):>8}{flag}")
+        if slower:
+            print(f"\n❌ {len(slower)} timing(s) slower than x{args.threshold}")
+            sys.exit(1)
+        print("\n✅ No regressions.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import glob
+import json
+import time
+import random
+import argparse
+import networkx as nx
+
+from vts_core.graph import RoadNetwork
+from vts_core.cch import CCHIndex
+from vts_core.search import SEARCHES
+
+def bench_zone(roads_file, queries, seed):
+    network = RoadNetwork(roads_file)
+    rng = random.Random(seed)
+    pairs = [tuple(rng.sample(network.node_list, 2)) for _ in range(queries)]
+
+    def noise_weight(u, v, d):
+        return d['weight'] * rng.uniform(0.95, 1.05)
+
+    # Baseline: what the engine does per leg today
+    t0 = time.perf_counter()
+    for a, b in pairs:
+        nx.shortest_path(network.graph, a, b, weight=noise_weight)
+    nx_ms = (time.perf_counter() - t0) * 1000 / queries
+
+    t0 = time.perf_counter()
+    cch = CCHIndex(network)
+    prep_ms = (time.perf_counter() - t0) * 1000
+
+    t0 = time.perf_counter()
+    metric = cch.customise(cch.base_weight * [rng.uniform(0.95, 1.05) for _ in range(len(cch.base_weight))])
+    custom_ms = (time.perf_counter() - t0) * 1000
+
+    t0 = time.perf_counter()
+    settled = 0
+    for a, b in pairs:
+        metric.path_nodes(a, b)
+        settled += metric.settled
+    cch_ms = (time.perf_counter() - t0) * 1000 / queries
+
+    # Exactness on the unperturbed metric
+    reference = [nx.shortest_path_length(network.graph, a, b, weight='weight') for a, b in pairs]
+    base = cch.customise()
+    mismatches = sum(
+        abs(nx.path_weight(network.graph, base.path_nodes(a, b), 'weight') - ref) > 1e-6
+        for (a, b), ref in zip(pairs, reference)
+    )
+
+    # Goal-directed / bidirectional searches with the engine's noisy weights, plus settled counts
+    searches = {}
+    for name, search in SEARCHES.items():
+        stats = {}
+        t0 = time.perf_counter()
+        for a, b in pairs:
+            search(network, a, b, noise_weight, stats)
+        ms = (time.perf_counter() - t0) * 1000 / queries
+        bad = sum(
+            abs(nx.path_weight(network.graph, search(network, a, b, 'weight', None), 'weight') - ref) > 1e-6
+            for (a, b), ref in zip(pairs, reference)
+        )
+        searches[name] = {"query_ms": round(ms, 4), "settled_per_query": round(stats["settled"] / queries, 1), "mismatches": bad}
+
+    return {
+        "zone": os.path.basename(os.path.dirname(roads_file)),
+        "nodes": len(network.node_list),
+        "edges": network.graph.number_of_edges(),
+        "cch_shortcuts": cch.num_shortcuts,
+        "cch_preprocess_ms": round(prep_ms, 2),
+        "cch_customise_ms": round(custom_ms, 3),
+        "cch_query_ms": round(cch_ms, 4),
+        "cch_settled_per_query": round(settled / queries, 1),
+        "networkx_query_ms": round(nx_ms, 4),
+        "speedup": round(nx_ms / cch_ms, 1) if cch_ms else None,
+        "mismatches": mismatches,
+        "searches": searches
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark leg routing: networkx Dijkstra vs CCH, A* and bidirectional Dijkstra")
+    parser.add_argument("--zones_dir", default="data/zones")
+    parser.add_argument("--top", type=int, default=3, help="Largest N zone graphs (by roads.geojson size)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    files = sorted(glob.glob(os.path.join(args.zones_dir, "*", "roads.geojson")), key=os.path.getsize, reverse=True)
+    results = [bench_zone(f, args.queries, args.seed) for f in files[:args.top]]
+
+    print(f"\n{'zone':<12}{'nodes':>7}{'shortcuts':>11}{'prep ms':>9}{'cust ms':>9}{'nx ms':>9}{'cch ms':>9}{'x':>7}{'bad':>5}")
+    for r in results:
+        print(f"{r['zone']:<12}{r['nodes']:>7}{r['cch_shortcuts']:>11}{r['cch_preprocess_ms']:>9}{r['cch_customise_ms']:>9}"
+              f"{r['networkx_query_ms']:>9}{r['cch_query_ms']:>9}{r['speedup']:>7}{r['mismatches']:>5}")
+    print(f"\n{'zone':<12}" + "".join(f"{name + ' settled':>22}{'ms':>8}{'bad':>5}" for name in SEARCHES))
+    for r in results:
+        print(f"{r['zone']:<12}" + "".join(f"{s['settled_per_query']:>22}{s['query_ms']:>8}{s['mismatches']:>5}"
+                                          for s in r['searches'].values()))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import glob
+import time
+import argparse
+
+from vts_core.city import build_city_graph, save_city_graph, CITY_GRAPH_FILENAME
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge all zone roads.geojson files into one partitioned city graph")
+    parser.add_argument("--zones_dir", default="data/zones")
+    parser.add_argument("--output", default=os.path.join("data", "city", CITY_GRAPH_FILENAME))
+    args = parser.parse_args()
+
+    zone_roads = {}
+    for roads in sorted(glob.glob(os.path.join(args.zones_dir, "*", "roads.geojson"))):
+        zone_roads[os.path.basename(os.path.dirname(roads))] = roads
+    if not zone_roads:
+        print(f"❌ No roads.geojson found under {args.zones_dir}")
+        return
+
+    print(f"🏙️ Merging {len(zone_roads)} zones: {', '.join(zone_roads)}")
+    t0 = time.time()
+    arrays = build_city_graph(zone_roads)
+    out = save_city_graph(arrays, args.output)
+    print(f"✅ {len(arrays['node_xy'])} nodes, {len(arrays['edge_u'])} roads, "
+          f"{len(arrays['sc_u'])} boundary shortcuts in {time.time() - t0:.1f}s -> {out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import glob
+import yaml
+import argparse
+
+from vts_core.graph import RoadNetwork
+from vts_core.routes import compile_route_library, save_route_library, DEFAULT_ALTERNATIVES
+
+def load_zone_depots(vehicles_dir, zone_name):
+    """imei -> (lat, lon) for vehicles whose config names this zone."""
+    depots = {}
+    if not vehicles_dir or not os.path.isdir(vehicles_dir):
+        return depots
+    for path in sorted(glob.glob(os.path.join(vehicles_dir, "*.yaml"))):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = yaml.safe_load(f) or {}
+        v = data.get("vehicle", data)
+        if (data.get("zone") or {}).get("name") != zone_name or "depot_lat" not in v:
+            continue
+        depots[str(v["imei"])] = (v["depot_lat"], v["depot_lon"])
+    return depots
+
+def compile_zone(zone_dir, templates_root, roads_override=None, vehicles_dir=None, alternatives=DEFAULT_ALTERNATIVES,
+                 weight='weight'):
+    zone_name = os.path.basename(os.path.normpath(zone_dir))
+    roads_file = roads_override or os.path.join(zone_dir, "roads.geojson")
+    if not os.path.exists(roads_file):
+        print(f"Skipping {zone_name}: No roads.geojson (use --roads to compile against another zone's graph).")
+        return None
+
+    network = RoadNetwork(roads_file)
+    library = compile_route_library(
+        network,
+        zone_name,
+        routes_file=os.path.join(zone_dir, "routes.json"),
+        templates_dir=os.path.join(templates_root, zone_name),
+        localities_path=os.path.join(zone_dir, "localities.geojson"),
+        depots=load_zone_depots(vehicles_dir, zone_name),
+        alternatives=alternatives,
+        weight=weight
+    )
+    out = save_route_library(library, zone_dir)
+    print(f"✅ {zone_name}: {len(library['routes'])} routes, {len(library['templates'])} templates, "
+          f"{len(library['depots'])} depots, {len(library['legs'])} legs "
+          f"({sum(len(l['alternatives']) for l in library['legs'].values())} alternatives) -> {out}")
+    return out
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile routes.json + configs/routes templates into per-zone route libraries")
+    parser.add_argument("--zones_dir", default="data/zones")
+    parser.add_argument("--templates_dir", default="configs/routes")
+    parser.add_argument("--zone", help="Only this zone (e.g. SE_Zone)")
+    parser.add_argument("--roads", help="Road graph to compile against (defaults to the zone's roads.geojson)")
+    parser.add_argument("--vehicles_dir", default="configs/vehicles", help="Vehicle configs whose depots get precomputed legs")
+    parser.add_argument("--alternatives", type=int, default=DEFAULT_ALTERNATIVES, help="Diverse paths per leg (incl. the shortest)")
+    parser.add_argument("--travel_time", action="store_true", help="Legs minimise free-flow travel time (for run_batch.py --travel_time)")
+    args = parser.parse_args()
+
+    if args.zone:
+        zone_dirs = [os.path.join(args.zones_dir, args.zone)]
+    else:
+        zone_dirs = sorted(d for d in glob.glob(os.path.join(args.zones_dir, "*")) if os.path.isdir(d))
+
+    for zd in zone_dirs:
+        compile_zone(zd, args.templates_dir, args.roads, args.vehicles_dir, args.alternatives,
+                     'time' if args.travel_time else 'weight')
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ from tqdm import tqdm
 
 # Fix Python path to find vts_core
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vts_core.sinks import geojson_features # Same features as the geojson sink of run_batch.py --sinks
 
 
 def load_info_mapping(vehicles_dir="configs/vehicles"):
@@ -51,8 +52,6 @@ def export_day(parquet_path, output_dir):
         df = pd.read_parquet(parquet_path)
         if df.empty: return
         
-        df = df.sort_values("timestamp")
-        
         # 2. Extract Metadata from filename
         filename = os.path.basename(parquet_path)
         name_parts = filename.replace(".parquet", "").split("_")
@@ -63,27 +62,7 @@ def export_day(parquet_path, output_dir):
         year, month = date_str.split("-")[:2]
         
         # 3. Build GeoJSON Features (Points)
-        features = []
-        for _, row in df.iterrows():
-            ts_str = row['timestamp'].strftime("%Y-%m-%d %H:%M:%S")
-            speed = row.get('speed', 0.0)
-            heading = row.get('heading', 0.0)
-            
-            feat = {
-                "type": "Feature",
-                "properties": {
-                    "timestamp": ts_str,
-                    "speed": f"{speed:.1f} kts",
-                    "heading": f"{heading:.1f}",
-                    "imei": imei,
-                    "vehicle": vehicle_name
-                },
-                "geometry": {
-                    "type": "Point",
-                    "coordinates": [row['lon'], row['lat']]
-                }
-            }
-            features.append(feat)
+        features = geojson_features(df, imei, vehicle_name)
 
         geojson = {
             "type": "FeatureCollection",
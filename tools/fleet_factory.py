@@ -4,10 +4,13 @@ import glob
 import shutil
 import random
 import yaml
-import json
+import sys
 import logging
 from datetime import datetime
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vts_core.geodata import load_localities
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger(__name__)
@@ -38,33 +41,9 @@ def get_zone_center(zone_name):
         return DEFAULT_LAT, DEFAULT_LON
 
     try:
-        with open(localities_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        feats = data.get('features', [])
-        if not feats:
-            return DEFAULT_LAT, DEFAULT_LON
-            
-        lats, lons = [], []
-        for feat in feats:
-            geom = feat.get('geometry', {})
-            coords = geom.get('coordinates', [])
-            if not coords:
-                continue
-            
-            # Rough centroid logic
-            if geom['type'] == 'Point':
-                lons.append(coords[0])
-                lats.append(coords[1])
-            elif geom['type'] == 'Polygon':
-                ring = coords[0]
-                ring_lons = [p[0] for p in ring]
-                ring_lats = [p[1] for p in ring]
-                lons.append(sum(ring_lons) / len(ring_lons))
-                lats.append(sum(ring_lats) / len(ring_lats))
-                
-        if lats and lons:
-            return sum(lats)/len(lats), sum(lons)/len(lons)
+        locs = load_localities(localities_file)
+        if len(locs):
+            return float(locs.lat.mean()), float(locs.lon.mean())
             
     except Exception as e:
         logger.warning(f"Error reading localities for {zone_name}: {e}")
@@ -1,13 +1,11 @@
 
 import os
-import json
 import random
 import glob
 import math
 import pandas as pd
 import numpy as np
 from datetime import datetime
-from shapely.geometry import Point, shape
 from shapely.ops import nearest_points
 import logging
 
@@ -17,6 +15,8 @@ import sys
 # Fix Python path to find vts_core
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from vts_core.geodata import load_localities
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger(__name__)
@@ -62,56 +62,40 @@ REPORT_END = datetime(2024, 4, 26)
 class LandmarkIndex:
     """Builds a spatial index of landmarks for fast lookup."""
     def __init__(self):
-        self.points = []
+        self.lon = np.empty(0)
+        self.lat = np.empty(0)
         self.names = []
         self._load_landmarks()
         
     def _load_landmarks(self):
         logger.info("Loading landmarks from zones...")
         zone_dirs = glob.glob(os.path.join(ZONES_DIR, "*"))
+        lons, lats = [self.lon], [self.lat]
         for zd in zone_dirs:
             if not os.path.isdir(zd): continue
             
-            # Use localities.geojson as landmarks
+            # Use localities.geojson as landmarks (centroids)
             loc_file = os.path.join(zd, "localities.geojson")
             if os.path.exists(loc_file):
                 try:
-                    with open(loc_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    for feat in data.get('features', []):
-                        props = feat.get('properties', {})
-                        name = props.get('name', 'Unknown')
-                        geom = shape(feat['geometry'])
-                        self.points.append(geom.centroid)
-                        self.names.append(name)
+                    locs = load_localities(loc_file)
+                    lons.append(locs.lon)
+                    lats.append(locs.lat)
+                    self.names.extend(name or 'Unknown' for name in locs.names)
                 except Exception as e:
                     pass
         
-        logger.info(f"Loaded {len(self.points)} landmarks.")
+        self.lon = np.concatenate(lons)
+        self.lat = np.concatenate(lats)
+        logger.info(f"Loaded {len(self.names)} landmarks.")
 
     def get_nearest_address(self, lat, lon):
-        if not self.points:
+        if not self.names:
             return "Unknown Location"
             
-        query_pt = Point(lon, lat)
-        
-        # Simple Euclidean nearest search (fast enough for <1000 points)
-        # Using shapely logic: usually one would use STRtree for thousands.
-        # But here we can do a naive min distance.
-        # Optimize: Pre-calculate if needed.
-        
-        min_dist = float('inf')
-        nearest_idx = -1
-        
-        for i, pt in enumerate(self.points):
-            d = query_pt.distance(pt) # Euclidean
-            if d < min_dist:
-                min_dist = d
-                nearest_idx = i
-                
-        if nearest_idx != -1:
-            return self.names[nearest_idx]
-        return "Unknown"
+        # Euclidean nearest centroid, vectorised over all landmarks
+        d = (self.lon - lon) ** 2 + (self.lat - lat) ** 2
+        return self.names[int(np.argmin(d))]
 
 def haversine(lat1, lon1, lat2, lon2):
     R = 6371.0 # Radius of earth in km
@@ -0,0 +1,55 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import time
+import argparse
+
+from vts_core.synthetic import generate_zone, generate_fleet, TOPOLOGIES, SPACING_DEG
+
+# Writes a synthetic city in the project's layout, for scale tests before real data exists:
+#   <out_dir>/zones/<zone>/{roads.geojson, localities.geojson, routes.json}
+#   <out_dir>/vehicles/<PREFIX>_V00001.yaml ...
+# Point tools/bench_engine.py and tools/run_batch.py at it with
+# --zones_dir <out_dir>/zones --vehicles_dir <out_dir>/vehicles.
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic zone (road network, localities, routes) and vehicle fleet")
+    parser.add_argument("--out_dir", required=True)
+    parser.add_argument("--zone", default="SYN_Zone", help="Zone directory name (its prefix names localities, routes and vehicles)")
+    parser.add_argument("--nodes", type=int, default=10000, help="Approximate number of intersections")
+    parser.add_argument("--topology", default="grid", choices=TOPOLOGIES)
+    parser.add_argument("--localities", type=int, default=50)
+    parser.add_argument("--routes", type=int, help="Predefined routes (default: one per 4 localities)")
+    parser.add_argument("--vehicles", type=int, default=100, help="Fleet size (0 = roads only)")
+    parser.add_argument("--depots", type=int, help="Depot count shared by the fleet (default: one per 25 vehicles)")
+    parser.add_argument("--origin", type=float, nargs=2, default=[77.50, 12.90], metavar=("LON", "LAT"))
+    parser.add_argument("--spacing", type=float, default=SPACING_DEG, help="Block size in degrees")
+    parser.add_argument("--start_date", default="2022-01-01", help="Simulation window of the generated vehicles")
+    parser.add_argument("--end_date", default="2024-12-31")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    t0 = time.time()
+    zone_dir = os.path.join(args.out_dir, "zones", args.zone)
+    summary = generate_zone(zone_dir, nodes=args.nodes, topology=args.topology, localities=args.localities,
+                            routes=args.routes, seed=args.seed, origin=tuple(args.origin), spacing=args.spacing)
+    print(f"🛣️ {args.zone}: {summary['nodes']} nodes, {summary['roads']} roads ({args.topology}), "
+          f"{summary['localities']} localities, {summary['routes']} routes")
+
+    vehicles_dir = os.path.join(args.out_dir, "vehicles")
+    fleet = []
+    if args.vehicles > 0:
+        fleet = generate_fleet(vehicles_dir, zone_dir, summary["points"], args.vehicles, depots=args.depots,
+                               seed=args.seed, start_date=args.start_date, end_date=args.end_date)
+        print(f"🚚 {len(fleet)} vehicles -> {vehicles_dir}")
+
+    # Parameters next to the data, so a run can be regenerated
+    manifest = dict(vars(args), **{k: v for k, v in summary.items() if k != "points"})
+    with open(os.path.join(zone_dir, "synthetic.json"), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"✅ Done in {time.time() - t0:.1f}s. Run with --zones_dir {os.path.join(args.out_dir, 'zones')} --vehicles_dir {vehicles_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,10 @@ import os
 import json
 import glob
 import random
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vts_core.geodata import load_localities
 
 def generate_routes():
     base_dir = "data/zones"
@@ -17,33 +21,15 @@ def generate_routes():
             print(f"Skipping {zone_name}: No localities.")
             continue
             
-        with open(loc_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            features = data.get('features', [])
+        locs = load_localities(loc_file)
             
-        if len(features) < 2:
-            print(f"Skipping {zone_name}: Not enough localities ({len(features)}).")
+        if len(locs) < 2:
+            print(f"Skipping {zone_name}: Not enough localities ({len(locs)}).")
             continue
             
-        # Extract centroids
-        points = []
-        names = []
-        for feat in features:
-            props = feat.get('properties', {})
-            geom = feat.get('geometry', {})
-            coords = geom.get('coordinates', [])
-            
-            # Simple centroid calc for Polygon
-            if geom['type'] == 'Polygon':
-                # avg of ring
-                ring = coords[0]
-                lon = sum(p[0] for p in ring) / len(ring)
-                lat = sum(p[1] for p in ring) / len(ring)
-                points.append((lon, lat))
-                names.append(props.get('name', 'Unknown'))
-            elif geom['type'] == 'Point':
-                points.append(coords)
-                names.append(props.get('name', 'Unknown'))
+        # Centroids
+        points = locs.points()
+        names = [name or 'Unknown' for name in locs.names]
                 
         # Generate 15 Routes
         routes = []
@@ -0,0 +1,76 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+
+from vts_core.golden import (parse_options, parse_tolerances, bundled_cases, run_cases, compare_outputs,
+                             format_report, DEFAULT_DATES)
+
+# Golden-output harness: accept a fast path only when it reproduces the output.
+#   python tools/golden_check.py --b "router=cch"                  # default engine vs CCH routing
+#   python tools/golden_check.py --golden golden/ --b ""           # record once, then compare a later tree against it
+#   python tools/golden_check.py --b "congestion=true" --tolerance "speed=0.5,*=1e-6" --text_tolerance 0.01
+# Run from the repo root (vehicle configs and the external log use repo-relative paths).
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare engine output of two configurations on a fixed set of vehicle-days")
+    parser.add_argument("--a", default="", help="Engine options of side A, e.g. \"router=dijkstra\" (default: EngineOptions())")
+    parser.add_argument("--b", default="", help="Engine options of side B")
+    parser.add_argument("--golden", help="Directory holding side A's output: recorded there when missing, reused otherwise")
+    parser.add_argument("--vehicles_dir", default="configs/vehicles")
+    parser.add_argument("--zones_dir", default="data/zones")
+    parser.add_argument("--zones", nargs="*", help="Zones to include (default: every zone with roads)")
+    parser.add_argument("--per_zone", type=int, default=1, help="Vehicles per zone")
+    parser.add_argument("--dates", nargs="*", default=DEFAULT_DATES)
+    parser.add_argument("--tolerance", default="", help="Absolute per-column tolerances, e.g. \"lat=1e-7,lon=1e-7,timestamp=1\" (* = any numeric column)")
+    parser.add_argument("--text_tolerance", type=float, help="Allowed difference of numeric fields in tracker lines (default: byte-for-byte)")
+    parser.add_argument("--work_dir", help="Keep both outputs here (default: a temporary directory, removed afterwards)")
+    parser.add_argument("--report", help="Write the comparison as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Also list files that only match within tolerance")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING, format='%(message)s')
+
+    options_a, options_b = parse_options(args.a), parse_options(args.b)
+    tolerances = parse_tolerances(args.tolerance)
+    cases = bundled_cases(args.vehicles_dir, args.zones_dir, args.dates, args.per_zone, args.zones)
+    if not cases:
+        print("❌ No vehicle-days to run (check --vehicles_dir / --zones_dir / --dates)")
+        sys.exit(2)
+    print(f"🧪 {len(cases)} vehicle-days from {len({c[1] for c in cases})} zones")
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="vts_golden_")
+    try:
+        a_dir = args.golden or os.path.join(work_dir, "a")
+        b_dir = os.path.join(work_dir, "b")
+        if args.golden and os.path.isdir(os.path.join(args.golden, "telemetry")):
+            print(f"   A: golden output in {args.golden}")
+        else:
+            shutil.rmtree(a_dir, ignore_errors=True)
+            t0 = time.perf_counter()
+            drove = run_cases(cases, a_dir, options_a)
+            print(f"   A: {args.a or 'defaults'} -> {drove} drives in {time.perf_counter() - t0:.1f}s")
+        shutil.rmtree(b_dir, ignore_errors=True)
+        t0 = time.perf_counter()
+        drove = run_cases(cases, b_dir, options_b)
+        print(f"   B: {args.b or 'defaults'} -> {drove} drives in {time.perf_counter() - t0:.1f}s")
+
+        report = compare_outputs(a_dir, b_dir, tolerances, args.text_tolerance)
+        print(format_report(report, args.verbose))
+        if args.report:
+            with open(args.report, 'w') as f:
+                json.dump(dict(report, a=args.a, b=args.b, golden=args.golden, tolerances=tolerances,
+                               text_tolerance=args.text_tolerance, cases=cases), f, indent=2)
+            print(f"   Report -> {args.report}")
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    sys.exit(0 if report["ok"] else 1)
+
+if __name__ == "__main__":
+    main()
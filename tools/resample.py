@@ -0,0 +1,54 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import glob
+import argparse
+from tqdm import tqdm
+
+from vts_core.store import SimulationStore
+from vts_core.trajectory import Trajectory
+
+def resample_file(traj_path, store, interval, jitter):
+    traj = Trajectory.load(traj_path)
+    records = traj.resample(interval, jitter)
+    if not records:
+        return 0
+    store.write_telemetry(traj.imei, traj.date, records, vehicle_name=traj.vehicle_name)
+    return len(records)
+
+def main():
+    parser = argparse.ArgumentParser(description="Resample stored trajectories at a new sampling interval (no re-simulation)")
+    parser.add_argument("--input_dir", default="data", help="Run output dir containing trajectories/")
+    parser.add_argument("--output_dir", required=True, help="Where resampled telemetry + tracker logs are written")
+    parser.add_argument("--interval", type=int, required=True, help="Sampling interval in seconds (e.g. 60)")
+    parser.add_argument("--jitter", type=int, default=0, help="+/- seconds of sampling jitter")
+    parser.add_argument("--imei", help="Only this IMEI (optional)")
+    parser.add_argument("--start_date", help="YYYY-MM-DD (optional)")
+    parser.add_argument("--end_date", help="YYYY-MM-DD (optional)")
+    args = parser.parse_args()
+
+    if os.path.abspath(args.input_dir) == os.path.abspath(args.output_dir):
+        print("❌ Output dir must differ from input dir (would overwrite the simulated telemetry).")
+        return
+
+    pattern = os.path.join(args.input_dir, "trajectories", "year=*", "month=*", "*.npz")
+    files = []
+    for f in sorted(glob.glob(pattern)):
+        imei, date_str = os.path.basename(f).replace(".npz", "").split("_")
+        if args.imei and imei != args.imei: continue
+        if args.start_date and date_str < args.start_date: continue
+        if args.end_date and date_str > args.end_date: continue
+        files.append(f)
+
+    print(f"🔁 Resampling {len(files)} vehicle-days at {args.interval}s (±{args.jitter}s)...")
+    store = SimulationStore(base_dir=args.output_dir)
+
+    total = 0
+    for f in tqdm(files, desc="Resampling"):
+        total += resample_file(f, store, args.interval, args.jitter)
+
+    print(f"✅ Wrote {total} records to {args.output_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -5,17 +5,27 @@ root_dir = os.path.dirname(current_dir)
 sys.path.append(root_dir)
 
 import glob
+import time
 import argparse
 from datetime import datetime, timedelta
 from multiprocessing import Pool
 import tqdm
 import json
+import logging
 import traceback
+import pandas as pd
 
 from vts_core.engine import run_simulation_day, generate_parked_day, process_external_only
-from vts_core.config import load_vehicle_config
+from vts_core.config import load_vehicle_config, EngineOptions
 from vts_core.graph import RoadNetwork  # We will load this inside the worker
 from vts_core.store import SimulationStore # For conversion
+from vts_core.pipeline import StreamingStore, DEFAULT_QUEUE_DAYS
+from vts_core.sinks import build_sinks
+from vts_core.zones import get_zone_registry, configure_zone_registry, DEFAULT_ZONE_CACHE_MB
+from vts_core.profiling import (stage, start_profiler, active_profiler, clear_profile_parts, merge_profiles, MODES,
+                                enable_stage_timing, take_stage_times, take_stage_memory, STAGES, MEMORY_MODES)
+from vts_core.memory import rss_mb, available_mb, measure_artifacts, plan_workers
+from vts_core.workers import RecyclingPool
 
 def get_date_range(start_date_str, end_date_str):
     start = datetime.strptime(start_date_str, "%Y-%m-%d")
@@ -23,22 +33,32 @@ def get_date_range(start_date_str, end_date_str):
     delta = end - start
     return [(start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(delta.days + 1)]
 
+def add_stage_metrics(day, times, memory):
+    """Adds stage seconds to a vehicle-day's (a stage can run again, e.g. "write" in post-processing); memory keeps the peak."""
+    for k, v in times.items():
+        day["stage_s"][k] = day["stage_s"].get(k, 0.0) + v
+    for k, v in memory.items():
+        day["mem_mb"][k] = max(day["mem_mb"].get(k, 0.0), v)
+
 def process_vehicle_year(task):
     """
     Simulates a Range of Dates for ONE VEHICLE in a single process.
     This allows loading the Graph only ONCE per vehicle, massive speedup.
     """
-    vehicle_file, zone_dir, calendar_file, start_date, end_date, output_dir = task
+    vehicle_file, zone_dir, calendar_file, start_date, end_date, output_dir, options, queue_days, sinks_spec = task
     
     results = {"D": 0, "S": 0, "E": 0}
+    day_stats = [] # Counters of every simulated day (run_simulation_day)
+    sim_store = None
     
     try:
         # 1. Load Resources ONCE
-        config = load_vehicle_config(vehicle_file)
+        with stage("config_load"):
+            config = load_vehicle_config(vehicle_file)
         roads_file = os.path.join(zone_dir, config.zone_id, "roads.geojson")
         
         if not os.path.exists(roads_file):
-            return f"Error: Road file missing {roads_file}"
+            return f"Error: Road file missing {roads_file}", day_stats
             
         # Load Holiday Calendar
         # Load Holiday Calendar(s)
@@ -90,24 +110,52 @@ def process_vehicle_year(task):
         # 2. Loop through every day of the range
         dates = get_date_range(start_date, end_date)
         processed_dates = []
+        by_date = {} # Counters of the simulated days; post-processing adds its time and bytes
+        
+        # One store per worker task so mission plans are written in batches.
+        # With --pipeline, writer threads produce Parquet, tracker text and plans while the next day simulates.
+        # With --sinks, every listed format is written as the day is stored (no Parquet post-processing).
+        sinks = build_sinks(sinks_spec, output_dir) if sinks_spec else None
+        if queue_days:
+            sim_store = StreamingStore(base_dir=output_dir, enable_legacy_logs=True, sinks=sinks, queue_days=queue_days)
+        else:
+            sim_store = SimulationStore(base_dir=output_dir, enable_legacy_logs=False, sinks=sinks)
+        one_pass = bool(queue_days or sinks)
 
         for date in dates:
             dt = datetime.strptime(date, "%Y-%m-%d")
             
             # Parking Logic (SKIPPED per User Requirement)
             if dt.weekday() == 6 or date in holidays:
-                process_external_only(vehicle_file, date, output_dir)
+                process_external_only(vehicle_file, date, output_dir, store=sim_store if one_pass else None)
                 results["S"] += 1 # Skipped
             else:
                 # Disable legacy logs for speed
-                run_simulation_day(vehicle_file, roads_file, date, output_dir, enable_legacy_logs=False)
+                take_stage_times() # Only this day's stages count towards it
+                take_stage_memory()
+                t0, bytes0 = time.perf_counter(), sim_store.bytes_written
+                stats = run_simulation_day(vehicle_file, roads_file, date, output_dir, enable_legacy_logs=False, options=options, store=sim_store)
+                if stats:
+                    stats.update(wall_s=time.perf_counter() - t0, bytes=sim_store.bytes_written - bytes0, stage_s=take_stage_times(),
+                                 mem_mb=take_stage_memory())
+                    day_stats.append(stats)
+                    by_date[date] = stats
                 processed_dates.append(date) # Track for post-processing
                 results["D"] += 1
+        
+        take_stage_times() # Skipped days after the last drive belong to no vehicle-day
+        with stage("write"):
+            sim_store.close() # Plans, buffered sink output (and with --pipeline, waits for the writers)
+            if queue_days:
+                for day in day_stats:
+                    day["bytes"] = sim_store.bytes_by_day.get((day["imei"], day["date"]), 0)
+        flush_s = take_stage_times().get("write", 0.0) # Reported per task, not charged to a day
+        take_stage_memory()
 
         # 3. Post-Processing Phase (Convert Parquet to Text)
         # This decouples the expensive text I/O from the physics loop
         # We process all valid dates for this vehicle now.
-        if processed_dates:
+        if processed_dates and not one_pass:
             store = SimulationStore(base_dir=output_dir, enable_legacy_logs=False) # Helper instance
             year_map = {} # Cache paths if needed, but simple loop is fine
             
@@ -118,13 +166,107 @@ def process_vehicle_year(task):
                  parquet_path = parquet_dir / f"{config.imei}_{date}.parquet"
                  
                  if parquet_path.exists():
-                     store.generate_legacy_log_from_parquet(parquet_path, config.name, config.imei, date)
+                     take_stage_times() # Only this step counts towards the day
+                     take_stage_memory()
+                     t0, bytes0 = time.perf_counter(), store.bytes_written
+                     with stage("post_process"):
+                         store.generate_legacy_log_from_parquet(parquet_path, config.name, config.imei, date)
+                     if date in by_date:
+                         day = by_date[date]
+                         day["wall_s"] += time.perf_counter() - t0
+                         day["bytes"] += store.bytes_written - bytes0
+                         add_stage_metrics(day, take_stage_times(), take_stage_memory())
         
-        return f"✅ {config.imei}: {results['D']} Drives, {results['S']} Skipped"
+        for day in day_stats:
+            # Round for the metrics stream; time outside the marked stages is "other"
+            day["stage_s"]["other"] = day["wall_s"] - sum(day["stage_s"].values())
+            day["stage_s"] = {k: round(v, 4) for k, v in day["stage_s"].items()}
+            day["wall_s"] = round(day["wall_s"], 4)
+            day["mem_mb"] = {k: round(v, 1) for k, v in day["mem_mb"].items()}
+
+        # Zone artifacts persist across tasks in this worker (see --zone_cache_mb)
+        z = get_zone_registry().stats()
+        rss = rss_mb()
+        return (f"✅ {config.imei}: {results['D']} Drives, {results['S']} Skipped "
+                f"| zones {z['zones']} cached, {z['hits']} hits, {z['misses']} misses, {z['evictions']} evictions"
+                + (f" | rss {rss:.0f} MB" if rss else "")
+                + (f" | flush {flush_s:.2f}s" if flush_s >= 0.005 else "")
+                + (f" | writers blocked {sim_store.wait_s:.2f}s, peak queue {sim_store.peak_depth}" if queue_days else "")), day_stats
         
     except Exception as e:
         traceback.print_exc()
-        return f"❌ Error {vehicle_file}: {e}"
+        return f"❌ Error {vehicle_file}: {e}", day_stats
+    finally:
+        if sim_store is not None:
+            try:
+                sim_store.close() # Buffered sink output and plans of a failed task (and never leave writer threads behind)
+            except Exception:
+                traceback.print_exc()
+        # Profiles leave the worker after every task (pool workers are killed, not exited)
+        if active_profiler():
+            active_profiler().dump()
+
+def init_worker(zone_cache_mb, log_level, profile=None, profile_dir=None, memory=None):
+    configure_zone_registry(zone_cache_mb)
+    enable_stage_timing(memory=memory)
+    logging.basicConfig(level=log_level, format='%(message)s')
+    if profile:
+        start_profiler(profile, profile_dir)
+
+def lost_task(task, reason):
+    # Result for a vehicle whose worker died mid-task (RecyclingPool)
+    return f"❌ Error {task[0]}: {reason}", []
+
+def summarize_days(day_stats):
+    """Per-zone totals of the vehicle-day counters (plus an ALL row)."""
+    df = pd.DataFrame(day_stats)
+    if df.empty:
+        return df
+    df["driving_h"] = df["driving_s"] / 3600.0
+    df["dwell_h"] = df["dwell_s"] / 3600.0
+    agg = {"vehicles": ("imei", "nunique"), "days": ("date", "size"), "km": ("km", "sum"), "planned_km": ("planned_km", "sum"),
+           "stops": ("stops", "sum"), "checkpoints": ("checkpoints", "sum"), "driving_h": ("driving_h", "sum"),
+           "dwell_h": ("dwell_h", "sum"), "records": ("records", "sum")}
+    table = pd.concat([df.groupby("zone").agg(**agg), df.assign(zone="ALL").groupby("zone").agg(**agg)])
+    return table.round(1)
+
+def summarize_metrics(day_stats, elapsed_s, slowest=10):
+    """Throughput of the run, p50/p95 seconds per stage per vehicle-day and the slowest vehicle-days."""
+    df = pd.DataFrame(day_stats)
+    if df.empty:
+        return {"vehicle_days": 0, "elapsed_s": round(elapsed_s, 2)}
+    stage_s = pd.DataFrame(list(df["stage_s"])).fillna(0.0)
+    order = [s for s in STAGES + ("other",) if s in stage_s.columns]
+    stages = {name: {"p50": round(stage_s[name].quantile(0.5), 4), "p95": round(stage_s[name].quantile(0.95), 4),
+                     "total_s": round(stage_s[name].sum(), 2), "share": round(stage_s[name].sum() / max(df["wall_s"].sum(), 1e-9), 3)}
+              for name in order}
+    top = df.nlargest(slowest, "wall_s")[["imei", "zone", "date", "wall_s", "records", "km"]]
+    memory = {}
+    if "mem_mb" in df and df["mem_mb"].map(bool).any():
+        mem = pd.DataFrame(list(df["mem_mb"]))
+        memory = {name: {"p50": round(mem[name].quantile(0.5), 1), "max": round(mem[name].max(), 1)}
+                  for name in STAGES if name in mem.columns}
+    return {
+        "vehicle_days": len(df), "elapsed_s": round(elapsed_s, 2),
+        "vehicle_days_per_s": round(len(df) / elapsed_s, 3), "records": int(df["records"].sum()),
+        "records_per_s": round(df["records"].sum() / elapsed_s, 1), "km": round(df["km"].sum(), 1),
+        "bytes": int(df["bytes"].sum()), "wall_s": {"p50": round(df["wall_s"].quantile(0.5), 4), "p95": round(df["wall_s"].quantile(0.95), 4)},
+        "stages": stages, "memory_mb": memory, "slowest": top.to_dict(orient="records")
+    }
+
+def print_metrics(summary):
+    print(f"\n⏱️ {summary['vehicle_days']} vehicle-days in {summary['elapsed_s']}s: {summary['vehicle_days_per_s']} days/s, "
+          f"{summary['records_per_s']} records/s, {summary['bytes'] / 1e6:.1f} MB written")
+    print(f"   {'stage':<14}{'p50 s':>9}{'p95 s':>9}{'total s':>10}{'share':>8}")
+    for name, m in summary["stages"].items():
+        print(f"   {name:<14}{m['p50']:>9}{m['p95']:>9}{m['total_s']:>10}{m['share'] * 100:>7.1f}%")
+    if summary.get("memory_mb"):
+        print(f"   {'stage':<14}{'p50 MB':>9}{'max MB':>9}")
+        for name, m in summary["memory_mb"].items():
+            print(f"   {name:<14}{m['p50']:>9}{m['max']:>9}")
+    print("   Slowest vehicle-days:")
+    for d in summary["slowest"]:
+        print(f"      {d['wall_s']:>8.3f}s  {d['imei']} {d['date']} ({d['zone']}, {d['records']} records, {d['km']:.1f} km)")
 
 def main():
     parser = argparse.ArgumentParser()
@@ -136,7 +278,41 @@ def main():
     parser.add_argument("--end_date", help="YYYY-MM-DD", default="2023-12-31")
     parser.add_argument("--zone", help="Filter vehicles by Zone ID (e.g. C_Zone)", default=None)
     parser.add_argument("--cores", type=int, default=4)
+    parser.add_argument("--save_trajectory", action="store_true", help="Persist continuous trajectories for tools/resample.py")
+    parser.add_argument("--reuse_plans", action="store_true", help="Skip planning for vehicle-days already in daily_plans")
+    parser.add_argument("--no_plans", action="store_true", help="Do not write mission plans to the metadata DB")
+    parser.add_argument("--zone_cache_mb", type=float, default=DEFAULT_ZONE_CACHE_MB, help="Per-worker memory budget for cached zone graphs/routes")
+    parser.add_argument("--city_graph", help="Merged city graph from tools/build_city_graph.py (cross-zone depots/legs)")
+    parser.add_argument("--router", default="dijkstra", choices=["dijkstra", "astar", "bidirectional", "cch"], help="Path search for noisy legs")
+    parser.add_argument("--route_entropy", type=float, default=0.5, help="Share of compiled legs taking a stored alternative path (0-1)")
+    parser.add_argument("--travel_time", action="store_true", help="Route on road-class travel time and cap speeds per road (needs libraries compiled with --travel_time)")
+    parser.add_argument("--congestion", action="store_true", help="Smooth time-of-day traffic per road class (zone congestion.json or defaults)")
+    parser.add_argument("--log_level", default="WARNING", choices=["DEBUG", "INFO", "WARNING", "ERROR"], help="Engine log level (INFO = every shift start/stop/checkpoint)")
+    parser.add_argument("--stats_csv", help="Write the per vehicle-day counters to this CSV")
+    parser.add_argument("--metrics_jsonl", help="Stream per vehicle-day stage timings and counters to this JSONL file (summary as the last line)")
+    parser.add_argument("--profile", choices=MODES, help="Profile every stage in each worker: cprofile (deterministic) or sample (low overhead, collapsed stacks)")
+    parser.add_argument("--profile_dir", default="profile", help="Merged profiles and profile_report.txt go here")
+    parser.add_argument("--memory", choices=MEMORY_MODES, help="Record peak memory per stage: rss (cheap) or tracemalloc (Python allocations, ~2x slower)")
+    parser.add_argument("--worker_mem_mb", type=float, help="Memory budget per worker: sizes the pool and zone cache from the measured artifacts and recycles workers above it")
+    parser.add_argument("--pipeline", action="store_true", help="Stream each simulated day to Parquet/tracker/plan writer threads instead of converting Parquet to text afterwards")
+    parser.add_argument("--queue_days", type=int, default=DEFAULT_QUEUE_DAYS, help="Vehicle-days each --pipeline writer may have queued before the simulation waits")
+    parser.add_argument("--sinks", help="Output formats written in one pass, e.g. \"parquet,archive,csv,geojson,arrow?flush_rows=100000,udp://127.0.0.1:5005\" (default: Parquet, then tracker text from it)")
+    parser.add_argument("--output_dir", default="data", help="Root for telemetry, tracker logs and the metadata DB (e.g. apart from data/ for synthetic fleets)")
     args = parser.parse_args()
+    logging.basicConfig(level=args.log_level, format='%(message)s')
+    if args.sinks:
+        build_sinks(args.sinks, args.output_dir) # Reject a bad spec before starting workers
+    
+    options = EngineOptions(
+        save_trajectory=args.save_trajectory,
+        save_plans=not args.no_plans,
+        reuse_plans=args.reuse_plans,
+        route_entropy=args.route_entropy,
+        city_graph=args.city_graph,
+        router=args.router,
+        travel_time=args.travel_time,
+        congestion=args.congestion
+    )
     
     all_files = glob.glob(os.path.join(args.vehicles_dir, "*.yaml"))
     vehicle_files = []
@@ -157,7 +333,8 @@ def main():
     
     # Task = One Vehicle (Processing date range)
     tasks = [
-        (v_file, args.zones_dir, args.calendar, args.start_date, args.end_date, "data") 
+        (v_file, args.zones_dir, args.calendar, args.start_date, args.end_date, args.output_dir, options,
+         args.queue_days if args.pipeline else 0, args.sinks)
         for v_file in vehicle_files
     ]
 
@@ -168,14 +345,48 @@ def main():
     # Strictly enforce core count passed by user
     # Avoid 'len(tasks) or 1' unless tasks are fewer than cores
     pool_size = min(args.cores, len(tasks)) if len(tasks) > 0 else 1
+    zone_cache_mb = args.zone_cache_mb
+
+    if args.worker_mem_mb:
+        # Size the pool from what one worker actually keeps resident
+        zone_dirs = set()
+        for vf in vehicle_files:
+            try:
+                zone_dirs.add(os.path.join(args.zones_dir, load_vehicle_config(vf).zone_id))
+            except: pass
+        external_csv = os.path.join("data", "external", "VTS Consolidated Report - Final Dataset.csv") # ExternalLogProvider's default
+        artifacts = measure_artifacts(sorted(zone_dirs), external_csv)
+        plan = plan_workers(args.cores, max(len(tasks), 1), args.worker_mem_mb, artifacts, args.zone_cache_mb, available_mb())
+        pool_size, zone_cache_mb = plan["processes"], plan["zone_cache_mb"]
+        print(f"🧠 Artifacts: base {artifacts['base_mb']} MB, external log {artifacts['external_mb']} MB, "
+              f"zones {sum(artifacts['zones_mb'].values()):.1f} MB (largest {max(artifacts['zones_mb'].values(), default=0.0)} MB)")
+        print(f"   {pool_size} workers x {plan['per_worker_mb']} MB (zone cache {zone_cache_mb} MB, budget {args.worker_mem_mb:.0f} MB)")
     
     total_tasks = len(tasks)
     completed = 0
     
-    with Pool(pool_size) as pool:
+    if args.profile:
+        clear_profile_parts(args.profile_dir)
+
+    metrics = open(args.metrics_jsonl, 'w') if args.metrics_jsonl else None
+    started = time.perf_counter()
+    all_days = []
+    initargs = (zone_cache_mb, args.log_level, args.profile, args.profile_dir, args.memory)
+    if args.worker_mem_mb:
+        pool = RecyclingPool(pool_size, initializer=init_worker, initargs=initargs, budget_mb=args.worker_mem_mb)
+        results = pool.imap_unordered(process_vehicle_year, tasks, lost=lost_task)
+    else:
+        pool = Pool(pool_size, initializer=init_worker, initargs=initargs)
+        results = pool.imap_unordered(process_vehicle_year, tasks)
+    with pool:
         # Use imap_unordered for responsiveness
-        for res in pool.imap_unordered(process_vehicle_year, tasks):
+        for res, day_stats in results:
             completed += 1
+            all_days.extend(day_stats)
+            if metrics:
+                for day in day_stats:
+                    metrics.write(json.dumps(dict(day, type="vehicle_day")) + "\n")
+                metrics.flush()
             
             # Heartbeat Log (Every 5%)
             if total_tasks >= 20 and completed % (total_tasks // 20) == 0:
@@ -187,5 +398,31 @@ def main():
             # Only print errors or final summary? Let's keep existing print(res) for now but maybe squelch if too noisy
             print(res)
 
+    if args.worker_mem_mb:
+        print(f"🧠 Worker peak rss {pool.peak_rss_mb:.0f} MB, {pool.recycled} recycled over budget, {pool.lost} died mid-task")
+
+    # Counters of every simulated vehicle-day, aggregated instead of logged per event
+    summary = summarize_metrics(all_days, time.perf_counter() - started)
+    if metrics:
+        metrics.write(json.dumps(dict(summary, type="summary")) + "\n")
+        metrics.close()
+        print(f"   Metrics stream -> {args.metrics_jsonl}")
+    if all_days:
+        print("\n📊 Simulated days by zone:")
+        print(summarize_days(all_days).to_string())
+        print_metrics(summary)
+        if args.stats_csv:
+            pd.json_normalize(all_days).to_csv(args.stats_csv, index=False)
+            print(f"   Per vehicle-day counters -> {args.stats_csv}")
+
+    if args.profile:
+        report = merge_profiles(args.profile_dir)
+        if report:
+            with open(report, 'r') as f:
+                summary = f.read().split("\n\n")[0]
+            print(f"\n🔬 {summary}\n   Full report: {report}")
+            if args.profile == "sample":
+                print(f"   Flamegraph input: {os.path.join(args.profile_dir, 'profile.collapsed')}")
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
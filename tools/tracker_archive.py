@@ -0,0 +1,116 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+import glob
+import logging
+import argparse
+from pathlib import Path
+
+from vts_core.archive import (CODECS, INDEX_SUFFIX, resolve_codec, append_days, archive_path, index_path,
+                              load_index, extract_day, compact_archive)
+
+# Vehicle-month tracker archives (see vts_core/archive.py):
+#   python tools/tracker_archive.py pack --remove                       # plain tracker/ tree -> archives
+#   python tools/tracker_archive.py extract --vehicle KA01AB1234 --date 2023-03-06 --hours 7 8
+#   python tools/tracker_archive.py compact                             # drop frames of re-written days
+#   python tools/tracker_archive.py stats
+# New runs can write archives directly: run_batch.py --sinks "parquet,archive".
+
+def _plain_months(tracker_root):
+    """{(vehicle, year, month): [day files]} of the plain tree."""
+    months = {}
+    for path in sorted(glob.glob(os.path.join(tracker_root, "*", "*", "*", "*.txt"))):
+        rel = Path(path).relative_to(tracker_root).parts
+        months.setdefault(rel[:3], []).append(path)
+    return months
+
+def _archives(tracker_root):
+    return sorted(p for ext in CODECS.values() for p in Path(tracker_root).glob(f"*/*/*{ext}"))
+
+def pack(args):
+    codec = resolve_codec(args.codec)
+    months = _plain_months(args.tracker_root)
+    if not months:
+        print(f"⚠️ No plain tracker files under {args.tracker_root}")
+        return
+    t0 = time.perf_counter()
+    plain_bytes = packed_bytes = days = 0
+    for (vehicle, year, month), files in months.items():
+        batch = {}
+        for path in files:
+            with open(path, "r") as f:
+                batch[Path(path).stem] = f.readlines()
+            plain_bytes += os.path.getsize(path)
+        archive = archive_path(args.tracker_root, vehicle, f"{year}-{month}-01", codec)
+        packed_bytes += append_days(archive, batch, codec, args.level)
+        days += len(batch)
+        if args.remove:
+            for path in files:
+                os.remove(path)
+            try:
+                os.rmdir(os.path.dirname(files[0]))
+            except OSError:
+                pass
+    ratio = plain_bytes / packed_bytes if packed_bytes else 0
+    print(f"📦 {days} days into {len(months)} {codec} archives in {time.perf_counter() - t0:.1f}s: "
+          f"{plain_bytes / 1e6:.1f} MB -> {packed_bytes / 1e6:.1f} MB ({ratio:.1f}x)")
+
+def extract(args):
+    t0 = time.perf_counter()
+    text = extract_day(args.tracker_root, args.vehicle, args.date, args.hours)
+    if text is None:
+        print(f"❌ No tracker log for {args.vehicle} on {args.date}")
+        sys.exit(1)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+        print(f"✅ {text.count(chr(10))} lines -> {args.out} in {(time.perf_counter() - t0) * 1000:.1f} ms")
+    else:
+        sys.stdout.write(text)
+
+def compact(args):
+    dropped = 0
+    for archive in _archives(args.tracker_root):
+        dropped += compact_archive(archive)
+    print(f"🧹 Compacted {len(_archives(args.tracker_root))} archives, {dropped / 1e6:.2f} MB dropped")
+
+def stats(args):
+    archives = _archives(args.tracker_root)
+    days = size = packed = 0
+    for archive in archives:
+        index = load_index(archive)
+        days += len(index["days"])
+        size += sum(d["size"] for d in index["days"].values())
+        packed += archive.stat().st_size + index_path(archive).stat().st_size
+    print(f"📊 {len(archives)} archives, {days} days, {size / 1e6:.1f} MB plain in {packed / 1e6:.1f} MB "
+          f"({size / packed if packed else 0:.1f}x); {len(_plain_months(args.tracker_root))} vehicle-months still plain")
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack, read and maintain compressed tracker archives")
+    parser.add_argument("--tracker_root", default="data/tracker")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("pack", help="Convert plain day files into vehicle-month archives")
+    p.add_argument("--codec", default="zstd", choices=list(CODECS))
+    p.add_argument("--level", type=int, help="Compression level (default 9)")
+    p.add_argument("--remove", action="store_true", help="Delete the plain files once archived")
+    p.set_defaults(func=pack)
+
+    p = sub.add_parser("extract", help="Print or save one day's plain-text log")
+    p.add_argument("--vehicle", required=True)
+    p.add_argument("--date", required=True)
+    p.add_argument("--hours", type=int, nargs="*", help="Only these hours (0-23)")
+    p.add_argument("--out", help="Write to this file instead of stdout")
+    p.set_defaults(func=extract)
+
+    sub.add_parser("compact", help="Drop frames of re-written days").set_defaults(func=compact)
+    sub.add_parser("stats", help="Compression summary").set_defaults(func=stats)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING, format='%(message)s')
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,10 @@ import argparse
 import os
 import json
 import datetime
-from vts_core.engine import run_simulation_day, generate_parked_day
+import logging
+from vts_core.engine import run_simulation_day, generate_parked_day, process_external_only
+from vts_core.config import EngineOptions
+from vts_core.profiling import start_profiler, clear_profile_parts, merge_profiles, MODES
 
 def is_holiday(date_str, calendar_path):
     """Checks if the date is in the holiday list."""
@@ -41,8 +44,13 @@ def main():
     parser.add_argument("--roads", required=True, help="Path to roads.geojson")
     parser.add_argument("--date", required=True, help="YYYY-MM-DD to simulate")
     parser.add_argument("--calendar", help="Path to holiday JSON file", default=None)
+    parser.add_argument("--save_trajectory", action="store_true", help="Persist continuous trajectory for tools/resample.py")
+    parser.add_argument("--profile", choices=MODES, help="Profile each stage: cprofile (deterministic) or sample (collapsed stacks for flamegraphs)")
+    parser.add_argument("--profile_dir", default="profile", help="Where the per-stage profiles and profile_report.txt go")
     
     args = parser.parse_args()
+    # Single-day runs show every shift start, stop and checkpoint
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     
     # 1. Check Files
     if not os.path.exists(args.vehicle):
@@ -76,11 +84,25 @@ def main():
         print(f"❌ Roads file not found: {args.roads}")
         return
         
-    run_simulation_day(
+    profiler = None
+    if args.profile:
+        clear_profile_parts(args.profile_dir)
+        profiler = start_profiler(args.profile, args.profile_dir)
+
+    stats = run_simulation_day(
             vehicle_config_path=args.vehicle,
             zone_roads_path=args.roads,
-            date=args.date
+            date=args.date,
+            options=EngineOptions(save_trajectory=args.save_trajectory)
         )
 
+    if profiler:
+        profiler.stop()
+        profiler.dump()
+        print(f"🔬 Profile report: {merge_profiles(args.profile_dir)}")
+    if stats:
+        print(f"📊 {stats['km']:.2f} km driven, {stats['stops']} stops, {stats['checkpoints']} checkpoints, "
+              f"{stats['driving_s'] / 3600:.2f} h driving, {stats['records']} records")
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,18 +1,40 @@
 import random
+import bisect
+import logging
+import numpy as np
 from typing import List, Optional, Tuple, Dict
 from shapely.geometry import LineString
 from datetime import datetime, timedelta
 
 from vts_core.config import VehicleConfig
 from vts_core.store import SimulationStore
+from vts_core.trajectory import Trajectory
+from vts_core.speeds import KMH_PER_KNOT, LOCAL
+from vts_core.congestion import CongestionTable
+
+logger = logging.getLogger(__name__)
+
+# Engine time base: integer seconds since local midnight of the simulated day.
+# datetime objects are only materialised when a telemetry record is emitted.
+DAY_END_SECONDS = 23 * 3600 + 59 * 60
+METERS_PER_DEGREE = 111139.0
+
+# Max spacing of time->distance knots while driving (trajectory persistence)
+KNOT_INTERVAL_SECONDS = 30
+
+def format_clock(seconds: int) -> str:
+    """HH:MM:SS for a seconds-since-midnight value (log output only)."""
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{(seconds % 3600) // 60:02d}:{seconds % 60:02d}"
 
 class VehicleAgent:
     def __init__(self, config: VehicleConfig, store: SimulationStore):
         self.config = config
         self.store = store
         
-        # State
-        self.current_time = None
+        # State (Time is int seconds since midnight of `day_start`)
+        self.day_start: Optional[datetime] = None
+        self.t: int = 0
         self.current_location: Tuple[float, float] = (0.0, 0.0)
         self.current_heading: float = 0.0
         self.current_speed: float = 0.0
@@ -22,67 +44,163 @@ class VehicleAgent:
         
         # Route & Plan
         self.path_geometry: Optional[LineString] = None
+        self.path_length_meters: float = 0.0
         self.path_progress_meters: float = 0.0
         self.scheduled_stops: List[Dict] = []
-        self.current_stop_end_time: Optional[datetime] = None
+        self.current_stop_end_s: Optional[int] = None
+        
+        # Road speed caps along the path: run i ends at speed_run_ends[i] meters (empty = vehicle top speed everywhere)
+        self.speed_run_ends: List[float] = []
+        self.speed_run_knots: List[float] = []
+        self.speed_run_groups: List[int] = []
+        
+        # Traffic: the module-level random by default; the engine may hand in a seeded random.Random.
+        # With a congestion table, speed follows the time-of-day factor of the road's group instead.
+        self.rng = random
+        self.congestion: Optional[CongestionTable] = None
+        self.driver_factor: float = 1.0
         
         # Operational Window
         self.shift_start_hour = 9
         self.shift_end_hour = 18
+        self.shift_start_s = 9 * 3600
+        self.shift_end_s = 18 * 3600
         
-        self.shift_end_hour = 18
-        
-        # Hybrid Simulation Checkpoints
-        self.external_events: List[Dict] = []
+        # Hybrid Simulation Checkpoints: (t_seconds, lat, lon), sorted by time
+        self.external_events: List[Tuple[int, float, float]] = []
         
-        self.last_log_time: Optional[datetime] = None
+        self.last_log_s: Optional[int] = None
         self.telemetry_buffer: List[dict] = []
+        
+        # Jump over ticks that cannot change anything while the vehicle stands still
+        self.fast_forward: bool = True
+        
+        # Per-day event counters (see day_stats) and the log level, checked once per day
+        self.stats: Dict[str, int] = {}
+        self.verbose: bool = False
+        
+        # Optional continuous trajectory (time -> path distance knots)
+        self.record_trajectory: bool = False
+        self.trajectory_knots: List[Tuple[int, float]] = []
+        self.checkpoint_log: List[Tuple[int, float, float]] = []
+
+    @property
+    def current_time(self) -> Optional[datetime]:
+        """Wall-clock view of the engine time (not used inside the tick loop)."""
+        if self.day_start is None:
+            return None
+        return self.day_start + timedelta(seconds=self.t)
+
+    @current_time.setter
+    def current_time(self, value: datetime):
+        self.day_start = datetime(value.year, value.month, value.day)
+        self.t = int((value - self.day_start).total_seconds())
+
+    def _to_seconds(self, ts: datetime) -> int:
+        return int((ts - self.day_start).total_seconds())
 
     def start_24h_cycle(self, date_str: str, path_geometry: LineString, 
-                       shift_start: int, shift_end: int, stops: List[Dict] = [], external_events: List[Dict] = []):
-        self.current_time = datetime.strptime(f"{date_str} 00:00:00", "%Y-%m-%d %H:%M:%S")
+                       shift_start: int, shift_end: int, stops: List[Dict] = [], external_events: List[Dict] = [],
+                       speed_profile: Optional[List] = None, road_caps: bool = True, congestion: Optional[CongestionTable] = None):
+        self.day_start = datetime.strptime(date_str, "%Y-%m-%d")
+        self.t = 0
         self.path_geometry = path_geometry
+        self.path_length_meters = path_geometry.length * METERS_PER_DEGREE
         self.scheduled_stops = sorted(stops, key=lambda x: x['at_meter'])
-        self.shift_start_hour = shift_start
-        self.shift_end_hour = shift_end
         
+        # [[end_meter, kmh, road_group], ...] runs from the plan, converted once to knot caps
+        # (road_caps=False keeps the vehicle top speed and only uses the road groups)
+        runs = speed_profile or []
+        top = self.config.max_speed_knots
+        self.speed_run_ends = [r[0] for r in runs]
+        self.speed_run_knots = [min(top, r[1] / KMH_PER_KNOT) if road_caps else top for r in runs]
+        self.speed_run_groups = [r[2] if len(r) > 2 else LOCAL for r in runs]
+        self.congestion = congestion
+        # How briskly this driver moves through traffic today
+        self.driver_factor = self.rng.uniform(0.9, 1.1) if congestion is not None else 1.0
+        
+        # Convert all day boundaries to engine seconds once
         self.shift_start_hour = shift_start
         self.shift_end_hour = shift_end
-        self.external_events = sorted(external_events, key=lambda x: x['timestamp'])
+        self.shift_start_s = shift_start * 3600
+        self.shift_end_s = shift_end * 3600
+        self.current_stop_end_s = None
+        self.external_events = sorted(
+            (self._to_seconds(e['timestamp']), e['lat'], e['lon']) for e in external_events
+        )
         
         start_pt = path_geometry.coords[0]
-        self.current_location = (start_pt[1], start_pt[0])
+        self.start_location = (start_pt[1], start_pt[0])
+        self.current_location = self.start_location
         self.path_progress_meters = 0.0
         
         self.state = "OFF_SHIFT"
         self.is_active = True
+        self.last_log_s = None
         self.telemetry_buffer = []
+        self.trajectory_knots = []
+        self.checkpoint_log = []
+        self.stats = {"stops": 0, "checkpoints": 0, "driving_s": 0, "dwell_s": 0, "records": 0}
+        self.verbose = logger.isEnabledFor(logging.INFO)
+        self._add_knot()
+
+    def _add_knot(self, t: Optional[int] = None, dist: Optional[float] = None):
+        if not self.record_trajectory: return
+        t = self.t if t is None else t
+        dist = self.path_progress_meters if dist is None else dist
+        if self.trajectory_knots:
+            last_t, last_d = self.trajectory_knots[-1]
+            if t < last_t or (t == last_t and dist == last_d): return
+        self.trajectory_knots.append((t, dist))
+
+    def build_trajectory(self) -> Trajectory:
+        self._add_knot()
+        knots = np.array(self.trajectory_knots, dtype=np.float64).reshape(-1, 2)
+        return Trajectory(
+            imei=self.config.imei,
+            date=self.day_start.strftime("%Y-%m-%d"),
+            device_id=self.config.device_id,
+            vehicle_name=self.config.name,
+            shift_start_s=self.shift_start_s,
+            shift_end_s=self.shift_end_s,
+            path=np.asarray(self.path_geometry.coords),
+            knots_t=knots[:, 0],
+            knots_d=knots[:, 1],
+            checkpoints=self.checkpoint_log
+        )
 
     def tick(self):
         if not self.is_active: return
 
         # 1. Increment Time (Fixed Physics Step: 1s)
         # Requirement: High Fidelity Physics (Micro-stepping) to prevent tunneling
+        # Stationary states skip straight to the tick before their next wake-up time
+        if self.fast_forward:
+            wake = self._next_wake_s()
+            if wake is not None and wake > self.t + 1:
+                self.t = wake - 1
         dt_seconds = 1
-        self.current_time += timedelta(seconds=dt_seconds)
+        self.t += dt_seconds
+        prev_state = self.state
+        prev_progress = self.path_progress_meters
         
         # 2. Check End of Day
-        if self.current_time.hour >= 23 and self.current_time.minute >= 59:
+        if self.t >= DAY_END_SECONDS:
             self.is_active = False
 
         # 2.5 Hybrid Injection Check
         # Check if we crossed a checkpoint time
         processed_event = False
         if self.external_events:
-            next_event = self.external_events[0]
+            event_s, event_lat, event_lon = self.external_events[0]
             # strict inequality isn't ideal if steps skip over, so >= is correct for "passed or reached"
-            if self.current_time >= next_event['timestamp']:
+            if self.t >= event_s:
                 # FORCE SNAP
-                print(f"   ⚓ Checkpoint Enforced: {next_event['timestamp'].time()} (Physics Override)")
+                if self.verbose: logger.info(f"   ⚓ Checkpoint Enforced: {format_clock(event_s)} (Physics Override)")
                 
                 # 1. Update State to match Event exactly
-                self.current_time = next_event['timestamp']
-                self.current_location = (next_event['lat'], next_event['lon'])
+                self.t = event_s
+                self.current_location = (event_lat, event_lon)
                 self.current_speed = 0.0 # Checkpoints usually imply a 'ping', often static or just a point.
                 
                 # 2. Record it immediately (Bypass shift filters?) - Requirement says FORCE telemetry packet.
@@ -90,6 +208,8 @@ class VehicleAgent:
                 
                 # 3. Clean up
                 self.external_events.pop(0)
+                self.checkpoint_log.append((event_s, event_lat, event_lon))
+                self.stats["checkpoints"] += 1
                 processed_event = True
                 
                 # 4. Update Path Progress? 
@@ -108,20 +228,21 @@ class VehicleAgent:
                     from shapely.geometry import Point
                     p_point = Point(self.current_location[1], self.current_location[0]) # Lon, Lat
                     # project returns distance along line
-                    self.path_progress_meters = self.path_geometry.project(p_point) * 111139.0
+                    self._add_knot(event_s, prev_progress)
+                    self.path_progress_meters = self.path_geometry.project(p_point) * METERS_PER_DEGREE
+                    self._add_knot()
 
         # 3. State Machine (Skip if we just forced a checkpoint event? Maybe not, logic needs to run to set state for next tick)
-        hour = self.current_time.hour
+        t = self.t
         
-        if hour < self.shift_start_hour:
+        if t < self.shift_start_s:
             self.state = "OFF_SHIFT"
             self.current_speed = 0.0
-            start_pt = self.path_geometry.coords[0]
-            self.current_location = (start_pt[1], start_pt[0])
+            self.current_location = self.start_location
             
-        elif self.shift_start_hour <= hour < self.shift_end_hour:
+        elif t < self.shift_end_s:
             if self.state == "OFF_SHIFT":
-                print(f"   ☀️ Shift Start: {self.current_time.time()}")
+                if self.verbose: logger.info(f"   ☀️ Shift Start: {format_clock(t)}")
                 self.state = "DRIVING"
             
             if self.state == "ROUTE_FINISHED":
@@ -135,43 +256,94 @@ class VehicleAgent:
             if self.state != "OFF_SHIFT":
                 self.state = "OFF_SHIFT"
             self.current_speed = 0.0
+        
+        # Trajectory knots: bracket every state change, and sample while driving
+        if self.record_trajectory:
+            if self.state != prev_state:
+                self._add_knot(self.t - 1, prev_progress)
+                self._add_knot()
+            elif self.state == "DRIVING" and self.t - self.trajectory_knots[-1][0] >= KNOT_INTERVAL_SECONDS:
+                self._add_knot()
             
         # Check logging interval
         self._check_and_log_telemetry()
 
+    def _next_wake_s(self) -> Optional[int]:
+        """
+        While stationary (off shift, dwelling, route finished): the next time a tick can
+        change state or emit a record (shift start/end, stop end, sample time, checkpoint,
+        end of day). None while driving or when every tick matters.
+        """
+        t = self.t
+        if self.state == "OFF_SHIFT":
+            if t < self.shift_start_s:
+                wake = self.shift_start_s # Nothing is logged before the shift
+            elif t >= self.shift_end_s:
+                wake = DAY_END_SECONDS
+            else:
+                return None
+        elif self.state in ("DWELLING", "ROUTE_FINISHED") and t < self.shift_end_s:
+            if self.last_log_s is None:
+                return None
+            wake = min(self.shift_end_s, self.last_log_s + self.config.sampling_interval_seconds)
+            if self.state == "DWELLING":
+                wake = min(wake, self.current_stop_end_s)
+        else:
+            return None
+        if self.external_events:
+            wake = min(wake, self.external_events[0][0])
+        return min(wake, DAY_END_SECONDS)
+
     def _check_and_log_telemetry(self):
         # Always log if buffer is empty and active (first point)? 
         # Or typically: if current_time - last_log >= interval
         
-        if not self.last_log_time:
+        if self.last_log_s is None:
             self._record_telemetry()
             return
 
-        interval = self.config.sampling_interval_seconds
-        if (self.current_time - self.last_log_time).total_seconds() >= interval:
+        if self.t - self.last_log_s >= self.config.sampling_interval_seconds:
              self._record_telemetry()
 
     def _handle_dwelling(self):
         self.current_speed = 0.0
-        if self.current_time >= self.current_stop_end_time:
-            print(f"   🔄 Resuming from stop at {self.current_time.time()}")
+        if self.t >= self.current_stop_end_s:
+            if self.verbose: logger.info(f"   🔄 Resuming from stop at {format_clock(self.t)}")
             self.state = "DRIVING"
-            self.current_stop_end_time = None
+            self.current_stop_end_s = None
+
+    def _run_index(self) -> int:
+        """Speed run under the current progress (-1 without a profile)."""
+        if not self.speed_run_ends:
+            return -1
+        return min(bisect.bisect_right(self.speed_run_ends, self.path_progress_meters), len(self.speed_run_ends) - 1)
+
+    def _top_speed_knots(self) -> float:
+        """Vehicle top speed, capped by the free-flow speed of the road at the current progress."""
+        i = self._run_index()
+        return self.config.max_speed_knots if i < 0 else self.speed_run_knots[i]
 
     def _handle_driving(self, dt_seconds: int):
         # --- TRAFFIC LOGIC ---
-        # Simulate heavy traffic: Only use 15-55% of top speed
-        traffic_congestion = random.uniform(0.15, 0.55)
-        
-        # 10% chance of a clear road (up to 80% speed)
-        if random.random() < 0.1:
-            traffic_congestion = random.uniform(0.6, 0.8)
+        if self.congestion is not None:
+            # Smooth time-of-day traffic on this road's group (no per-second noise)
+            i = self._run_index()
+            group = LOCAL if i < 0 else self.speed_run_groups[i]
+            top_speed = self.config.max_speed_knots if i < 0 else self.speed_run_knots[i]
+            target_speed_knots = top_speed * self.congestion.factor(group, self.t) * self.driver_factor
+        else:
+            # Simulate heavy traffic: Only use 15-55% of top speed
+            traffic_congestion = self.rng.uniform(0.15, 0.55)
+            
+            # 10% chance of a clear road (up to 80% speed)
+            if self.rng.random() < 0.1:
+                traffic_congestion = self.rng.uniform(0.6, 0.8)
 
-        target_speed_knots = self.config.max_speed_knots * traffic_congestion
-        
-        # Add slight jitter so speed isn't robotic
-        target_speed_knots += random.uniform(-1.0, 1.0)
-        if target_speed_knots < 0: target_speed_knots = 0.0
+            target_speed_knots = self._top_speed_knots() * traffic_congestion
+            
+            # Add slight jitter so speed isn't robotic
+            target_speed_knots += self.rng.uniform(-1.0, 1.0)
+            if target_speed_knots < 0: target_speed_knots = 0.0
         
         speed_mps = target_speed_knots * 0.514444
         move_dist = speed_mps * dt_seconds
@@ -185,36 +357,38 @@ class VehicleAgent:
                 self.current_speed = 0.0
                 self.state = "DWELLING"
                 
-                duration = random.randint(next_stop.get('duration_min', 15), next_stop.get('duration_max', 45))
-                self.current_stop_end_time = self.current_time + timedelta(minutes=duration)
+                duration = self.rng.randint(next_stop.get('duration_min', 15), next_stop.get('duration_max', 45))
+                self.current_stop_end_s = self.t + duration * 60
                 self.scheduled_stops.pop(0)
-                print(f"   🛑 Stop at {self.current_time.time()} for {duration} min.")
+                self.stats["stops"] += 1
+                self.stats["dwell_s"] += min(duration * 60, max(self.shift_end_s - self.t, 0)) # Stops end with the shift
+                if self.verbose: logger.info(f"   🛑 Stop at {format_clock(self.t)} for {duration} min.")
                 self._update_position_on_path()
                 return
 
         # --- MOVE ---
+        self.stats["driving_s"] += dt_seconds
         self.path_progress_meters += move_dist
         self.current_speed = target_speed_knots
         
         # Check End of Route
-        path_len_meters = self.path_geometry.length * 111139.0
-        if self.path_progress_meters >= path_len_meters:
-            self.path_progress_meters = path_len_meters
+        if self.path_progress_meters >= self.path_length_meters:
+            self.path_progress_meters = self.path_length_meters
             self.state = "ROUTE_FINISHED"
             self.current_speed = 0.0
-            print(f"   🏁 Route Finished at {self.current_time.time()}. Waiting for shift end.")
+            if self.verbose: logger.info(f"   🏁 Route Finished at {format_clock(self.t)}. Waiting for shift end.")
             
         self._update_position_on_path()
 
     def _update_position_on_path(self):
-        distance_deg = self.path_progress_meters / 111139.0
+        distance_deg = self.path_progress_meters / METERS_PER_DEGREE
         if distance_deg > self.path_geometry.length:
             distance_deg = self.path_geometry.length
 
         pt = self.path_geometry.interpolate(distance_deg)
         self.current_location = (pt.y, pt.x)
         
-        next_dist = distance_deg + (5.0 / 111139.0)
+        next_dist = distance_deg + (5.0 / METERS_PER_DEGREE)
         pt_next = self.path_geometry.interpolate(next_dist)
         from vts_core.geo import calculate_bearing_shapely
         self.current_heading = calculate_bearing_shapely(pt, pt_next)
@@ -224,8 +398,9 @@ class VehicleAgent:
         if not force and self.state == "OFF_SHIFT":
             return
 
+        # Output boundary: the only place engine seconds become a datetime
         rec = {
-            "timestamp": self.current_time,
+            "timestamp": self.day_start + timedelta(seconds=self.t),
             "lat": self.current_location[0],
             "lon": self.current_location[1],
             "speed": self.current_speed,
@@ -233,7 +408,14 @@ class VehicleAgent:
             "device_id": self.config.device_id
         }
         self.telemetry_buffer.append(rec)
-        self.last_log_time = self.current_time
+        self.stats["records"] += 1
+        self.last_log_s = self.t
+        if not force:
+            self._add_knot()
+
+    def day_stats(self) -> Dict:
+        """Counters of the simulated day: stops, checkpoints, driving/dwell seconds, records and km driven."""
+        return dict(self.stats, km=round(self.path_progress_meters / 1000.0, 3))
 
     def flush_memory(self):
         if not self.telemetry_buffer: return
@@ -244,6 +426,9 @@ class VehicleAgent:
         date_str = self.telemetry_buffer[0]['timestamp'].strftime("%Y-%m-%d")
         self.store.write_telemetry(self.config.imei, date_str, self.telemetry_buffer, vehicle_name=self.config.name)
         self.telemetry_buffer = []
+        
+        if self.record_trajectory and self.path_geometry is not None:
+            self.store.write_trajectory(self.config.imei, date_str, self.build_trajectory())
 
     def inject_external_logs(self, events: List[Dict]):
         """
@@ -260,4 +445,4 @@ class VehicleAgent:
                 "device_id": self.config.device_id
             }
             self.telemetry_buffer.append(rec)
-            print(f"   💉 Injected External Log: {rec['timestamp'].time()}")
\ No newline at end of file
+            logger.debug(f"   💉 Injected External Log: {rec['timestamp'].time()}")
\ No newline at end of file
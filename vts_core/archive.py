@@ -0,0 +1,218 @@
+import os
+import gzip
+import json
+import logging
+import tempfile
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+# Compressed tracker archives (written by the "archive" sink of vts_core.sinks):
+# one file per vehicle-month next to the plain tree,
+#   tracker/{vehicle}/{YYYY}/{MM}.txt.gz (or .txt.zst)   one compressed frame per day
+#   tracker/{vehicle}/{YYYY}/{MM}.idx.json               day -> frame offset/length,
+#                                                         hour -> byte range inside the day
+# Frames are independent gzip members / zstd frames, so a day is read with one
+# seek and one small decompress, and `zcat`/`zstdcat` of the archive still gives
+# plain text. Re-written days are appended and the index points at the newest
+# frame; compact_archive() drops the stale ones. zstd needs the zstandard
+# package, gzip is the fallback.
+#
+# Several batch workers can write one vehicle-month (the _A/_B configs of a
+# vehicle share its name), so writers hold an exclusive lock on {MM}.lock while
+# they append and rewrite the index.
+
+CODECS = {"gzip": ".txt.gz", "zstd": ".txt.zst"}
+INDEX_SUFFIX = ".idx.json"
+LOCK_SUFFIX = ".lock"
+
+def _zstd():
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        return None
+
+def resolve_codec(codec: str = "zstd") -> str:
+    if codec not in CODECS:
+        raise ValueError(f"Unknown codec {codec!r} (expected one of {', '.join(CODECS)})")
+    if codec == "zstd" and _zstd() is None:
+        logger.warning("⚠️ zstandard is not installed; tracker archives use gzip")
+        return "gzip"
+    return codec
+
+def compress(data: bytes, codec: str, level: int = None) -> bytes:
+    if codec == "zstd":
+        return _zstd().ZstdCompressor(level=level or 9).compress(data)
+    return gzip.compress(data, compresslevel=level or 9, mtime=0)
+
+def decompress(frame: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return _zstd().ZstdDecompressor().decompress(frame)
+    return gzip.decompress(frame)
+
+def archive_path(tracker_root, vehicle_name: str, date_str: str, codec: str) -> Path:
+    year, month, _ = date_str.split("-")
+    return Path(tracker_root) / vehicle_name / year / f"{month}{CODECS[codec]}"
+
+def index_path(archive) -> Path:
+    archive = Path(archive)
+    return archive.with_name(archive.name.split(".")[0] + INDEX_SUFFIX)
+
+def lock_path(archive) -> Path:
+    archive = Path(archive)
+    return archive.with_name(archive.name.split(".")[0] + LOCK_SUFFIX)
+
+@contextmanager
+def _locked(archive):
+    """Exclusive lock of the vehicle-month across processes (blocks until free)."""
+    path = lock_path(archive)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError: # LK_LOCK gives up after ~10 s
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+def _hour_ranges(lines: List[str]) -> Dict[str, List[int]]:
+    """Hour ("07") -> [start, end) byte range of its lines; the hour is read from the packet id (yymmddHHMMSS)."""
+    hours, pos = {}, 0
+    for line in lines:
+        n = len(line.encode())
+        parts = line.split(",", 3)
+        hour = parts[2][6:8] if len(parts) > 2 and len(parts[2]) >= 8 else "??"
+        span = hours.setdefault(hour, [pos, pos])
+        span[1] = pos + n
+        pos += n
+    return hours
+
+def load_index(archive) -> Dict:
+    path = index_path(archive)
+    if not path.exists():
+        return {"codec": None, "days": {}}
+    with open(path, "r") as f:
+        return json.load(f)
+
+def _save_index(archive, index: Dict):
+    """Atomic rewrite of the index (callers hold the archive lock)."""
+    path = index_path(archive)
+    fd, tmp = tempfile.mkstemp(prefix=path.name + ".", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(index, f, indent=1, sort_keys=True)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+def append_days(archive, days: Dict[str, List[str]], codec: str, level: int = None) -> int:
+    """
+    Appends one frame per day ({date: ["line\\n", ...]}) to the archive and updates
+    its index. Returns the bytes written (frames + index).
+    """
+    archive = Path(archive)
+    # Compress outside the lock; only the append and the index update are serialised
+    frames = {date: compress("".join(days[date]).encode(), codec, level) for date in sorted(days)}
+    with _locked(archive):
+        index = load_index(archive)
+        if index["codec"] not in (None, codec):
+            raise ValueError(f"{archive} is {index['codec']}, not {codec}")
+        index["codec"] = codec
+        written = 0
+        with open(archive, "ab") as f:
+            f.seek(0, os.SEEK_END)
+            for date, frame in frames.items():
+                index["days"][date] = {"offset": f.tell(), "length": len(frame), "size": sum(len(l.encode()) for l in days[date]),
+                                       "lines": len(days[date]), "hours": _hour_ranges(days[date])}
+                f.write(frame)
+                written += len(frame)
+        _save_index(archive, index)
+        return written + index_path(archive).stat().st_size
+
+class TrackerArchive:
+    """Reader of one vehicle-month archive."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.index = load_index(self.path)
+        if not self.index["days"]:
+            raise FileNotFoundError(f"No tracker archive index for {self.path}")
+        self.codec = self.index["codec"]
+
+    def days(self) -> List[str]:
+        return sorted(self.index["days"])
+
+    def _frame(self, date: str) -> bytes:
+        entry = self.index["days"].get(date)
+        if entry is None:
+            raise KeyError(f"{date} is not in {self.path}")
+        with open(self.path, "rb") as f:
+            f.seek(entry["offset"])
+            return decompress(f.read(entry["length"]), self.codec)
+
+    def read_day(self, date: str, hours: List[int] = None) -> str:
+        """The day's plain-text log, or only the given hours of it."""
+        data = self._frame(date)
+        if hours is None:
+            return data.decode()
+        spans = self.index["days"][date]["hours"]
+        return "".join(data[spans[h][0]:spans[h][1]].decode() for h in (f"{int(h):02d}" for h in sorted(hours)) if h in spans)
+
+def extract_day(tracker_root, vehicle_name: str, date_str: str, hours: List[int] = None) -> Optional[str]:
+    """A day's tracker text from the plain tree or, failing that, the vehicle-month archive (None if neither has it)."""
+    year, month, _ = date_str.split("-")
+    plain = Path(tracker_root) / vehicle_name / year / month / f"{date_str}.txt"
+    if plain.exists() and hours is None:
+        return plain.read_text()
+    for codec in CODECS:
+        archive = archive_path(tracker_root, vehicle_name, date_str, codec)
+        if index_path(archive).exists() and archive.exists():
+            reader = TrackerArchive(archive)
+            if date_str in reader.index["days"]:
+                return reader.read_day(date_str, hours)
+    if plain.exists():
+        lines = plain.read_text().splitlines(keepends=True)
+        wanted = {f"{int(h):02d}" for h in hours}
+        return "".join(l for l in lines if l.split(",", 3)[2][6:8] in wanted)
+    return None
+
+def compact_archive(archive) -> int:
+    """Rewrites the archive with only the indexed frames, in day order. Returns the bytes dropped."""
+    archive = Path(archive)
+    with _locked(archive):
+        index = load_index(archive)
+        before = archive.stat().st_size
+        fd, tmp = tempfile.mkstemp(prefix=archive.name + ".", suffix=".tmp", dir=archive.parent)
+        with open(archive, "rb") as src, os.fdopen(fd, "wb") as dst:
+            for date in sorted(index["days"]):
+                entry = index["days"][date]
+                src.seek(entry["offset"])
+                frame = src.read(entry["length"])
+                entry["offset"] = dst.tell()
+                dst.write(frame)
+        os.replace(tmp, archive)
+        _save_index(archive, index)
+        return before - archive.stat().st_size
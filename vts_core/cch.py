@@ -0,0 +1,212 @@
+import heapq
+import numpy as np
+import networkx as nx
+from typing import Dict, List
+
+# Customisable contraction hierarchy (CCH) over a RoadNetwork's two-way roads.
+#
+# Preprocessing depends only on the graph topology: nodes are eliminated in
+# min-degree order and each eliminated node's higher neighbours are joined into
+# a clique (shortcut edges). Customisation takes one weight per road and fills
+# in shortcut weights bottom-up through the lower triangles, one vectorised
+# pass per elimination level. Queries walk the elimination tree upwards from
+# both ends, so a per-day perturbed metric costs one customisation and every
+# query afterwards is a few hundred dict operations.
+
+INF = float('inf')
+
+class CCHIndex:
+    def __init__(self, network):
+        nodes = list(network.graph.nodes)
+        index = {node: i for i, node in enumerate(nodes)}
+        self.nodes = nodes
+        self.node_index = index
+        n = len(nodes)
+
+        # Undirected roads (both directions share one weight)
+        road_u, road_v, road_w, road_t = [], [], [], []
+        adj = [set() for _ in range(n)]
+        for u, v, d in network.graph.edges(data=True):
+            a, b = index[u], index[v]
+            if a < b:
+                road_u.append(a); road_v.append(b); road_w.append(d['weight']); road_t.append(d.get('time', d['weight']))
+                adj[a].add(b); adj[b].add(a)
+        self.road_u = np.array(road_u, dtype=np.int64)
+        self.road_v = np.array(road_v, dtype=np.int64)
+        self.base_weight = np.array(road_w, dtype=np.float64)
+        self.base_time = np.array(road_t, dtype=np.float64) # Free-flow seconds (TravelTimeNetwork)
+
+        # 1. Min-degree elimination: order + upward neighbourhoods (with fill-in)
+        rank = np.full(n, -1, dtype=np.int64)
+        up: List[List[int]] = [None] * n
+        heap = [(len(adj[v]), v) for v in range(n)]
+        heapq.heapify(heap)
+        r = 0
+        while heap:
+            deg, v = heapq.heappop(heap)
+            if rank[v] >= 0 or deg != len(adj[v]): continue
+            rank[v] = r; r += 1
+            nbrs = list(adj[v])
+            up[v] = nbrs
+            for i, a in enumerate(nbrs):
+                adj[a].discard(v)
+                for b in nbrs[i + 1:]:
+                    if b not in adj[a]:
+                        adj[a].add(b); adj[b].add(a)
+            for a in nbrs:
+                heapq.heappush(heap, (len(adj[a]), a))
+        self.rank = rank
+
+        # 2. CCH edges (lower -> higher), sorted upward neighbourhoods, elimination tree
+        edge_id: Dict[tuple, int] = {}
+        self.up_arcs: List[List[tuple]] = [None] * n
+        self.parent = [-1] * n
+        for v in range(n):
+            ups = sorted(up[v], key=lambda u: rank[u])
+            arcs = []
+            for u in ups:
+                edge_id[(v, u)] = len(edge_id)
+                arcs.append((edge_id[(v, u)], u))
+            self.up_arcs[v] = arcs
+            if ups: self.parent[v] = ups[0]
+        self.edge_lo = np.array([k[0] for k in edge_id], dtype=np.int64)
+        self.edge_hi = np.array([k[1] for k in edge_id], dtype=np.int64)
+        self.road_edge = np.array([edge_id[(a, b) if rank[a] < rank[b] else (b, a)]
+                                   for a, b in zip(road_u, road_v)], dtype=np.int64)
+
+        # 3. Lower triangles (v, a, b) with v below a below b, grouped by customisation level
+        level = np.zeros(n, dtype=np.int64)
+        tri = [], [], [], []
+        for v in np.argsort(rank):
+            arcs = self.up_arcs[v]
+            for i, (e1, a) in enumerate(arcs):
+                level[a] = max(level[a], level[v] + 1)
+                for e2, b in arcs[i + 1:]:
+                    tri[0].append(e1); tri[1].append(e2); tri[2].append(edge_id[(a, b)]); tri[3].append(level[v])
+        t1, t2, t3, t_level = (np.array(t, dtype=np.int64) for t in tri)
+        by_level = np.argsort(t_level, kind='stable')
+        t1, t2, t3, t_level = t1[by_level], t2[by_level], t3[by_level], t_level[by_level]
+        bounds = np.flatnonzero(np.diff(t_level)) + 1
+        self._levels = [(t1[s], t2[s], t3[s]) for s in np.split(np.arange(len(t1)), bounds) if len(s)]
+
+        # Lower triangles per edge, for unpacking shortcuts
+        by_edge = np.argsort(t3, kind='stable')
+        self._tri_lower = (t1[by_edge].tolist(), t2[by_edge].tolist(), self.edge_lo[t1[by_edge]].tolist())
+        self._tri_offsets = np.searchsorted(t3[by_edge], np.arange(len(edge_id) + 1)).tolist()
+        self._edge_lo = self.edge_lo.tolist()
+
+    @property
+    def num_shortcuts(self) -> int:
+        return len(self.edge_lo) - len(self.road_edge)
+
+    def customise(self, road_weights=None) -> "CCHMetric":
+        """Metric for one weight per road (road_u/road_v order); defaults to the base lengths."""
+        road_weights = self.base_weight if road_weights is None else np.asarray(road_weights, dtype=np.float64)
+        w = np.full(len(self.edge_lo), INF)
+        w[self.road_edge] = road_weights
+        direct = w.copy()
+        for e1, e2, e3 in self._levels:
+            np.minimum.at(w, e3, w[e1] + w[e2])
+        return CCHMetric(self, w.tolist(), direct.tolist())
+
+class CCHMetric:
+    """A customised CCH: shortcut weights for one road metric."""
+    def __init__(self, index: CCHIndex, weights: List[float], direct: List[float]):
+        self.index = index
+        self.w = weights
+        self.direct = direct
+        self.settled = 0 # Nodes scanned by the last query
+
+    def _upward(self, s):
+        dist, pred = {s: 0.0}, {s: None}
+        w, arcs, parent = self.w, self.index.up_arcs, self.index.parent
+        v, scanned = s, 0
+        while v != -1:
+            dv = dist.get(v)
+            if dv is not None:
+                scanned += 1
+                for e, u in arcs[v]:
+                    nd = dv + w[e]
+                    if nd < dist.get(u, INF):
+                        dist[u] = nd
+                        pred[u] = (v, e)
+            v = parent[v]
+        return dist, pred, scanned
+
+    def _unpack(self, a, b, e, out):
+        """Appends the road node path a -> b (exclusive of a) of CCH edge e to out."""
+        if self.w[e] == self.direct[e]:
+            out.append(b)
+            return
+        t1, t2, lows = self.index._tri_lower
+        offs = self.index._tri_offsets
+        lo = self.index._edge_lo[e]
+        for k in range(offs[e], offs[e + 1]):
+            if self.w[t1[k]] + self.w[t2[k]] == self.w[e]:
+                x = lows[k]
+                # Triangle (x, lo, hi): e1 joins x-lo, e2 joins x-hi
+                e_a, e_b = (t1[k], t2[k]) if a == lo else (t2[k], t1[k])
+                self._unpack(a, x, e_a, out)
+                self._unpack(x, b, e_b, out)
+                return
+        raise RuntimeError("CCH shortcut without a supporting triangle")
+
+    def query(self, s: int, t: int) -> List[int]:
+        """Shortest path between node indices s and t (list of indices). Raises nx.NetworkXNoPath."""
+        if s == t:
+            return [s]
+        ds, ps, n1 = self._upward(s)
+        dt, pt, n2 = self._upward(t)
+        self.settled = n1 + n2
+        best, meet = INF, None
+        for v, d in ds.items():
+            if v in dt and d + dt[v] < best:
+                best, meet = d + dt[v], v
+        if meet is None:
+            raise nx.NetworkXNoPath(f"No path between {s} and {t}")
+
+        def chain(pred, v):
+            out = []
+            while pred[v] is not None:
+                u, e = pred[v]
+                out.append((u, v, e))
+                v = u
+            return out[::-1] # From the search root (s or t) up to v
+
+        path = [s]
+        for u, v, e in chain(ps, meet):
+            self._unpack(u, v, e, path)
+        for u, v, e in reversed(chain(pt, meet)):
+            self._unpack(v, u, e, path)
+        return path
+
+    def path_nodes(self, start_node, end_node) -> List:
+        nodes, index = self.index.nodes, self.index.node_index
+        return [nodes[i] for i in self.query(index[start_node], index[end_node])]
+
+def get_cch(network) -> CCHIndex:
+    """The network's CCH index, built on first use and kept on the network (cached with it in the zone registry)."""
+    network = getattr(network, "city", network) # Zone views share their city's index
+    cch = getattr(network, "_cch", None)
+    if cch is None:
+        cch = network._cch = CCHIndex(network)
+    return cch
+
+class PerturbedNetwork:
+    """
+    A vehicle-day view of a network: every road gets one noise factor for the
+    day (seeded), customised once into a CCH metric. Path queries use that metric,
+    so weight functions passed by callers are ignored.
+    """
+    def __init__(self, network, rng, low: float = 0.95, high: float = 1.05):
+        self.network = network
+        cch = get_cch(network)
+        base = cch.base_time if network.weight_attr == "time" else cch.base_weight
+        np_rng = np.random.default_rng(rng.getrandbits(64))
+        self.metric = cch.customise(base * np_rng.uniform(low, high, len(base)))
+
+    def shortest_path_nodes(self, start_node, end_node, weight=None, attr=None):
+        return self.metric.path_nodes(start_node, end_node)
+
+    def __getattr__(self, name):
+        return getattr(self.network, name)
@@ -0,0 +1,319 @@
+import os
+import json
+import numpy as np
+import networkx as nx
+from typing import Dict, List, Optional
+
+from vts_core.graph import RoadNetwork
+from vts_core.geodata import load_roads
+from vts_core.search import bidirectional_dijkstra_path
+from vts_core.speeds import free_flow_kmh, road_groups, travel_seconds, DEFAULT_KMH, LOCAL
+
+CITY_GRAPH_FILENAME = "city_graph.npz"
+ACCESS_CACHE_SIZE = 256
+
+def build_city_graph(zone_roads: Dict[str, str]) -> Dict[str, np.ndarray]:
+    """
+    Merges zone roads.geojson files ({zone: path}, in partition order) into one
+    deduplicated graph and returns the arrays written by save_city_graph.
+
+    - Nodes use the same 5-decimal rounding as RoadNetwork; a node belongs to the
+      partition of the first zone whose roads touch it.
+    - A road joining two already-connected nodes is dropped (zones overlap at borders).
+    - Per zone, the connected component holding most of the zone's nodes is kept.
+    - Boundary nodes (with an edge into another partition) get shortcut edges: the
+      shortest in-partition path between every pair of boundary nodes of a partition,
+      and the fastest one (sc_time*, at free-flow speeds) for travel-time searches.
+    - Each road keeps its free-flow speed and congestion group (edge_kmh, edge_group).
+    """
+    zones = list(zone_roads)
+    node_ids, node_part = {}, []
+    seen = set()
+    e_u, e_v, e_w, e_kmh, e_group, seg_start, seg_count = [], [], [], [], [], [], []
+    chunks, base = [], 0
+
+    for p, zone in enumerate(zones):
+        roads = load_roads(zone_roads[zone])
+        starts = roads.coords[roads.offsets[:-1]].tolist()
+        ends = roads.coords[roads.offsets[1:] - 1].tolist()
+        lengths = (roads.lengths * 111139.0).tolist()
+        kmh = free_flow_kmh(roads.properties).tolist()
+        groups = road_groups(roads.properties).tolist()
+        for i, (s, e, length) in enumerate(zip(starts, ends, lengths)):
+            ends_idx = []
+            for node in ((round(s[0], 5), round(s[1], 5)), (round(e[0], 5), round(e[1], 5))):
+                if node not in node_ids:
+                    node_ids[node] = len(node_ids)
+                    node_part.append(p)
+                ends_idx.append(node_ids[node])
+            a, b = ends_idx
+            key = (a, b) if a < b else (b, a)
+            if a == b or key in seen: continue
+            seen.add(key)
+            e_u.append(a); e_v.append(b); e_w.append(length); e_kmh.append(kmh[i]); e_group.append(groups[i])
+            seg_start.append(base + int(roads.offsets[i]))
+            seg_count.append(int(roads.offsets[i + 1] - roads.offsets[i]))
+        chunks.append(roads.coords)
+        base += len(roads.coords)
+
+    node_part = np.array(node_part, dtype=np.int16)
+    undirected = nx.Graph()
+    undirected.add_nodes_from(range(len(node_ids)))
+    undirected.add_edges_from(zip(e_u, e_v))
+
+    # Keep each zone's main component (components may span several zones)
+    keep = set()
+    components = list(nx.connected_components(undirected))
+    for p in range(len(zones)):
+        best = max(components, key=lambda c: sum(1 for n in c if node_part[n] == p), default=set())
+        if any(node_part[n] == p for n in best):
+            keep |= best
+
+    old_nodes = np.array(sorted(keep), dtype=np.int64)
+    remap = np.full(len(node_ids), -1, dtype=np.int64)
+    remap[old_nodes] = np.arange(len(old_nodes))
+    node_xy = np.array(list(node_ids.keys()), dtype=np.float64).reshape(-1, 2)[old_nodes]
+
+    e_u, e_v = np.array(e_u, dtype=np.int64), np.array(e_v, dtype=np.int64)
+    kept = remap[e_u] >= 0
+    counts = np.array(seg_count, dtype=np.int64)[kept]
+    starts = np.array(seg_start, dtype=np.int64)[kept]
+    offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+    seg = np.repeat(np.arange(len(counts)), counts)
+    all_coords = np.concatenate(chunks) if chunks else np.empty((0, 2))
+    coords = all_coords[starts[seg] + np.arange(counts.sum()) - offsets[:-1][seg]]
+
+    edge_u, edge_v = remap[e_u[kept]], remap[e_v[kept]]
+    edge_w = np.array(e_w, dtype=np.float64)[kept]
+    edge_kmh = np.array(e_kmh, dtype=np.float64)[kept]
+    partition = node_part[old_nodes]
+
+    sc = _boundary_shortcuts(edge_u, edge_v, edge_w, travel_seconds(edge_w, edge_kmh), partition, len(zones))
+    return dict(
+        zones=np.array(json.dumps(zones)),
+        node_xy=node_xy, node_partition=partition,
+        coords=coords, geom_offsets=offsets,
+        edge_u=edge_u.astype(np.int32), edge_v=edge_v.astype(np.int32), edge_weight=edge_w,
+        edge_kmh=edge_kmh, edge_group=np.array(e_group, dtype=np.int8)[kept],
+        **sc
+    )
+
+def _boundary_shortcuts(edge_u, edge_v, edge_w, edge_t, partition, n_parts):
+    cross = partition[edge_u] != partition[edge_v]
+    boundary = np.unique(np.concatenate((edge_u[cross], edge_v[cross])))
+
+    sc_u, sc_v, sc_w, path_nodes, path_offsets = [], [], [], [], [0]
+    sc_t, time_nodes, time_offsets = [], [], [0]
+    for p in range(n_parts):
+        inside = ~cross & (partition[edge_u] == p)
+        g = nx.Graph()
+        g.add_edges_from((a, b, {"weight": w, "time": t}) for a, b, w, t in zip(
+            edge_u[inside].tolist(), edge_v[inside].tolist(), edge_w[inside].tolist(), edge_t[inside].tolist()))
+        b_nodes = [int(b) for b in boundary if partition[b] == p and b in g]
+        targets = set(b_nodes)
+        for b in b_nodes:
+            dist, paths = nx.single_source_dijkstra(g, b, weight="weight")
+            secs, fast = nx.single_source_dijkstra(g, b, weight="time")
+            for t in targets:
+                # Paths are symmetric: store each pair once (b < t)
+                if t <= b or t not in dist: continue
+                sc_u.append(b); sc_v.append(t); sc_w.append(dist[t]); sc_t.append(secs[t])
+                path_nodes.extend(paths[t])
+                path_offsets.append(len(path_nodes))
+                time_nodes.extend(fast[t])
+                time_offsets.append(len(time_nodes))
+
+    return dict(
+        sc_u=np.array(sc_u, dtype=np.int32), sc_v=np.array(sc_v, dtype=np.int32),
+        sc_weight=np.array(sc_w, dtype=np.float64),
+        sc_path=np.array(path_nodes, dtype=np.int32), sc_offsets=np.array(path_offsets, dtype=np.int64),
+        sc_time=np.array(sc_t, dtype=np.float64),
+        sc_time_path=np.array(time_nodes, dtype=np.int32), sc_time_offsets=np.array(time_offsets, dtype=np.int64)
+    )
+
+def save_city_graph(arrays: Dict[str, np.ndarray], path: str) -> str:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    np.savez_compressed(path, **arrays)
+    return path
+
+class CityNetwork(RoadNetwork):
+    """
+    Merged road graph of all zones (built by tools/build_city_graph.py).
+
+    Behaves like a RoadNetwork; paths between nodes of the same partition only
+    expand that partition's edges, other paths run over the overlay of boundary
+    shortcuts and cross-partition edges. Use zone_view() to plan one zone's
+    missions on the city graph.
+    """
+    def __init__(self, path: str):
+        print(f"   Loading City Graph from {path}...")
+        with np.load(path) as data:
+            arrays = {k: data[k] for k in data.files}
+        self.partitions: List[str] = json.loads(str(arrays["zones"]))
+        self.node_xy = arrays["node_xy"]
+        self.node_partition = arrays["node_partition"]
+        self.coords = arrays["coords"]
+        self.geom_offsets = arrays["geom_offsets"]
+        self.localities = []
+
+        self.node_list = [tuple(xy) for xy in self.node_xy.tolist()]
+        self.node_index = {n: i for i, n in enumerate(self.node_list)}
+        self._part = dict(zip(self.node_list, self.node_partition.tolist()))
+        self._partition_graphs: Dict[int, nx.DiGraph] = {}
+        self._access_cache: Dict = {} # node -> in-partition search to the boundary (depots, sites repeat)
+
+        nodes = self.node_list
+        u, v = arrays["edge_u"].tolist(), arrays["edge_v"].tolist()
+        # Geometry i is road i, so per-road arrays double as per-geometry arrays
+        self.geom_length_m = arrays["edge_weight"]
+        self.geom_kmh = arrays["edge_kmh"] if "edge_kmh" in arrays else np.full(len(u), DEFAULT_KMH)
+        self.geom_group = arrays["edge_group"] if "edge_group" in arrays else np.full(len(u), LOCAL, dtype=np.int8)
+        w = self.geom_length_m.tolist()
+        t = travel_seconds(self.geom_length_m, self.geom_kmh).tolist()
+        self.graph = nx.DiGraph()
+        self.graph.add_nodes_from(nodes)
+        self.graph.add_edges_from((nodes[a], nodes[b], {"weight": l, "time": s, "geom": i, "reverse": False})
+                                  for i, (a, b, l, s) in enumerate(zip(u, v, w, t)))
+        self.graph.add_edges_from((nodes[b], nodes[a], {"weight": l, "time": s, "geom": i, "reverse": True})
+                                  for i, (a, b, l, s) in enumerate(zip(u, v, w, t)))
+
+        # Overlay: boundary shortcuts (both directions) + edges crossing partitions.
+        # A shortcut's 'weight'/'via' is the shortest path, its 'time'/'time_via' the fastest.
+        self.overlay = nx.DiGraph()
+        offs, flat = arrays["sc_offsets"], arrays["sc_path"]
+        # Graphs built before fastest shortcuts existed: time along the shortest path
+        t_offs, t_flat = arrays.get("sc_time_offsets", offs), arrays.get("sc_time_path", flat)
+        sc_time = arrays["sc_time"].tolist() if "sc_time" in arrays else None
+        for k, (a, b, l) in enumerate(zip(arrays["sc_u"].tolist(), arrays["sc_v"].tolist(), arrays["sc_weight"].tolist())):
+            via = [nodes[j] for j in flat[offs[k]:offs[k + 1]].tolist()]
+            time_via = [nodes[j] for j in t_flat[t_offs[k]:t_offs[k + 1]].tolist()]
+            s = sc_time[k] if sc_time is not None else sum(self.graph[x][y]["time"] for x, y in zip(time_via, time_via[1:]))
+            self.overlay.add_edge(nodes[a], nodes[b], weight=l, time=s, via=via, time_via=time_via)
+            self.overlay.add_edge(nodes[b], nodes[a], weight=l, time=s, via=via[::-1], time_via=time_via[::-1])
+        for a, b in zip(u, v):
+            if self._part[nodes[a]] != self._part[nodes[b]]:
+                d = self.graph[nodes[a]][nodes[b]]
+                for x, y in ((nodes[a], nodes[b]), (nodes[b], nodes[a])):
+                    self.overlay.add_edge(x, y, weight=d["weight"], time=d["time"], via=[x, y], time_via=[x, y])
+        print(f"   City Graph Ready: {len(self.partitions)} partitions, {len(nodes)} nodes, "
+              f"{self.graph.number_of_edges()} edges, {self.overlay.number_of_edges()} overlay edges.")
+
+    def partition_of(self, node) -> int:
+        return self._part[node]
+
+    def _get_nearest_node(self, point_coords):
+        if not len(self.node_xy):
+            return None
+        d = (self.node_xy[:, 0] - point_coords[1]) ** 2 + (self.node_xy[:, 1] - point_coords[0]) ** 2
+        return self.node_list[int(np.argmin(d))]
+
+    def partition_graph(self, p: int) -> nx.DiGraph:
+        """Edges inside partition p only, built on first use (zone queries never see other partitions)."""
+        g = self._partition_graphs.get(p)
+        if g is None:
+            nodes = [self.node_list[i] for i in np.flatnonzero(self.node_partition == p)]
+            g = self._partition_graphs[p] = self.graph.subgraph(nodes).copy()
+        return g
+
+    def shortest_path_nodes(self, start_node, end_node, weight='weight', attr='weight'):
+        p_s, p_t = self._part[start_node], self._part[end_node]
+        if p_s == p_t:
+            try:
+                return nx.shortest_path(self.partition_graph(p_s), start_node, end_node, weight=weight)
+            except nx.NetworkXNoPath:
+                pass # May still connect through a neighbouring partition
+        attr = weight if isinstance(weight, str) else attr
+        return self._overlay_path(start_node, end_node, weight, p_s, p_t, attr)
+
+    def _boundary_access(self, node, p, attr='weight'):
+        """(predecessors, {boundary node: distance}) of an in-partition search from node; cached per node and attribute."""
+        cached = self._access_cache.get((node, attr))
+        if cached is None:
+            pred, dist = nx.dijkstra_predecessor_and_distance(self.partition_graph(p), node, weight=attr)
+            cached = (pred, {b: d for b, d in dist.items() if b in self.overlay})
+            if len(self._access_cache) >= ACCESS_CACHE_SIZE:
+                self._access_cache.pop(next(iter(self._access_cache)))
+            self._access_cache[(node, attr)] = cached
+        return cached
+
+    def _overlay_path(self, start_node, end_node, weight, p_s, p_t, attr='weight'):
+        """
+        start -> boundary of its partition -> overlay -> boundary of the target partition -> end.
+        Searched on the overlay itself: the query's hops from start and into end are layered
+        on top (_OverlayHops) instead of copying the overlay per query.
+        """
+        preds, first, last = {}, None, None
+        if start_node not in self.overlay:
+            preds[start_node], dist = self._boundary_access(start_node, p_s, attr)
+            first = {b: {attr: d} for b, d in dist.items()}
+        if end_node not in self.overlay:
+            # Two-way roads: the reversed path from end is a path to end
+            preds[end_node], dist = self._boundary_access(end_node, p_t, attr)
+            last = {b: {attr: d} for b, d in dist.items()}
+        hops = _OverlayHops(self.overlay, start_node, first, end_node, last)
+        via_key = "time_via" if attr == "time" else "via" # Shortcut paths that minimise attr
+
+        hop_nodes = bidirectional_dijkstra_path(hops, start_node, end_node, weight=weight)
+        path = [start_node]
+        for a, b in zip(hop_nodes, hop_nodes[1:]):
+            via = hops._succ[a][b].get(via_key)
+            if via is None:
+                root, other = (a, b) if a in preds else (b, a)
+                via = _walk_back(preds[root], other)
+                via = via[::-1] if root == a else via
+            path.extend(via[1:])
+        return path
+
+    def zone_view(self, zone: str, localities: list = None) -> "ZoneView":
+        return ZoneView(self, zone, localities)
+
+class _HopAdjacency:
+    """
+    One direction of _OverlayHops: the overlay's adjacency, except that `own` (start
+    for successors, end for predecessors) has only its query hops, and the boundary
+    nodes reached by the other end's hops gain that hop.
+    """
+    def __init__(self, adj, own, own_hops, other, other_hops):
+        self.adj, self.own, self.own_hops = adj, own, own_hops
+        self.other, self.other_hops = other, other_hops or {}
+
+    def __getitem__(self, u):
+        if u == self.own and self.own_hops is not None:
+            return self.own_hops
+        nbrs = self.adj.get(u, {})
+        if u in self.other_hops:
+            return {**nbrs, self.other: self.other_hops[u]} # Degree-sized, not overlay-sized
+        return nbrs
+
+class _OverlayHops:
+    """Graph-like view (_succ/_pred, as read by vts_core.search) of the overlay plus one query's start and end hops."""
+    def __init__(self, overlay, start, first, end, last):
+        # first: start -> boundary hops (None if start is on the overlay); last: boundary -> end hops
+        self._succ = _HopAdjacency(overlay._succ, start, first, end, last)
+        self._pred = _HopAdjacency(overlay._pred, end, last, start, first)
+
+def _walk_back(pred: Dict, node) -> List:
+    """Path from a Dijkstra root to `node`, following first predecessors, listed from node to root."""
+    out = [node]
+    while pred[out[-1]]:
+        out.append(pred[out[-1]][0])
+    return out
+
+class ZoneView:
+    """
+    One zone of a CityNetwork: random sites are drawn from the zone's own nodes
+    and localities, while snapping and paths use the whole city graph (so depots
+    outside the zone and cross-zone legs work).
+    """
+    def __init__(self, city: CityNetwork, zone: str, localities: list = None):
+        self.city = city
+        self.zone = zone
+        p = city.partitions.index(zone)
+        self.node_list = [city.node_list[i] for i in np.flatnonzero(city.node_partition == p)]
+        self.localities = localities or []
+
+    def __getattr__(self, name):
+        return getattr(self.city, name)
+
+def load_city_graph(path: str) -> Optional[CityNetwork]:
+    return CityNetwork(path) if os.path.exists(path) else None
@@ -13,6 +13,20 @@ class VehicleConfig:
     sampling_interval_seconds: int = 25 # Default if missing
     enabled: bool = True
     simulation_window: dict = None
+    route_templates: list = None # Template ids from configs/routes (e.g. RT_SE_01)
+
+@dataclass
+class EngineOptions:
+    """Run-level switches for the simulation engine (not per vehicle)."""
+    save_trajectory: bool = False # Persist time->distance knots for later resampling
+    save_plans: bool = True # Write each planned mission to the daily_plans table
+    reuse_plans: bool = False # Skip planning when daily_plans already has the vehicle-day
+    use_route_library: bool = True # Use the zone's compiled route_library.json when present
+    route_entropy: float = 0.5 # 0 = always the base path, 1 = always a stored alternative
+    city_graph: str = None # Merged city graph (tools/build_city_graph.py) for cross-zone depots/legs
+    router: str = "dijkstra" # "astar" / "bidirectional" (vts_core.search), or "cch": per-day road noise in a contraction hierarchy
+    travel_time: bool = False # Route on free-flow travel time and cap driving speed by road class (vts_core.speeds)
+    congestion: bool = False # Time-of-day traffic per road class (vts_core.congestion) instead of per-second random speeds
 
 def load_vehicle_config(yaml_path: str) -> VehicleConfig:
     with open(yaml_path, "r", encoding="utf-8") as f:
@@ -41,7 +55,8 @@ def load_vehicle_config(yaml_path: str) -> VehicleConfig:
             max_speed_knots=float(v_data.get("max_speed_knots", 25.0)),
             sampling_interval_seconds=int(s_data.get("sampling_interval_seconds", 25)),
             enabled=bool(v_data.get("enabled", True)),
-            simulation_window=data.get("simulation_window", {})
+            simulation_window=data.get("simulation_window", {}),
+            route_templates=(data.get("routes") or {}).get("templates", [])
         )
         
     # 2. Handle "Flat" Structure (Legacy format)
@@ -0,0 +1,92 @@
+import os
+import json
+import hashlib
+import numpy as np
+from datetime import datetime
+from typing import Dict, List
+
+from vts_core.speeds import ROAD_GROUPS
+
+# Time-of-day congestion: for every road group a table of speed factors (share of
+# the free-flow / top speed actually driven) in 5-minute bins over the day.
+# A zone's curves come from DEFAULT_CURVES, optionally overridden by the zone's
+# congestion.json; each day adds seeded noise that is smoothed over ~30 minutes,
+# so traffic drifts instead of jumping every second. Factors between bins are
+# interpolated linearly (bin centres), which keeps speed continuous in time.
+
+BIN_SECONDS = 300
+BINS_PER_DAY = 24 * 3600 // BIN_SECONDS
+CONGESTION_FILENAME = "congestion.json"
+
+# base: factor on an empty road; peaks: [centre hour, width (std, hours), depth]
+DEFAULT_CURVES = {
+    "arterial": {"base": 0.75, "peaks": [[9.5, 1.0, 0.40], [13.5, 1.5, 0.10], [18.5, 1.2, 0.45]]},
+    "collector": {"base": 0.70, "peaks": [[9.5, 1.2, 0.30], [13.5, 1.5, 0.10], [18.5, 1.5, 0.35]]},
+    "local": {"base": 0.60, "peaks": [[9.0, 1.5, 0.20], [18.0, 2.0, 0.20]]},
+}
+DEFAULT_NOISE = 0.06 # Std of the day's smoothed noise (factor units)
+NOISE_SMOOTHING_BINS = 6 # Gaussian kernel std of the noise (6 bins = 30 minutes)
+WEEKEND_RELIEF = 0.5 # Share of peak depth left on Saturdays / Sundays
+MIN_FACTOR, MAX_FACTOR = 0.08, 0.95
+
+def load_congestion_config(zone_dir: str) -> Dict:
+    """{"curves": {group: curve}, "noise": std}: the defaults with the zone's congestion.json (same shape) applied on top."""
+    config = {"curves": {g: dict(c) for g, c in DEFAULT_CURVES.items()}, "noise": DEFAULT_NOISE}
+    path = os.path.join(zone_dir, CONGESTION_FILENAME)
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for group, curve in (data.get("curves") or {}).items():
+            if group in config["curves"]:
+                config["curves"][group].update(curve)
+        config["noise"] = data.get("noise", DEFAULT_NOISE)
+    return config
+
+def _curve(curve: Dict, weekend: bool) -> np.ndarray:
+    hours = (np.arange(BINS_PER_DAY) + 0.5) * BIN_SECONDS / 3600.0
+    factor = np.full(BINS_PER_DAY, curve["base"])
+    relief = WEEKEND_RELIEF if weekend else 1.0
+    for centre, width, depth in curve.get("peaks", []):
+        factor -= relief * depth * np.exp(-0.5 * ((hours - centre) / width) ** 2)
+    return factor
+
+def _smooth_noise(np_rng, std: float) -> np.ndarray:
+    k = np.arange(-3 * NOISE_SMOOTHING_BINS, 3 * NOISE_SMOOTHING_BINS + 1)
+    kernel = np.exp(-0.5 * (k / NOISE_SMOOTHING_BINS) ** 2)
+    kernel /= np.sqrt((kernel ** 2).sum()) # Keeps the smoothed noise at unit variance
+    white = np_rng.standard_normal(BINS_PER_DAY + len(k) - 1)
+    return std * np.convolve(white, kernel, mode='valid')
+
+class CongestionTable:
+    """One day of speed factors: `factors[group, bin]` (float32, ROAD_GROUPS order)."""
+    def __init__(self, factors: np.ndarray):
+        self.factors = np.asarray(factors, dtype=np.float32)
+        # Bin-centre samples padded at both ends so lookups interpolate over the whole day
+        self._padded = np.concatenate((self.factors[:, :1], self.factors, self.factors[:, -1:]), axis=1).astype(np.float64)
+        self._rows: List[List[float]] = self._padded.tolist()
+
+    def factor(self, group: int, t: float) -> float:
+        """Factor for one road group at t seconds since midnight (scalar path for the tick loop)."""
+        x = t / BIN_SECONDS + 0.5 # Position in the padded row
+        i = min(max(int(x), 0), BINS_PER_DAY)
+        f = x - i
+        row = self._rows[group]
+        return row[i] + (row[i + 1] - row[i]) * min(max(f, 0.0), 1.0)
+
+    def factors_at(self, groups, t) -> np.ndarray:
+        """Vectorised factor(): groups and t (seconds) broadcast against each other."""
+        groups, t = np.broadcast_arrays(np.asarray(groups, dtype=np.int64), np.asarray(t, dtype=np.float64))
+        x = np.clip(t / BIN_SECONDS + 0.5, 0.0, BINS_PER_DAY + 1.0)
+        i = np.minimum(x.astype(np.int64), BINS_PER_DAY)
+        lo, hi = self._padded[groups, i], self._padded[groups, np.minimum(i + 1, BINS_PER_DAY + 1)]
+        return lo + (hi - lo) * (x - i)
+
+def build_congestion_table(config: Dict, zone: str, date_str: str) -> CongestionTable:
+    """The zone's table for one day; noise is seeded by zone + date, so every vehicle of the zone sees the same traffic."""
+    seed = int(hashlib.sha256(f"congestion_{zone}_{date_str}".encode('utf-8')).hexdigest(), 16) % (2 ** 63)
+    np_rng = np.random.default_rng(seed)
+    weekend = datetime.strptime(date_str, "%Y-%m-%d").weekday() >= 5
+    factors = np.empty((len(ROAD_GROUPS), BINS_PER_DAY))
+    for g, group in enumerate(ROAD_GROUPS):
+        factors[g] = _curve(config["curves"][group], weekend) + _smooth_noise(np_rng, config["noise"])
+    return CongestionTable(np.clip(factors, MIN_FACTOR, MAX_FACTOR))
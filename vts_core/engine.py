@@ -6,11 +6,23 @@ import json
 import hashlib
 import networkx as nx
 import math
+import logging
 
-from vts_core.config import load_vehicle_config
+from vts_core.config import load_vehicle_config, EngineOptions
 from vts_core.store import SimulationStore
 from vts_core.graph import RoadNetwork
 from vts_core.agent import VehicleAgent
+from vts_core.zones import get_zone_registry
+from vts_core.cch import PerturbedNetwork
+from vts_core.search import SearchNetwork, SEARCHES
+from vts_core.speeds import TravelTimeNetwork
+from vts_core.congestion import build_congestion_table
+from vts_core.profiling import stage
+
+logger = logging.getLogger(__name__)
+
+# Share of compiled legs that leave the base path for one of the stored alternatives
+DEFAULT_ROUTE_ENTROPY = 0.5
 
 def get_seeded_rng(identifier: str, date_str: str) -> random.Random:
     """
@@ -27,74 +39,48 @@ def find_stochastic_path(network, start_coords, end_coords, rng):
     Finds a path between coords with stochastic edge weights using the provided RNG.
     Returns (LineString, Distance_Meters).
     """
+    path_nodes = find_stochastic_leg(network, start_coords, end_coords, rng)
+    if path_nodes is None:
+        return None, 0
+        
+    coords, total_len = network.assemble_path(path_nodes)
+    return LineString(coords) if len(coords) > 1 else None, total_len
+
+def find_stochastic_leg(network, start_coords, end_coords, rng):
+    """Snaps both (lat, lon) ends to the graph and returns the noisy node path, or None."""
     start_node = network._get_nearest_node(start_coords) # Lat, Lon
     end_node = network._get_nearest_node(end_coords)
     
     if not start_node or not end_node: 
-        return None, 0
+        return None
 
     if start_node == end_node:
-        return None, 0
+        return None
+
+    return find_stochastic_path_nodes(network, start_node, end_node, rng)
 
+def find_stochastic_path_nodes(network, start_node, end_node, rng):
+    """Node path between two graph nodes under +/- 5% per-edge noise (on length, or travel time), or None."""
+    attr = network.weight_attr
     # Define weight function with noise
     def noise_weight(u, v, d):
-        base_weight = d.get('weight', 1.0)
+        base_weight = d.get(attr, 1.0)
         # Add +/- 5% noise
         noise = rng.uniform(0.95, 1.05)
         return base_weight * noise
 
     try:
-        # Use networkx with custom weight function
-        path_nodes = nx.shortest_path(network.graph, start_node, end_node, weight=noise_weight)
+        # Use networkx with custom weight function (city graphs route across partitions)
+        return network.shortest_path_nodes(start_node, end_node, weight=noise_weight, attr=attr)
     except nx.NetworkXNoPath:
-        return None, 0
-        
-    coords = []
-    total_len = 0
-    
-    for i in range(len(path_nodes) - 1):
-        u = path_nodes[i]
-        v = path_nodes[i+1]
-        data = network.graph.get_edge_data(u, v)
-        
-        # Use actual weight for distance calculation, not noisy one
-        edge_len = data.get('weight', 0)
-        total_len += edge_len
-        
-        if 'geometry' in data:
-            seg_coords = list(data['geometry'].coords)
-            if len(coords) > 0: coords.extend(seg_coords[1:])
-            else: coords.extend(seg_coords)
-        else:
-            coords.append(u)
-            coords.append(v)
-            
-    return LineString(coords) if len(coords) > 1 else None, total_len
-
-def run_simulation_day(vehicle_config_path: str, zone_roads_path: str, date: str, output_dir: str = "data", enable_legacy_logs: bool = True):
-    # 1. Load Config (Now includes Depot Coords)
-    config = load_vehicle_config(vehicle_config_path)
-    if not config.enabled:
-        # print(f"   🚫 Vehicle {config.name} is disabled (Scrapped). Skipping.") # Optional verbosity
-        return
-
-    # Check Simulation Window Bounds
-    if config.simulation_window:
-        try:
-            current_dt = datetime.strptime(date, "%Y-%m-%d")
-            s_str = config.simulation_window.get('start_date')
-            e_str = config.simulation_window.get('end_date')
-            
-            if s_str:
-                s_date = datetime.strptime(s_str, "%Y-%m-%d")
-                if current_dt < s_date: return # Before start
-            if e_str:
-                e_date = datetime.strptime(e_str, "%Y-%m-%d")
-                if current_dt > e_date: return # After end
-        except: pass # Ignore parsing errors, assume valid
+        return None
 
-    store = SimulationStore(base_dir=output_dir, enable_legacy_logs=enable_legacy_logs)
-    
+def plan_vehicle_day(config, zone_roads_path: str, date: str, options: EngineOptions = None):
+    """
+    Plans one vehicle-day: route choice, path geometry, work/transit stops and shift hours.
+    Returns the plan dict (the shape stored in daily_plans) or None if no mission is possible.
+    """
+    options = options or EngineOptions()
     # 2. Load Graph
     # Extract localities file from config (it's in the dict raw config usually, but let's assume config object has it or we pass it)
     # The config object is VehicleConfig. The attributes are populated from YAML.
@@ -106,21 +92,49 @@ def run_simulation_day(vehicle_config_path: str, zone_roads_path: str, date: str
     if hasattr(config, "zone") and isinstance(config.zone, dict):
         loc_file = config.zone.get("localities_file")
     
-    network = RoadNetwork(zone_roads_path, localities_path=loc_file)
-    agent = VehicleAgent(config, store)
-    
-    # Load Predefined Routes if available
+    # Graph, library and routes come from the process-wide zone registry (built once per zone)
+    zones = get_zone_registry()
     zone_dir = os.path.dirname(zone_roads_path)
-    routes_file = os.path.join(zone_dir, "routes.json")
+    network, on_city = None, False
+    if options.city_graph:
+        # Merged city graph: sites stay in this zone, depots and legs may cross zones
+        city = zones.city_network(options.city_graph)
+        zone_name = os.path.basename(zone_dir)
+        if city and zone_name in city.partitions:
+            network = city.zone_view(zone_name, zones.localities(zone_dir).points() if loc_file else None)
+            on_city = True
+        else:
+            logger.warning(f"⚠️ {zone_name} is not part of city graph {options.city_graph}, using the zone graph.")
+    if network is None:
+        network = zones.network(zone_roads_path, localities_path=loc_file)
+    if options.travel_time:
+        # Searches minimise free-flow travel time (road class / maxspeed) instead of length
+        network = TravelTimeNetwork(network)
+    
+    # Load Predefined Routes: compiled library (snapped + base legs) if available, else routes.json
+    # (libraries hold zone-graph node indices, so they are not used on the city graph)
+    library = None
+    if options.use_route_library and not on_city:
+        # The vehicle's own zone may be compiled against another zone's roads (compile_routes.py --roads)
+        own_zone_dir = os.path.join(os.path.dirname(zone_dir), str(config.zone_id))
+        library = zones.route_library(own_zone_dir) or zones.route_library(zone_dir)
+    if library and not library.matches(network):
+        logger.warning(f"⚠️ {zone_dir}/route_library.json is outdated or was compiled for a different graph. Recompile with tools/compile_routes.py.")
+        library = None
+    if library and library.weight != network.weight_attr:
+        logger.warning(f"⚠️ {zone_dir}/route_library.json legs minimise '{library.weight}', not '{network.weight_attr}'. "
+              f"Recompile with tools/compile_routes.py{' --travel_time' if options.travel_time else ''}.")
+        library = None
+    
     predefined_routes = []
-    if os.path.exists(routes_file):
+    if library:
+        predefined_routes = library.routes
+    else:
         try:
-            with open(routes_file, 'r') as rf:
-                rdata = json.load(rf)
-                predefined_routes = rdata.get("routes", [])
-                print(f"   Loaded {len(predefined_routes)} predefined routes for zone.")
+            predefined_routes = zones.predefined_routes(zone_dir)
+            logger.info(f"   Loaded {len(predefined_routes)} predefined routes for zone.")
         except Exception as e:
-            print(f"⚠️ Error loading routes.json: {e}")
+            logger.warning(f"⚠️ Error loading routes.json: {e}")
     
     # 3. Use Configured Depot (No more hardcoding)
     depot_lat, depot_lon = config.depot_location
@@ -128,35 +142,59 @@ def run_simulation_day(vehicle_config_path: str, zone_roads_path: str, date: str
     # Check graph connectivity relative to specific depot
     home_node = network._get_nearest_node((depot_lat, depot_lon))
     if not home_node:
-        print(f"❌ Error: Depot {config.depot_location} is too far from road network.")
-        return
+        logger.error(f"❌ Error: Depot {config.depot_location} is too far from road network.")
+        return None
     
     # Initialize Seeded RNG
     # Use IMEI as unique identifier + Date
     rng = get_seeded_rng(config.imei, date)
-    print(f"   🎲 RNG initialized for {config.imei} on {date}")
+    logger.info(f"   🎲 RNG initialized for {config.imei} on {date}")
+    
+    if options.router == "cch":
+        # One noise draw per road for the whole day instead of per relaxed edge per query
+        network = PerturbedNetwork(network, rng)
+    elif options.router in SEARCHES and options.router != "dijkstra":
+        network = SearchNetwork(network, options.router)
 
     # 4. Plan Mission
     # Strategy: Pick a random predefined route 80% of the time, else random mission
     mission = None
+    route_id = None
+    
+    # Route templates (configs/routes) assigned to this vehicle take precedence
+    template = None
+    if library:
+        template = next((library.templates[t] for t in (config.route_templates or []) if t in library.templates), None)
     
-    if predefined_routes and rng.random() < 0.8:
+    if template:
+        logger.info(f"   🗺️ Assigned Template: {template['template_id']}")
+        mission = plan_mission_from_template(network, library, template, home_node, rng, options.route_entropy)
+        if mission:
+            route_id = template['template_id']
+    
+    elif predefined_routes and rng.random() < 0.8:
         selected_route = rng.choice(predefined_routes)
-        print(f"   🗺️ Assigned Route: {selected_route['route_id']} ({selected_route['name']})")
+        logger.info(f"   🗺️ Assigned Route: {selected_route['route_id']} ({selected_route['name']})")
         
-        # Convert waypoints to LineString path
-        # waypoints are [[lon, lat], ...]
-        mission = plan_mission_from_waypoints(network, home_node, selected_route['waypoints'], rng)
+        if library:
+            mission = plan_mission_from_library(network, library, home_node, selected_route['nodes'], rng,
+                                                entropy=options.route_entropy)
+        else:
+            # Convert waypoints to LineString path
+            # waypoints are [[lon, lat], ...]
+            mission = plan_mission_from_waypoints(network, home_node, selected_route['waypoints'], rng)
+        if mission:
+            route_id = selected_route['route_id']
     
     if not mission:
         # Fallback to random generation
         mission = plan_mission_route(network, home_node, min_km=2, max_km=25, rng=rng)
     
     if not mission:
-        print(f"❌ No valid mission found for {date}")
-        return
+        logger.error(f"❌ No valid mission found for {date}")
+        return None
 
-    print(f"🚗 {date}: {mission['distance_km']:.2f}km | {len(mission['site_locations'])} Sites")
+    logger.info(f"🚗 {date}: {mission['distance_km']:.2f}km | {len(mission['site_locations'])} Sites")
 
     stops = generate_mission_stops(mission, rng)
     
@@ -164,6 +202,77 @@ def run_simulation_day(vehicle_config_path: str, zone_roads_path: str, date: str
     start_hr = rng.randint(7, 9)
     end_hr = rng.randint(18, 20)
     
+    plan = {
+        "route_id": route_id,
+        "start_time": f"{start_hr:02d}:00:00",
+        "end_time": f"{end_hr:02d}:00:00",
+        "distance_km": mission['distance_km'],
+        "site_locations": mission['site_locations'],
+        "stops": stops,
+        "geometry": mission['geometry']
+    }
+    if options.travel_time or options.congestion:
+        # Road speed / class runs along the path (speed caps, congestion group per road)
+        plan["speed_profile"] = mission['speed_profile']
+    return plan
+
+def run_simulation_day(vehicle_config_path: str, zone_roads_path: str, date: str, output_dir: str = "data", enable_legacy_logs: bool = True,
+                       options: EngineOptions = None, store: SimulationStore = None):
+    """
+    Plans (or reuses) and simulates one vehicle-day. Returns the day's counters
+    (VehicleAgent.day_stats plus imei, zone, date, route_id, planned_km), or None
+    when the vehicle does not drive that day.
+    """
+    options = options or EngineOptions()
+    # 1. Load Config (Now includes Depot Coords)
+    with stage("config_load"):
+        config = load_vehicle_config(vehicle_config_path)
+    if not config.enabled:
+        # print(f"   🚫 Vehicle {config.name} is disabled (Scrapped). Skipping.") # Optional verbosity
+        return
+
+    # Check Simulation Window Bounds
+    if config.simulation_window:
+        try:
+            current_dt = datetime.strptime(date, "%Y-%m-%d")
+            s_str = config.simulation_window.get('start_date')
+            e_str = config.simulation_window.get('end_date')
+            
+            if s_str:
+                s_date = datetime.strptime(s_str, "%Y-%m-%d")
+                if current_dt < s_date: return # Before start
+            if e_str:
+                e_date = datetime.strptime(e_str, "%Y-%m-%d")
+                if current_dt > e_date: return # After end
+        except: pass # Ignore parsing errors, assume valid
+
+    own_store = store is None
+    if own_store:
+        store = SimulationStore(base_dir=output_dir, enable_legacy_logs=enable_legacy_logs)
+    
+    # 2-4. Mission Plan: reuse the stored one if asked, else plan (graph load + routing)
+    plan = store.get_daily_plan(config.imei, date) if options.reuse_plans else None
+    if plan is not None:
+        logger.info(f"   📋 Reusing stored plan for {config.imei} on {date} (route {plan['route_id']})")
+    else:
+        with stage("planning"):
+            plan = plan_vehicle_day(config, zone_roads_path, date, options)
+        if not plan:
+            return
+        if options.save_plans:
+            with stage("write"):
+                store.buffer_daily_plan(date, config.imei, **plan)
+                if own_store:
+                    store.flush_daily_plans()
+    
+    agent = VehicleAgent(config, store)
+    agent.record_trajectory = options.save_trajectory
+    congestion = None
+    if options.congestion:
+        # Zone-wide traffic for the day; the agent's own draws (driver pace, dwell times) are seeded per vehicle-day
+        zone_dir = os.path.dirname(zone_roads_path)
+        congestion = build_congestion_table(get_zone_registry().congestion(zone_dir), os.path.basename(zone_dir), date)
+        agent.rng = get_seeded_rng(config.imei, f"{date}_drive")
     
     # 5. External Data Injection (Pre-Load)
     ext_events = []
@@ -173,27 +282,38 @@ def run_simulation_day(vehicle_config_path: str, zone_roads_path: str, date: str
         ext_provider = ExternalLogProvider() 
         ext_events = ext_provider.get_events(config.name, date)
         if ext_events:
-            print(f"   💉 Injected {len(ext_events)} external checkpoints.")
+            logger.info(f"   💉 Injected {len(ext_events)} external checkpoints.")
     except Exception as e:
-        print(f"⚠️ External Data Error: {e}")
+        logger.warning(f"⚠️ External Data Error: {e}")
 
-    agent.start_24h_cycle(date, mission['geometry'], shift_start=start_hr, shift_end=end_hr, stops=stops, external_events=ext_events)
+    start_hr = int(plan['start_time'].split(":")[0])
+    end_hr = int(plan['end_time'].split(":")[0])
+    agent.start_24h_cycle(date, plan['geometry'], shift_start=start_hr, shift_end=end_hr, stops=plan['stops'], external_events=ext_events,
+                          speed_profile=plan.get('speed_profile') if options.travel_time or options.congestion else None,
+                          road_caps=options.travel_time, congestion=congestion)
     
-    while agent.is_active:
-        agent.tick()
-        # Removed intermediate flush to prevent log overwriting
-        # if len(agent.telemetry_buffer) > 1000: agent.flush_memory()
+    with stage("physics"):
+        while agent.is_active:
+            agent.tick()
+            # Removed intermediate flush to prevent log overwriting
+            # if len(agent.telemetry_buffer) > 1000: agent.flush_memory()
     
 
 
-    agent.flush_memory()
+    with stage("write"):
+        agent.flush_memory()
+    return dict(agent.day_stats(), imei=config.imei, zone=config.zone_id, date=date,
+                route_id=plan['route_id'], planned_km=round(plan['distance_km'], 3))
 
-def process_external_only(vehicle_config_path: str, date: str, output_dir: str = "data"):
+def process_external_only(vehicle_config_path: str, date: str, output_dir: str = "data", store: SimulationStore = None):
     """
     Checks for external logs (manual entries) and writes them even if the day is skipped.
+    With a store, they go to its sinks (batch runs) instead of Parquet + tracker text under output_dir.
     """
-    config = load_vehicle_config(vehicle_config_path)
-    store = SimulationStore(base_dir=output_dir)
+    with stage("config_load"):
+        config = load_vehicle_config(vehicle_config_path)
+    if store is None:
+        store = SimulationStore(base_dir=output_dir)
     
     try:
         from vts_core.external_data import ExternalLogProvider
@@ -201,7 +321,7 @@ def process_external_only(vehicle_config_path: str, date: str, output_dir: str =
         ext_events = ext_provider.get_events(config.name, date)
         
         if ext_events:
-            print(f"   💉 Found {len(ext_events)} external logs for skipped day.")
+            logger.info(f"   💉 Found {len(ext_events)} external logs for skipped day.")
             # Convert to telemetry format
             records = []
             for e in ext_events:
@@ -213,10 +333,11 @@ def process_external_only(vehicle_config_path: str, date: str, output_dir: str =
                     "heading": e.get('heading', 0.0),
                     "device_id": config.device_id
                 })
-            store.write_telemetry(config.imei, date, records, vehicle_name=config.name)
+            with stage("write"):
+                store.write_telemetry(config.imei, date, records, vehicle_name=config.name)
             
     except Exception as e:
-        print(f"⚠️ External Data Error: {e}")
+        logger.warning(f"⚠️ External Data Error: {e}")
 
 def plan_mission_route(network, home_node, min_km, max_km, rng):
     home_pt = (home_node[1], home_node[0]) # (Lat, Lon)
@@ -250,34 +371,35 @@ def plan_mission_route(network, home_node, min_km, max_km, rng):
 
         waypoints = [home_pt] + [(s[1], s[0]) for s in sites] + [home_pt]
         
-        full_coords = []
+        geom_ids, reverse = [], []
         cumulative_dist = 0.0
         site_locations_meters = []
         valid = True
         
         for i in range(len(waypoints)-1):
             # Layer 2: Stochastic Pathfinding
-            geom, length_meters = find_stochastic_path(network, waypoints[i], waypoints[i+1], rng)
+            path_nodes = find_stochastic_leg(network, waypoints[i], waypoints[i+1], rng)
             
-            if not geom: 
+            if not path_nodes: 
                 valid = False; break
             
+            leg_geoms, leg_rev, length_meters = network.path_edges(path_nodes)
             cumulative_dist += length_meters
             if i < num_sites: 
                 site_locations_meters.append(cumulative_dist)
             
-            coords = list(geom.coords)
-            if full_coords: full_coords.extend(coords[1:])
-            else: full_coords.extend(coords)
+            geom_ids.extend(leg_geoms)
+            reverse.extend(leg_rev)
             
         total_km = cumulative_dist / 1000.0
         
 
         
     return {
-        "geometry": LineString(full_coords),
+        "geometry": LineString(network.gather_coords(geom_ids, reverse)),
         "distance_km": cumulative_dist / 1000.0,
-        "site_locations": site_locations_meters
+        "site_locations": site_locations_meters,
+        "speed_profile": network.speed_profile(geom_ids)
     }
 
 def plan_mission_from_waypoints(network, home_node, waypoints_coords, rng):
@@ -300,8 +422,8 @@ def plan_mission_from_waypoints(network, home_node, waypoints_coords, rng):
     
     route_nodes.append(home_pt)
     
-    # 2. Build Geometry
-    full_coords = []
+    # 2. Build Geometry (edges collected per leg, coordinates gathered once)
+    geom_ids, reverse = [], []
     total_dist = 0.0
     site_dists = []
     
@@ -310,36 +432,123 @@ def plan_mission_from_waypoints(network, home_node, waypoints_coords, rng):
         v_pt = route_nodes[i+1]
         
         # Find shortest path between these two points on graph with noise
-        segment_geom, dist = find_stochastic_path(network, u_pt, v_pt, rng)
+        path_nodes = find_stochastic_leg(network, u_pt, v_pt, rng)
         
-        if segment_geom:
+        if path_nodes:
+            leg_geoms, leg_rev, dist = network.path_edges(path_nodes)
             total_dist += dist
-            coords = list(segment_geom.coords)
-            if len(full_coords) > 0:
-                full_coords.extend(coords[1:])
-            else:
-                full_coords.extend(coords)
+            geom_ids.extend(leg_geoms)
+            reverse.extend(leg_rev)
         
         # Record distance for intermediate stops (exclude return to home)
         if i < len(route_nodes) - 2:
             site_dists.append(total_dist)
                 
+    full_coords = network.gather_coords(geom_ids, reverse)
     if len(full_coords) < 2: return None
     
     return {
         "geometry": LineString(full_coords),
         "distance_km": total_dist / 1000.0,
-        "site_locations": site_dists # intermediate stops in meters
+        "site_locations": site_dists, # intermediate stops in meters
+        "speed_profile": network.speed_profile(geom_ids)
     }
     return None
 
+def pick_leg_path(library, u, v, rng, entropy=DEFAULT_ROUTE_ENTROPY):
+    """
+    Picks one of the compiled paths for leg u->v: the base path, or with probability
+    `entropy` one of the diverse alternatives. None if the leg was not compiled.
+    """
+    paths = library.leg_alternatives(u, v)
+    if not paths:
+        return None
+    # Always draw, so the RNG stream does not depend on how many alternatives a leg has
+    roll = rng.random()
+    if len(paths) > 1 and roll < entropy:
+        return paths[1 + rng.randrange(len(paths) - 1)]
+    return paths[0]
+
+def plan_mission_from_library(network, library, home_node, site_indices, rng, allow_reverse=True,
+                              entropy=DEFAULT_ROUTE_ENTROPY):
+    """
+    Builds a mission from compiled node indices. Legs pick among the precomputed
+    diverse paths (see pick_leg_path); only legs missing from the library are searched.
+    """
+    nodes = network.node_list
+    home_idx = network.node_index[home_node]
+    
+    sites = list(site_indices)
+    # Daily variant: drive the same loop in the opposite direction
+    if allow_reverse and rng.random() < 0.5:
+        sites = sites[::-1]
+    sequence = [home_idx] + sites + [home_idx]
+    
+    geom_ids, reverse = [], []
+    total_dist = 0.0
+    site_dists = []
+    
+    for i in range(len(sequence) - 1):
+        u, v = sequence[i], sequence[i+1]
+        path_nodes = None
+        if u != v:
+            compiled = pick_leg_path(library, u, v, rng, entropy)
+            if compiled is not None:
+                path_nodes = [nodes[j] for j in compiled]
+            else:
+                path_nodes = find_stochastic_path_nodes(network, nodes[u], nodes[v], rng)
+        
+        if path_nodes and len(path_nodes) > 1:
+            leg_geoms, leg_rev, dist = network.path_edges(path_nodes)
+            total_dist += dist
+            geom_ids.extend(leg_geoms)
+            reverse.extend(leg_rev)
+        
+        # Record distance for intermediate stops (exclude return to home)
+        if i < len(sequence) - 2:
+            site_dists.append(total_dist)
+    
+    full_coords = network.gather_coords(geom_ids, reverse)
+    if len(full_coords) < 2: return None
+    
+    return {
+        "geometry": LineString(full_coords),
+        "distance_km": total_dist / 1000.0,
+        "site_locations": site_dists,
+        "speed_profile": network.speed_profile(geom_ids)
+    }
+
+def plan_mission_from_template(network, library, template, home_node, rng, entropy=DEFAULT_ROUTE_ENTROPY):
+    """Samples the day's stops from a template's locality pool (daily_stops / dwell_rules)."""
+    pool = [loc['node'] for loc in template['localities']]
+    limits = template.get('daily_stops') or {}
+    num_stops = rng.randint(limits.get('min', 3), limits.get('max', 6))
+    
+    if template.get('depot') is not None:
+        home_node = network.node_list[template['depot']]
+    
+    sequence = []
+    prev = network.node_index[home_node]
+    for _ in range(num_stops):
+        # Never visit the same node twice in a row (a zero-length leg would stack two stops)
+        choices = [p for p in pool if p != prev] or pool
+        prev = rng.choice(choices)
+        sequence.append(prev)
+    
+    mission = plan_mission_from_library(network, library, home_node, sequence, rng, allow_reverse=False, entropy=entropy)
+    if mission:
+        dwell = template.get('dwell_rules') or {}
+        mission['dwell_minutes'] = (dwell.get('min_minutes', 45), dwell.get('max_minutes', 90))
+    return mission
+
 def generate_mission_stops(mission, rng):
     stops = []
     # Work Stops
+    dwell_min, dwell_max = mission.get('dwell_minutes', (45, 90))
     for site_meter in mission['site_locations']:
         stops.append({
             "at_meter": site_meter - 20, 
-            "duration_min": 45, "duration_max": 90, "type": "WORK"
+            "duration_min": dwell_min, "duration_max": dwell_max, "type": "WORK"
         })
     # Transit Stops
     num_transit = rng.randint(0, 2)
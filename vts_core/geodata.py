@@ -0,0 +1,85 @@
+import os
+import json
+import itertools
+import numpy as np
+import shapely
+from dataclasses import dataclass, field
+from typing import List, Dict, Tuple
+
+# Zone GeoJSON ingestion shared by the graph, route compiler and tools.
+# Coordinates go straight from the parsed JSON into flat NumPy arrays; geometry
+# work (lengths, centroids) runs through shapely 2's vectorised functions.
+
+@dataclass
+class RoadArrays:
+    """LineString roads in file order: road i spans coords[offsets[i]:offsets[i+1]]."""
+    coords: np.ndarray # (M, 2) float64 lon/lat
+    offsets: np.ndarray # (n + 1,) int64
+    lengths: np.ndarray # (n,) planar length in degrees
+    properties: List[Dict] = field(default_factory=list)
+
+    def __len__(self):
+        return len(self.lengths)
+
+@dataclass
+class LocalityArrays:
+    """Point / (Multi)Polygon localities in file order, reduced to centroids."""
+    lon: np.ndarray
+    lat: np.ndarray
+    names: List[str] # None where the feature has no name
+    ids: List[str] # locality_id, or None where the feature has none
+
+    def __len__(self):
+        return len(self.names)
+
+    def points(self) -> List[Tuple[float, float]]:
+        """[(lon, lat), ...] as plain floats."""
+        return list(zip(self.lon.tolist(), self.lat.tolist()))
+
+def read_features(path: str) -> List[Dict]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get('features', [])
+
+def _coord_array(points: List) -> np.ndarray:
+    arr = np.asarray(points, dtype=np.float64)
+    if arr.ndim != 2:
+        # Mixed 2D/3D positions: keep lon/lat only
+        arr = np.asarray([p[:2] for p in points], dtype=np.float64)
+    return arr[:, :2]
+
+def load_roads(path: str) -> RoadArrays:
+    """Reads every LineString feature of a roads.geojson (other geometry types are skipped)."""
+    lines, props = [], []
+    for feat in read_features(path):
+        geom = feat.get('geometry') or {}
+        if geom.get('type') == 'LineString' and len(geom.get('coordinates', [])) >= 2:
+            lines.append(geom['coordinates'])
+            props.append(feat.get('properties') or {})
+
+    counts = np.fromiter((len(l) for l in lines), dtype=np.int64, count=len(lines))
+    offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+    if not lines:
+        return RoadArrays(np.empty((0, 2)), offsets, np.empty(0), props)
+
+    coords = _coord_array(list(itertools.chain.from_iterable(lines)))
+    geoms = shapely.linestrings(coords, indices=np.repeat(np.arange(len(lines)), counts))
+    return RoadArrays(coords, offsets, shapely.length(geoms), props)
+
+def load_localities(path: str) -> LocalityArrays:
+    """Centroids of a localities.geojson (missing file -> empty arrays)."""
+    names, ids, geojson = [], [], []
+    if path and os.path.exists(path):
+        for feat in read_features(path):
+            geom = feat.get('geometry') or {}
+            if geom.get('type') not in ('Point', 'Polygon', 'MultiPolygon'):
+                continue
+            props = feat.get('properties') or {}
+            names.append(props.get('name'))
+            ids.append(props.get('locality_id'))
+            geojson.append(json.dumps(geom))
+
+    if not geojson:
+        return LocalityArrays(np.empty(0), np.empty(0), names, ids)
+    # A Point's centroid is the point itself
+    xy = shapely.get_coordinates(shapely.centroid(shapely.from_geojson(geojson)))
+    return LocalityArrays(xy[:, 0], xy[:, 1], names, ids)
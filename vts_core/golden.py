@@ -0,0 +1,205 @@
+import os
+import glob
+import random
+import logging
+from dataclasses import fields
+from typing import Dict, List, Tuple
+
+import yaml
+import numpy as np
+import pandas as pd
+
+from vts_core.config import EngineOptions
+from vts_core.engine import run_simulation_day
+from vts_core.zones import get_zone_registry
+
+logger = logging.getLogger(__name__)
+
+# Golden-output checks for fast paths: run the same vehicle-days through two
+# engine configurations (or against a recorded golden directory) and compare
+# telemetry Parquet column by column and tracker text line by line. Differences
+# are exact unless a tolerance is given for a column (absolute; seconds for
+# timestamps) or for the numeric fields of tracker lines.
+
+DEFAULT_DATES = ["2022-07-27", "2022-10-26", "2023-03-15"] # Weekdays inside the bundled windows
+
+def parse_options(spec: str) -> EngineOptions:
+    """EngineOptions from "router=cch,route_entropy=0.3,travel_time=true" (empty = defaults)."""
+    types = {f.name: f.type for f in fields(EngineOptions)}
+    kwargs = {}
+    for item in filter(None, (s.strip() for s in (spec or "").split(","))):
+        key, _, value = item.partition("=")
+        key = key.strip()
+        if key not in types:
+            raise ValueError(f"Unknown engine option {key!r} (expected one of {', '.join(types)})")
+        value = value.strip()
+        if types[key] in (bool, "bool"):
+            kwargs[key] = value.lower() in ("1", "true", "yes", "on")
+        elif types[key] in (float, "float"):
+            kwargs[key] = float(value)
+        else:
+            kwargs[key] = value or None
+    return EngineOptions(**kwargs)
+
+def parse_tolerances(spec: str) -> Dict[str, float]:
+    """{"lat": 1e-6, ...} from "lat=1e-6,lon=1e-6" ("*" applies to every numeric column)."""
+    out = {}
+    for item in filter(None, (s.strip() for s in (spec or "").split(","))):
+        key, _, value = item.partition("=")
+        out[key.strip()] = float(value)
+    return out
+
+def bundled_cases(vehicles_dir: str, zones_dir: str, dates: List[str] = None, per_zone: int = 1,
+                  zones: List[str] = None) -> List[Tuple[str, str, str]]:
+    """(vehicle yaml, roads.geojson, date) for the first `per_zone` enabled vehicles of every zone with roads."""
+    dates = dates or DEFAULT_DATES
+    taken, cases = {}, []
+    for path in sorted(glob.glob(os.path.join(vehicles_dir, "*.yaml"))):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = yaml.safe_load(f)
+        except (OSError, yaml.YAMLError):
+            continue
+        if not isinstance(data, dict) or not (data.get("vehicle") or {}).get("enabled", True):
+            continue
+        zone = (data.get("zone") or {}).get("name")
+        roads = os.path.join(zones_dir, str(zone), "roads.geojson")
+        if (zones and zone not in zones) or taken.get(zone, 0) >= per_zone or not os.path.exists(roads):
+            continue
+        taken[zone] = taken.get(zone, 0) + 1
+        window = data.get("simulation_window") or {}
+        for date in dates:
+            if str(window.get("start_date", date)) <= date <= str(window.get("end_date", date)):
+                cases.append((path, roads, date))
+    return cases
+
+def run_cases(cases: List[Tuple[str, str, str]], out_dir: str, options: EngineOptions = None) -> int:
+    """Simulates every case into out_dir with tracker text on; returns the vehicle-days that drove."""
+    get_zone_registry().clear() # Nothing cached by the other configuration
+    drove = 0
+    for vehicle, roads, date in cases:
+        # Engine draws are seeded per vehicle-day; seed the global generators too so stray draws repeat
+        random.seed(0)
+        np.random.seed(0)
+        if run_simulation_day(vehicle, roads, date, output_dir=out_dir, enable_legacy_logs=True, options=options):
+            drove += 1
+    return drove
+
+def _relative_files(root: str, sub: str, pattern: str) -> set:
+    base = os.path.join(root, sub)
+    return {os.path.relpath(p, root) for p in glob.glob(os.path.join(base, "**", pattern), recursive=True)}
+
+def compare_frames(a: pd.DataFrame, b: pd.DataFrame, tolerances: Dict[str, float] = None) -> List[Dict]:
+    """Per-column differences between two telemetry frames (rows compared up to the shorter one)."""
+    tolerances = tolerances or {}
+    n = min(len(a), len(b))
+    out = []
+    for col in sorted(set(a.columns) | set(b.columns), key=lambda c: (list(a.columns) + list(b.columns)).index(c)):
+        if col not in a.columns or col not in b.columns:
+            out.append({"column": col, "status": "only in " + ("a" if col in a.columns else "b")})
+            continue
+        x, y = a[col].iloc[:n].reset_index(drop=True), b[col].iloc[:n].reset_index(drop=True)
+        tol = tolerances.get(col, tolerances.get("*", 0.0))
+        diff = None
+        if pd.api.types.is_datetime64_any_dtype(x) and pd.api.types.is_datetime64_any_dtype(y):
+            diff = (x - y).dt.total_seconds().abs()
+        elif pd.api.types.is_numeric_dtype(x) and pd.api.types.is_numeric_dtype(y):
+            diff = (x.astype(float) - y.astype(float)).abs()
+        if diff is not None:
+            both_nan = x.isna() & y.isna()
+            bad = ~both_nan & ~(diff <= tol)
+            max_diff = float(diff[~both_nan].max()) if (~both_nan).any() else 0.0
+        else:
+            bad = ~((x == y) | (x.isna() & y.isna()))
+            max_diff = None
+        if bad.any():
+            first = int(bad.idxmax())
+            out.append({"column": col, "status": "differs", "mismatches": int(bad.sum()), "rows": n,
+                        "max_diff": max_diff, "tolerance": tol, "first_row": first,
+                        "first": (str(x.iloc[first]), str(y.iloc[first]))})
+        elif max_diff:
+            out.append({"column": col, "status": "within tolerance", "rows": n, "max_diff": max_diff, "tolerance": tol})
+    return out
+
+def _line_matches(a: str, b: str, tolerance: float) -> bool:
+    fa, fb = a.split(","), b.split(",")
+    if len(fa) != len(fb):
+        return False
+    for x, y in zip(fa, fb):
+        if x == y:
+            continue
+        try:
+            if abs(float(x.rstrip(";")) - float(y.rstrip(";"))) > tolerance:
+                return False
+        except ValueError:
+            return False
+    return True
+
+def compare_text(a_path: str, b_path: str, tolerance: float = None) -> Dict:
+    """Byte comparison of two tracker files; with a tolerance, numeric fields of differing lines may differ by it."""
+    with open(a_path, 'rb') as f:
+        a_bytes = f.read()
+    with open(b_path, 'rb') as f:
+        b_bytes = f.read()
+    if a_bytes == b_bytes:
+        return {"status": "identical"}
+    a_lines, b_lines = a_bytes.decode().splitlines(), b_bytes.decode().splitlines()
+    bad = [i for i, (x, y) in enumerate(zip(a_lines, b_lines))
+           if x != y and (tolerance is None or not _line_matches(x, y, tolerance))]
+    if not bad and len(a_lines) == len(b_lines):
+        return {"status": "within tolerance", "lines": len(a_lines)}
+    first = bad[0] if bad else min(len(a_lines), len(b_lines))
+    return {"status": "differs", "lines": (len(a_lines), len(b_lines)), "mismatches": len(bad), "first_line": first + 1,
+            "first": (a_lines[first] if first < len(a_lines) else "<eof>", b_lines[first] if first < len(b_lines) else "<eof>")}
+
+def compare_outputs(a_dir: str, b_dir: str, tolerances: Dict[str, float] = None, text_tolerance: float = None) -> Dict:
+    """
+    Compares the telemetry Parquet and tracker text of two output directories.
+    Returns {"ok", "files": [{"path", "kind", "status", ...}]} with one entry per file.
+    """
+    files = []
+    for kind, sub, pattern in (("parquet", "telemetry", "*.parquet"), ("text", "tracker", "*.txt")):
+        a_files, b_files = _relative_files(a_dir, sub, pattern), _relative_files(b_dir, sub, pattern)
+        for rel in sorted(a_files | b_files):
+            entry = {"path": rel, "kind": kind}
+            if rel not in b_files or rel not in a_files:
+                entry["status"] = "only in " + ("a" if rel in a_files else "b")
+            elif kind == "parquet":
+                a, b = pd.read_parquet(os.path.join(a_dir, rel)), pd.read_parquet(os.path.join(b_dir, rel))
+                entry["rows"] = (len(a), len(b))
+                entry["columns"] = compare_frames(a, b, tolerances)
+                differs = len(a) != len(b) or any(c["status"] != "within tolerance" for c in entry["columns"])
+                entry["status"] = "differs" if differs else ("within tolerance" if entry["columns"] else "identical")
+            else:
+                entry.update(compare_text(os.path.join(a_dir, rel), os.path.join(b_dir, rel), text_tolerance))
+            files.append(entry)
+    ok = bool(files) and all(f["status"] in ("identical", "within tolerance") for f in files)
+    return {"ok": ok, "files": files}
+
+def format_report(report: Dict, verbose: bool = False) -> str:
+    lines = []
+    counts = {}
+    for f in report["files"]:
+        counts[f["status"]] = counts.get(f["status"], 0) + 1
+        if f["status"] == "identical" or (f["status"] == "within tolerance" and not verbose):
+            continue
+        icon = "⚠️" if f["status"] == "within tolerance" else "❌"
+        if f["kind"] == "parquet" and "columns" in f:
+            lines.append(f"{icon} {f['path']}: {f['status']} ({f['rows'][0]} vs {f['rows'][1]} rows)")
+            for c in f["columns"]:
+                if c["status"] != "differs":
+                    detail = f"max |diff| {c['max_diff']:.3g} <= {c['tolerance']:g}" if "max_diff" in c else ""
+                    lines.append(f"   {c['column']:<12}{c['status']} {detail}")
+                    continue
+                max_diff = f", max |diff| {c['max_diff']:.3g} (tolerance {c['tolerance']:g})" if c["max_diff"] is not None else ""
+                lines.append(f"   {c['column']:<12}{c['mismatches']}/{c['rows']} rows differ{max_diff}; "
+                             f"first at row {c['first_row']}: {c['first'][0]} vs {c['first'][1]}")
+        elif f["kind"] == "text" and "first" in f:
+            lines.append(f"{icon} {f['path']}: {f['mismatches']} lines differ ({f['lines'][0]} vs {f['lines'][1]} lines), first at line {f['first_line']}:")
+            lines.append(f"   a: {f['first'][0]}")
+            lines.append(f"   b: {f['first'][1]}")
+        else:
+            lines.append(f"{icon} {f['path']}: {f['status']}")
+    summary = ", ".join(f"{n} {status}" for status, n in sorted(counts.items())) or "no output files"
+    lines.append(("✅ Outputs match: " if report["ok"] else "❌ Outputs differ: ") + summary)
+    return "\n".join(lines)
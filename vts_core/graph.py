@@ -1,48 +1,50 @@
 import networkx as nx
-import geopandas as gpd
+import numpy as np
 from shapely.geometry import Point, LineString
 import math
 import os
 import random
+from vts_core.geodata import load_roads, load_localities
+from vts_core.search import astar_path
+from vts_core.speeds import free_flow_kmh, road_groups, travel_seconds
 
 class RoadNetwork:
+    weight_attr = 'weight' # Edge attribute the engine's searches minimise (views may switch to 'time')
+
     def __init__(self, geojson_path: str, localities_path: str = None):
         print(f"   Loading Road Graph from {geojson_path}...")
-        self.gdf = gpd.read_file(geojson_path)
+        roads = load_roads(geojson_path)
         self.localities = []
 
         if localities_path and os.path.exists(localities_path):
              try:
-                 loc_gdf = gpd.read_file(localities_path)
-                 print(f"   Loading {len(loc_gdf)} localities from {localities_path}...")
+                 locs = load_localities(localities_path)
+                 print(f"   Loading {len(locs)} localities from {localities_path}...")
                  # Store (Lon, Lat) tuples
-                 for _, row in loc_gdf.iterrows():
-                     geom = row.geometry
-                     if geom.geom_type == 'Point':
-                         self.localities.append((geom.x, geom.y))
-                     elif geom.geom_type in ['Polygon', 'MultiPolygon']:
-                         c = geom.centroid
-                         self.localities.append((c.x, c.y))
+                 self.localities = locs.points()
              except Exception as e:
                  print(f"⚠️ Error loading localities: {e}")
         
         # 1. Build Directed Graph (Respects One-Ways if data has them, currently forcing 2-way for connectivity)
+        # Edge geometries live once in a flat (M, 2) float64 buffer: edge attribute 'geom' indexes
+        # geom_offsets, 'reverse' marks the backward edge reading the same points in reverse.
+        # 'time' is the free-flow travel time (seconds) from the road class / maxspeed tags.
         raw_graph = nx.DiGraph()
         
-        for _, row in self.gdf.iterrows():
-            geom = row.geometry
-            if geom.geom_type == 'LineString':
-                # Precision rounding (5 decimals approx 1 meter) to merge nodes
-                start = (round(geom.coords[0][0], 5), round(geom.coords[0][1], 5))
-                end = (round(geom.coords[-1][0], 5), round(geom.coords[-1][1], 5))
-                length = geom.length * 111139.0 
-                
-                # Add Forward Edge
-                raw_graph.add_edge(start, end, weight=length, geometry=geom)
-                
-                # Add Backward Edge (Assuming local roads are accessible both ways)
-                rev_geom = LineString(list(geom.coords)[::-1])
-                raw_graph.add_edge(end, start, weight=length, geometry=rev_geom)
+        starts = roads.coords[roads.offsets[:-1]].tolist()
+        ends = roads.coords[roads.offsets[1:] - 1].tolist()
+        lengths_m = roads.lengths * 111139.0
+        kmh = free_flow_kmh(roads.properties)
+        times = travel_seconds(lengths_m, kmh).tolist()
+        for geom_id, (s, e, length, time) in enumerate(zip(starts, ends, lengths_m.tolist(), times)):
+            # Precision rounding (5 decimals approx 1 meter) to merge nodes
+            start = (round(s[0], 5), round(s[1], 5))
+            end = (round(e[0], 5), round(e[1], 5))
+            
+            # Add Forward Edge
+            raw_graph.add_edge(start, end, weight=length, time=time, geom=geom_id, reverse=False)
+            # Add Backward Edge (Assuming local roads are accessible both ways)
+            raw_graph.add_edge(end, start, weight=length, time=time, geom=geom_id, reverse=True)
 
         # 2. CLEANUP: Remove isolated islands (Objective #7)
         if len(raw_graph) > 0:
@@ -54,9 +56,16 @@ class RoadNetwork:
             print(f"   Graph Cleaned: Kept {len(self.graph)} nodes (Removed {removed} disconnected nodes).")
         else:
             self.graph = raw_graph
+        
+        used = self._pack_geometries(roads.coords, roads.offsets)
+        # Per-geometry free-flow speed, length and congestion group, indexed like geom_offsets
+        self.geom_kmh = kmh[used]
+        self.geom_length_m = lengths_m[used]
+        self.geom_group = road_groups(roads.properties)[used]
 
-        # Pre-cache nodes for fast lookup
+        # Pre-cache nodes for fast lookup (list order is the node index used by compiled route libraries)
         self.node_list = list(self.graph.nodes)
+        self.node_index = {n: i for i, n in enumerate(self.node_list)}
         print(f"   Graph Ready: {self.graph.number_of_edges()} drivable edges.")
 
     def get_random_waypoints(self, n=5):
@@ -92,30 +101,86 @@ class RoadNetwork:
         if not start_node or not end_node: return None, 0
 
         try:
-            path_nodes = nx.shortest_path(self.graph, start_node, end_node, weight='weight')
+            # Deterministic weights: goal-directed search finds the same shortest path settling fewer nodes
+            path_nodes = astar_path(self, start_node, end_node)
         except nx.NetworkXNoPath:
             return None, 0
             
-        coords = []
+        coords, total_len = self.assemble_path(path_nodes)
+        return LineString(coords) if len(coords) > 1 else None, total_len
+
+    def shortest_path_nodes(self, start_node, end_node, weight='weight', attr='weight'):
+        """
+        Node path between two graph nodes. `weight` is an edge attribute or a networkx
+        weight function (`attr` names the attribute it is based on, for subclasses with
+        precomputed overlays). Raises nx.NetworkXNoPath.
+        """
+        return nx.shortest_path(self.graph, start_node, end_node, weight=weight)
+
+    def _pack_geometries(self, coords, offsets):
+        """Copies the geometries still referenced by graph edges into the shared coordinate buffer. Returns their original ids."""
+        used = np.array(sorted({d['geom'] for _, _, d in self.graph.edges(data=True)}), dtype=np.int64)
+        remap = {int(old): new for new, old in enumerate(used)}
+        counts = offsets[used + 1] - offsets[used]
+        self.geom_offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        # Gather all kept point ranges at once
+        seg = np.repeat(np.arange(len(used)), counts)
+        idx = offsets[used][seg] + np.arange(counts.sum()) - self.geom_offsets[:-1][seg]
+        self.coords = coords[idx]
+        for _, _, d in self.graph.edges(data=True):
+            d['geom'] = remap[d['geom']]
+        return used
+
+    def path_edges(self, path_nodes):
+        """Edge geometry ids, direction flags and total length (meters) along a node path."""
+        geom_ids, reverse = [], []
         total_len = 0
+        for u, v in zip(path_nodes, path_nodes[1:]):
+            data = self.graph[u][v]
+            total_len += data['weight']
+            geom_ids.append(data['geom'])
+            reverse.append(data['reverse'])
+        return geom_ids, reverse, total_len
+
+    def gather_coords(self, geom_ids, reverse):
+        """
+        One gather over the coordinate buffer for a sequence of edges. Every edge after
+        the first drops its first point (it repeats the previous edge's last one).
+        Returns an (N, 2) array of (lon, lat).
+        """
+        if len(geom_ids) == 0:
+            return np.empty((0, 2))
+        geom_ids = np.asarray(geom_ids, dtype=np.int64)
+        reverse = np.asarray(reverse, dtype=bool)
+        starts = self.geom_offsets[geom_ids]
+        ends = self.geom_offsets[geom_ids + 1]
+        skip = np.ones(len(geom_ids), dtype=np.int64)
+        skip[0] = 0
+        take = (ends - starts) - skip
         
-        for i in range(len(path_nodes) - 1):
-            u = path_nodes[i]
-            v = path_nodes[i+1]
-            data = self.graph.get_edge_data(u, v)
-            
-            edge_len = data.get('weight', 0)
-            total_len += edge_len
-            
-            if 'geometry' in data:
-                seg_coords = list(data['geometry'].coords)
-                if len(coords) > 0: coords.extend(seg_coords[1:])
-                else: coords.extend(seg_coords)
-            else:
-                coords.append(u)
-                coords.append(v)
-                
-        return LineString(coords) if len(coords) > 1 else None, total_len
+        seg = np.repeat(np.arange(len(geom_ids)), take)
+        pos = np.arange(take.sum()) - np.repeat(np.cumsum(take) - take, take) + skip[seg]
+        idx = np.where(reverse[seg], ends[seg] - 1 - pos, starts[seg] + pos)
+        return self.coords[idx]
+
+    def speed_profile(self, geom_ids):
+        """
+        Road speeds along a sequence of edges as [[end_meter, kmh, road_group], ...],
+        one run per change of free-flow speed or congestion group.
+        """
+        if len(geom_ids) == 0:
+            return []
+        geom_ids = np.asarray(geom_ids, dtype=np.int64)
+        ends = np.cumsum(self.geom_length_m[geom_ids])
+        kmh = self.geom_kmh[geom_ids]
+        group = self.geom_group[geom_ids]
+        last = np.append((kmh[1:] != kmh[:-1]) | (group[1:] != group[:-1]), True)
+        return [[round(e, 2), k, g] for e, k, g in zip(ends[last].tolist(), kmh[last].tolist(), group[last].tolist())]
+
+    def assemble_path(self, path_nodes):
+        """Concatenates edge geometries along a node path. Returns ((N, 2) array of (lon, lat), Distance_Meters)."""
+        geom_ids, reverse, total_len = self.path_edges(path_nodes)
+        return self.gather_coords(geom_ids, reverse), total_len
 
     def _get_nearest_node(self, point_coords):
         target_lon = point_coords[1]
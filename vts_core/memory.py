@@ -0,0 +1,99 @@
+import os
+import gc
+import sys
+import logging
+from typing import Dict, List, Optional
+
+from vts_core.zones import ZoneRegistry
+
+logger = logging.getLogger(__name__)
+
+# Memory readings and worker sizing for batch runs. RSS comes from /proc on Linux,
+# psutil when it is installed, else the process peak from resource (None on
+# platforms with none of these). Artifact sizes use the zone registry's estimates.
+
+MB = 1024 * 1024
+DAY_WORKING_MB = 64 # Headroom for one vehicle-day in flight (agent buffers, DataFrames, plan geometry)
+
+def rss_mb() -> Optional[float]:
+    """Resident set size of this process in MB."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / MB
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / MB
+    except ImportError:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (MB if sys.platform == "darwin" else 1024) # bytes on macOS, KB elsewhere
+    except ImportError:
+        return None
+
+def available_mb() -> Optional[float]:
+    """Memory the OS can hand out without swapping (MemAvailable), in MB."""
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError):
+        pass
+    try:
+        import psutil
+        return psutil.virtual_memory().available / MB
+    except ImportError:
+        return None
+
+def measure_artifacts(zone_dirs: List[str], external_csv: str = None) -> Dict:
+    """
+    Sizes (MB) of what a worker keeps resident: each zone's cached artifacts
+    (graph, localities, routes, compiled library) and the external log DataFrame,
+    plus this process's RSS as the per-worker baseline.
+    """
+    base = rss_mb() or 0.0
+    registry = ZoneRegistry(max_bytes=sys.maxsize)
+    zones = {}
+    for zone_dir in sorted(set(zone_dirs)):
+        roads = os.path.join(zone_dir, "roads.geojson")
+        if not os.path.exists(roads):
+            continue
+        registry.network(roads, os.path.join(zone_dir, "localities.geojson"))
+        registry.localities(zone_dir)
+        registry.predefined_routes(zone_dir)
+        registry.route_library(zone_dir)
+        zones[os.path.basename(zone_dir)] = registry.nbytes / MB
+        registry.clear()
+    gc.collect()
+
+    external = 0.0
+    if external_csv and os.path.exists(external_csv):
+        from vts_core.external_data import ExternalLogProvider
+        df = ExternalLogProvider(external_csv).df
+        external = float(df.memory_usage(deep=True).sum()) / MB if not df.empty else 0.0
+    return {"base_mb": round(base, 1), "external_mb": round(external, 1), "zones_mb": {z: round(v, 1) for z, v in zones.items()}}
+
+def plan_workers(cores: int, tasks: int, budget_mb: float, artifacts: Dict, zone_cache_mb: float,
+                 available: float = None) -> Dict:
+    """
+    Pool size and per-worker zone cache that fit `budget_mb` per worker: a worker
+    holds the baseline, the external log, its zone cache (at least the largest
+    zone) and one vehicle-day. Workers are limited so that all of them fit in
+    `available` MB (when known).
+    """
+    zones = artifacts["zones_mb"]
+    largest = max(zones.values(), default=0.0)
+    fixed = artifacts["base_mb"] + artifacts["external_mb"] + DAY_WORKING_MB
+    cache = max(largest, min(zone_cache_mb, sum(zones.values()), budget_mb - fixed))
+    per_worker = fixed + cache
+    if per_worker > budget_mb:
+        logger.warning(f"⚠️ Budget {budget_mb:.0f} MB is below the estimated {per_worker:.0f} MB one worker needs "
+                       f"(largest zone {largest:.0f} MB); workers will be recycled often.")
+    size = max(1, min(cores, tasks))
+    if available:
+        size = max(1, min(size, int(available // max(budget_mb, per_worker))))
+    return {"processes": size, "zone_cache_mb": round(cache, 1), "per_worker_mb": round(per_worker, 1)}
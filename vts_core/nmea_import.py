@@ -0,0 +1,202 @@
+import os
+import re
+import glob
+import logging
+from typing import Dict, List, Tuple
+
+import yaml
+import numpy as np
+import pandas as pd
+
+from vts_core.store import SimulationStore
+from vts_core.sinks import format_nmea_lines, telemetry_path, tracker_path
+from vts_core.archive import CODECS, TrackerArchive, append_days, archive_path, index_path
+
+logger = logging.getLogger(__name__)
+
+# Bulk import of external position dumps (configs/Append_data.txt: tab-separated
+# "Vehicle Name, dd/mm/YYYY, HH:MM:SS, lat/lon" with a header row). Vehicles are
+# resolved once per distinct name through a registration-number index, the rows
+# are parsed column-wise, and every vehicle-day gets one merge: existing rows plus
+# the new ones in timestamp order, written once to its Parquet file, its tracker
+# text (plain file, or the vehicle-month archive when the day lives there) and a
+# catalog row. Re-importing the same dump adds nothing.
+
+ROUTE_ID = "EXTERNAL" # daily_plans.route_id of days that only hold imported points
+REG_PATTERN = re.compile(r"KA\d+[A-Z]+\d+")
+_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader) # libyaml when available: the index reads every config
+
+def _normalise(text: str) -> str:
+    return str(text).replace("_", "").replace(" ", "").upper()
+
+def build_vehicle_index(vehicles_dir: str) -> Dict[str, List[Dict]]:
+    """
+    Registration number (spaces removed, upper case) -> configs carrying it, as
+    {"imei", "name", "device_id", "start", "end"}; a vehicle re-registered for a
+    later window (…_A.yaml / …_B.yaml) has one entry per config.
+    """
+    index = {}
+    for path in sorted(glob.glob(os.path.join(vehicles_dir, "*.y*ml"))):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = yaml.load(f, Loader=_LOADER) or {}
+            vehicle = data.get("vehicle") or {}
+            window = data.get("simulation_window") or {}
+        except (OSError, yaml.YAMLError, AttributeError) as e:
+            logger.warning(f"⚠️ Could not read {path}: {e}")
+            continue
+        reg_no, imei, name = vehicle.get("vehicle_number"), vehicle.get("imei"), vehicle.get("name")
+        if reg_no and imei and name:
+            index.setdefault(_normalise(reg_no), []).append({
+                "imei": str(imei), "name": name, "device_id": vehicle.get("device_id") or name,
+                "start": str(window.get("start_date", "")), "end": str(window.get("end_date", "9999"))})
+    return index
+
+def resolve_vehicle(raw_name: str, index: Dict[str, List[Dict]]) -> List[Dict]:
+    """
+    Candidate configs of an input name like "C2_KA04AA7688_DESILTING": a name token that
+    is a registration number, else the longest registration number inside the name, else
+    the KA.. pattern. Configs whose vehicle name equals the input name come first.
+    """
+    hits = None
+    for token in str(raw_name).split("_"):
+        hits = index.get(_normalise(token))
+        if hits:
+            break
+    if not hits:
+        name = _normalise(raw_name)
+        found = [reg for reg in index if reg in name]
+        match = REG_PATTERN.search(name)
+        hits = index[max(found, key=len)] if found else index.get(match.group(0), []) if match else []
+    exact = [v for v in hits if v["name"].upper() == str(raw_name).strip().upper()]
+    return exact or hits
+
+def pick_config(candidates: List[Dict], date_str: str) -> Dict:
+    """The candidate whose simulation window holds the date (the IMEI simulated that day), else the latest window."""
+    for v in candidates:
+        if v["start"] <= date_str <= v["end"]:
+            return v
+    return max(candidates, key=lambda v: v["start"])
+
+def read_append_file(path: str, index: Dict[str, Dict]) -> pd.DataFrame:
+    """
+    Parses the dump into imei, vehicle_name, device_id, timestamp, lat, lon, date
+    (one row per valid input line). Rejected lines are logged with their reason.
+    """
+    with open(path, "r") as f:
+        lines = pd.Series(f.read().splitlines()[1:], dtype=object) # Skip header
+    lines = lines[lines.str.strip() != ""]
+    parts = lines.str.strip().str.split("\t", n=3, expand=True).reindex(columns=range(4))
+    raw_names = parts[0].fillna("")
+    timestamp = pd.to_datetime(parts[1] + " " + parts[2], format="%d/%m/%Y %H:%M:%S", errors="coerce")
+    lat_lon = parts[3].fillna("").str.split("/", n=1, expand=True).reindex(columns=range(2))
+    lat = pd.to_numeric(lat_lon[0], errors="coerce")
+    lon = pd.to_numeric(lat_lon[1], errors="coerce")
+
+    # One lookup per distinct vehicle name, not per line
+    candidates = {name: resolve_vehicle(name, index) for name in raw_names.unique()}
+    found = raw_names.map(lambda n: bool(candidates[n]))
+
+    reasons = pd.Series("", index=lines.index)
+    reasons[lat.isna() | lon.isna()] = "invalid lat/lon"
+    reasons[timestamp.isna()] = "invalid date/time"
+    reasons[~found] = "vehicle not found in configs"
+    reasons[parts[3].isna()] = "not enough columns"
+    for line_no, reason in reasons[reasons != ""].items():
+        logger.warning(f"⚠️ Line {line_no + 2}: {reason} ({raw_names[line_no]!r}). Skipping.")
+
+    ok = reasons == ""
+    dates = timestamp[ok].dt.strftime("%Y-%m-%d")
+    # ... and one config choice per distinct (name, date)
+    keys = list(zip(raw_names[ok], dates))
+    chosen = {key: pick_config(candidates[key[0]], key[1]) for key in set(keys)}
+    rows = [chosen[key] for key in keys]
+    return pd.DataFrame({
+        "imei": [v["imei"] for v in rows],
+        "vehicle_name": [v["name"] for v in rows],
+        "device_id": [v["device_id"] for v in rows],
+        "timestamp": timestamp[ok].to_numpy(),
+        "lat": lat[ok].to_numpy(dtype=float),
+        "lon": lon[ok].to_numpy(dtype=float),
+        "date": dates.to_numpy(),
+    })
+
+def _packet_id(line: str) -> str:
+    parts = line.split(",", 3)
+    return parts[2] if len(parts) > 2 else ""
+
+def merge_lines(existing: List[str], new: List[str]) -> Tuple[List[str], int]:
+    """Existing and new tracker lines in packet-time order (stable; lines already present are not repeated), and the count added."""
+    seen = set(existing)
+    fresh = [line for line in dict.fromkeys(new) if line not in seen]
+    return sorted(existing + fresh, key=_packet_id), len(fresh)
+
+def _merge_tracker(base_dir, vehicle_name: str, date_str: str, new_lines: List[str]) -> int:
+    """Merges into the plain day file, or into the vehicle-month archive if the day is archived. Returns lines added."""
+    plain = tracker_path(base_dir, vehicle_name, date_str)
+    if not plain.exists():
+        for codec in CODECS:
+            archive = archive_path(os.path.join(base_dir, "tracker"), vehicle_name, date_str, codec)
+            if archive.exists() and index_path(archive).exists():
+                reader = TrackerArchive(archive)
+                existing = reader.read_day(date_str).splitlines() if date_str in reader.index["days"] else []
+                merged, added = merge_lines(existing, new_lines)
+                if added:
+                    append_days(archive, {date_str: [line + "\n" for line in merged]}, codec)
+                return added
+    existing = plain.read_text().splitlines() if plain.exists() else []
+    merged, added = merge_lines(existing, new_lines)
+    if added:
+        plain.parent.mkdir(parents=True, exist_ok=True)
+        with open(plain, "w") as f:
+            f.writelines(line + "\n" for line in merged)
+    return added
+
+def _merge_parquet(base_dir, imei: str, date_str: str, new: pd.DataFrame) -> pd.DataFrame:
+    path = telemetry_path(base_dir, imei, date_str)
+    frames = [pd.read_parquet(path)] if path.exists() else []
+    merged = pd.concat(frames + [new], ignore_index=True)
+    merged["timestamp"] = pd.to_datetime(merged["timestamp"])
+    # Points already stored (same time and place) keep their recorded speed/heading
+    merged = merged.drop_duplicates(subset=["timestamp", "lat", "lon"], keep="first")
+    merged = merged.sort_values("timestamp", kind="stable").reset_index(drop=True)
+    if frames and len(merged) == len(frames[0]):
+        return merged # Nothing new for this day
+    path.parent.mkdir(parents=True, exist_ok=True)
+    merged.to_parquet(path, index=False)
+    return merged
+
+def _catalog_row(date_str: str, imei: str, day: pd.DataFrame) -> tuple:
+    lat, lon = np.radians(day["lat"].to_numpy()), np.radians(day["lon"].to_numpy())
+    # Haversine between consecutive points
+    a = np.sin(np.diff(lat) / 2) ** 2 + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(np.diff(lon) / 2) ** 2
+    km = float(6371.0 * 2 * np.arcsin(np.sqrt(a)).sum())
+    times = day["timestamp"].dt.strftime("%H:%M:%S")
+    return SimulationStore._plan_row(date_str, imei, route_id=ROUTE_ID, start_time=times.iloc[0],
+                                     end_time=times.iloc[-1], distance_km=round(km, 3))
+
+def import_points(points: pd.DataFrame, base_dir: str = "data", parquet: bool = True, catalog: bool = True) -> Dict:
+    """
+    Merges parsed points (read_append_file) into base_dir: one Parquet write, one tracker
+    write and one catalog row per vehicle-day. Days that already have a plan keep it.
+    Returns counts of days, points added and tracker lines added.
+    """
+    stats = {"days": 0, "points": len(points), "lines_added": 0, "plans_added": 0}
+    if points.empty:
+        return stats
+    store = SimulationStore(base_dir=base_dir, sinks=[]) if catalog else None
+    rows = []
+    points = points.assign(speed=0.0, heading=0.0) # Not in the dump; written as 0.00 like before
+    for (imei, vehicle_name, date_str), day in points.groupby(["imei", "vehicle_name", "date"], sort=True):
+        day = day.sort_values("timestamp", kind="stable")
+        new = day[["timestamp", "lat", "lon", "speed", "heading", "device_id"]].reset_index(drop=True)
+        merged = _merge_parquet(base_dir, imei, date_str, new) if parquet else new
+        stats["lines_added"] += _merge_tracker(base_dir, vehicle_name, date_str, format_nmea_lines(new, imei))
+        if catalog:
+            rows.append(_catalog_row(date_str, imei, merged))
+        stats["days"] += 1
+    if catalog and rows:
+        before = len(store.list_daily_plans())
+        store.save_daily_plans(rows, replace=False)
+        stats["plans_added"] = len(store.list_daily_plans()) - before
+    return stats
@@ -0,0 +1,120 @@
+import time
+import queue
+import logging
+import threading
+from typing import Dict, List, Tuple
+
+from vts_core.store import SimulationStore
+from vts_core.sinks import Sink, make_batch
+
+logger = logging.getLogger(__name__)
+
+# Streaming writes for batch runs: the simulation thread turns each finished
+# vehicle-day into one columnar batch and puts it on a bounded queue per sink;
+# one writer thread per sink (Parquet, NMEA tracker text, ... see vts_core.sinks)
+# and one for catalog (daily_plans) rows write concurrently. A full queue blocks
+# the producer, so at most queue_days vehicle-days per sink are in memory however
+# slow the disk is; the time the simulation spent blocked is reported as wait_s.
+#
+# Writers are threads rather than processes: batch workers are daemonic pool
+# processes and may not start children, and Parquet/file writes release the GIL.
+
+DEFAULT_QUEUE_DAYS = 8
+_STOP = object()
+
+class StreamingStore(SimulationStore):
+    def __init__(self, base_dir: str = "data", enable_legacy_logs: bool = True, plan_batch_size: int = 50,
+                 sinks: List[Sink] = None, queue_days: int = DEFAULT_QUEUE_DAYS):
+        super().__init__(base_dir=base_dir, enable_legacy_logs=enable_legacy_logs, plan_batch_size=plan_batch_size, sinks=sinks)
+        self.wait_s = 0.0 # Time the producer spent blocked on full queues
+        self.peak_depth = 0 # Most vehicle-days waiting in any queue
+        self.bytes_by_day: Dict[Tuple[str, str], int] = {} # (imei, date) -> bytes written by the writers
+        self._lock = threading.Lock()
+        self._error = None
+        self._queues, self._threads = {}, []
+        for i, sink in enumerate(self.sinks):
+            self._start(f"{sink.name}{i}", self._sink_writer(sink), queue_days, sink.close)
+        self._start("catalog", self.save_daily_plans, queue_days)
+
+    def _start(self, name, handler, maxsize, on_stop=None):
+        q = queue.Queue(maxsize=maxsize)
+        t = threading.Thread(target=self._writer_loop, args=(q, handler, on_stop), name=f"vts-{name}-writer", daemon=True)
+        t.start()
+        self._queues[name] = q
+        self._threads.append(t)
+
+    def _writer_loop(self, q, handler, on_stop):
+        while True:
+            item = q.get()
+            try:
+                if item is _STOP:
+                    if on_stop is not None and self._error is None:
+                        with self._lock:
+                            self.bytes_written += on_stop() # Whatever the sink still buffers
+                    return
+                if self._error is None: # After a failure the rest is drained, not written
+                    handler(*item)
+            except Exception as e:
+                logger.error(f"❌ Writer failed: {e}")
+                self._error = self._error or e
+            finally:
+                q.task_done()
+
+    def _put(self, name, item):
+        if self._error is not None:
+            raise RuntimeError(f"Telemetry writer failed: {self._error}") from self._error
+        q = self._queues[name]
+        try:
+            q.put_nowait(item)
+        except queue.Full:
+            # Backpressure: the writers are behind, wait for a free slot
+            t0 = time.perf_counter()
+            q.put(item)
+            self.wait_s += time.perf_counter() - t0
+        self.peak_depth = max(self.peak_depth, q.qsize())
+
+    def _sink_writer(self, sink):
+        def write(batch):
+            n = sink.write(batch)
+            with self._lock:
+                # Buffering sinks write several days at once; the bytes go to the day that triggered the flush
+                self.bytes_written += n
+                key = (batch.imei, batch.date)
+                self.bytes_by_day[key] = self.bytes_by_day.get(key, 0) + n
+        return write
+
+    def write_telemetry(self, imei: str, date_str: str, records: list, vehicle_name: str):
+        """Queues the vehicle-day for every sink's writer (blocks while a queue is full)."""
+        if not records:
+            return
+        batch = make_batch(imei, date_str, records, vehicle_name)
+        for name in self._queues:
+            if name != "catalog":
+                self._put(name, (batch,))
+
+    def flush_daily_plans(self):
+        rows, self._pending_plans = self._pending_plans, []
+        if rows:
+            self._put("catalog", (rows,))
+
+    def drain(self):
+        """Waits until everything queued so far is on disk."""
+        for q in self._queues.values():
+            q.join()
+        if self._error is not None:
+            raise RuntimeError(f"Telemetry writer failed: {self._error}") from self._error
+
+    def close(self):
+        """Flushes pending plans, stops the writers (closing their sinks) and re-raises the first writer error."""
+        if not self._threads:
+            return
+        try:
+            self.flush_daily_plans()
+        finally:
+            for q in self._queues.values():
+                q.put(_STOP)
+            for t in self._threads:
+                t.join()
+            self._threads = []
+        if self._error is not None:
+            raise RuntimeError(f"Telemetry writer failed: {self._error}") from self._error
@@ -0,0 +1,262 @@
+import os
+import io
+import sys
+import glob
+import time
+import pstats
+import cProfile
+import threading
+import tracemalloc
+import itertools
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Optional
+
+# Per-stage profiling for vts.py / run_batch.py (--profile). Engine code marks its
+# stages with `with stage("planning"):`; that is a no-op unless a profiler was
+# started in the process. Stages are exclusive: a stage entered inside another
+# (graph_load during planning) is charged to the inner one only.
+#
+# Modes: "cprofile" keeps one cProfile.Profile per stage; "sample" walks the main
+# thread's stack every few ms from a background thread and counts collapsed
+# stacks (stage;file:function;...), the input format of flamegraph.pl / speedscope.
+# Each worker dumps its parts after every task (Pool workers never run atexit);
+# merge_profiles() folds the parts into one report.
+#
+# Independently, enable_stage_timing() makes stage() accumulate exclusive wall
+# seconds per stage (a few perf_counter calls per stage, cheap enough to leave on
+# in batch runs); take_stage_times() hands them over per vehicle-day. With
+# memory="rss" or "tracemalloc" it also records, per stage, the largest RSS seen
+# at the stage's boundaries or the traced-allocation peak inside it (MB,
+# take_stage_memory()).
+
+STAGES = ("config_load", "graph_load", "planning", "physics", "write", "post_process")
+MODES = ("cprofile", "sample")
+SAMPLE_INTERVAL_S = 0.005
+PARTS_DIR = "parts"
+
+_active = None # This process's StageProfiler, if any
+_part_ids = itertools.count() # Part file numbers, unique within the process
+_times: Optional[Dict[str, float]] = None # Exclusive seconds per stage since the last take_stage_times()
+_clock = [] # [stage, started] of the stages entered, innermost last
+_memory_mode: Optional[str] = None
+_memory: Dict[str, float] = {} # Peak MB per stage since the last take_stage_memory()
+MEMORY_MODES = ("rss", "tracemalloc")
+_own_tracing = False # tracemalloc was started here (and is stopped here)
+
+def stage(name: str):
+    """Context manager charging the enclosed work to `name` (no-op without a profiler or stage timing)."""
+    if _times is None:
+        return _active.stage(name) if _active is not None else nullcontext()
+    return _timed_stage(name)
+
+@contextmanager
+def _timed_stage(name: str):
+    now = time.perf_counter()
+    if _clock:
+        outer = _clock[-1]
+        _times[outer[0]] = _times.get(outer[0], 0.0) + now - outer[1]
+        if _memory_mode:
+            _sample_memory(outer[0])
+    elif _memory_mode == "tracemalloc":
+        tracemalloc.reset_peak()
+    entry = [name, now]
+    _clock.append(entry)
+    try:
+        with (_active.stage(name) if _active is not None else nullcontext()):
+            yield
+    finally:
+        now = time.perf_counter()
+        _clock.pop()
+        if _times is not None:
+            _times[name] = _times.get(name, 0.0) + now - entry[1]
+        if _memory_mode:
+            _sample_memory(name)
+        if _clock:
+            _clock[-1][1] = now # The outer stage resumes
+
+def _sample_memory(name: str):
+    if _memory_mode == "tracemalloc":
+        mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.reset_peak() # The next stage (or the resumed outer one) starts a new peak
+    else:
+        from vts_core.memory import rss_mb
+        mb = rss_mb() or 0.0
+    _memory[name] = max(_memory.get(name, 0.0), mb)
+
+def enable_stage_timing(enabled: bool = True, memory: str = None):
+    """Turns stage timing on/off; memory adds per-stage "rss" or "tracemalloc" peaks (tracemalloc slows Python code ~2x)."""
+    global _times, _memory_mode, _own_tracing
+    if memory not in (None,) + MEMORY_MODES:
+        raise ValueError(f"Unknown memory mode {memory!r} (expected one of {', '.join(MEMORY_MODES)})")
+    _times = {} if enabled else None
+    _clock.clear()
+    _memory.clear()
+    _memory_mode = memory if enabled else None
+    if _memory_mode == "tracemalloc" and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _own_tracing = True
+    elif _memory_mode != "tracemalloc" and _own_tracing:
+        tracemalloc.stop()
+        _own_tracing = False
+
+def take_stage_times() -> Dict[str, float]:
+    """Exclusive seconds per stage since the previous call (empty when timing is off)."""
+    global _times
+    if _times is None:
+        return {}
+    taken, _times = _times, {}
+    return taken
+
+def take_stage_memory() -> Dict[str, float]:
+    """Peak MB per stage since the previous call (empty without memory sampling)."""
+    taken = dict(_memory)
+    _memory.clear()
+    return taken
+
+class StageProfiler:
+    def __init__(self, mode: str, out_dir: str, interval: float = SAMPLE_INTERVAL_S):
+        if mode not in MODES:
+            raise ValueError(f"Unknown profile mode {mode!r} (expected one of {', '.join(MODES)})")
+        self.mode = mode
+        self.out_dir = out_dir
+        self.interval = interval
+        self.profiles: Dict[str, cProfile.Profile] = {}
+        self.samples = Counter()
+        self._stack = []
+        self._thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._sampler = None
+
+    def start(self):
+        global _active
+        _active = self
+        if self.mode == "sample":
+            self._stop.clear()
+            self._sampler = threading.Thread(target=self._sample_loop, name="vts-sampler", daemon=True)
+            self._sampler.start()
+        return self
+
+    def stop(self):
+        global _active
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+            self._sampler = None
+        if _active is self:
+            _active = None
+
+    @contextmanager
+    def stage(self, name: str):
+        if self.mode == "cprofile":
+            if self._stack:
+                self.profiles[self._stack[-1]].disable()
+            profile = self.profiles.setdefault(name, cProfile.Profile())
+            profile.enable()
+        self._stack.append(name)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            if self.mode == "cprofile":
+                profile.disable()
+                if self._stack:
+                    self.profiles[self._stack[-1]].enable()
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            stage_name = self._stack[-1] if self._stack else "other"
+            self.samples[";".join([stage_name] + names[::-1])] += 1
+
+    def dump(self):
+        """Writes what was collected since the last dump under out_dir/parts and starts afresh."""
+        parts = os.path.join(self.out_dir, PARTS_DIR)
+        os.makedirs(parts, exist_ok=True)
+        tag = f"{os.getpid()}.{next(_part_ids)}"
+        if self.mode == "cprofile":
+            for name, profile in self.profiles.items():
+                if name not in self._stack: # Stages still running stay in memory
+                    profile.dump_stats(os.path.join(parts, f"{name}.{tag}.prof"))
+            self.profiles = {name: p for name, p in self.profiles.items() if name in self._stack}
+        else:
+            samples, self.samples = self.samples, Counter()
+            with open(os.path.join(parts, f"samples.{tag}.collapsed"), 'w') as f:
+                for stack, n in samples.items():
+                    f.write(f"{stack} {n}\n")
+
+def start_profiler(mode: str, out_dir: str, interval: float = SAMPLE_INTERVAL_S) -> StageProfiler:
+    return StageProfiler(mode, out_dir, interval).start()
+
+def active_profiler() -> Optional[StageProfiler]:
+    return _active
+
+def clear_profile_parts(out_dir: str):
+    for path in glob.glob(os.path.join(out_dir, PARTS_DIR, "*")):
+        os.remove(path)
+
+def _stage_order(name: str):
+    return (STAGES.index(name) if name in STAGES else len(STAGES), name)
+
+def merge_profiles(out_dir: str, top: int = 25) -> Optional[str]:
+    """
+    Merges every worker's parts into out_dir: <stage>.prof (cprofile, readable with
+    pstats / snakeviz) or profile.collapsed (sample), plus profile_report.txt.
+    Returns the report path, or None when there was nothing to merge.
+    """
+    parts = os.path.join(out_dir, PARTS_DIR)
+    report = io.StringIO()
+    by_stage = {}
+    for path in glob.glob(os.path.join(parts, "*.prof")):
+        by_stage.setdefault(os.path.basename(path).split(".")[0], []).append(path)
+    collapsed = glob.glob(os.path.join(parts, "*.collapsed"))
+    if not by_stage and not collapsed:
+        return None
+
+    if by_stage:
+        stats = {name: pstats.Stats(*files, stream=report) for name, files in by_stage.items()}
+        total = sum(s.total_tt for s in stats.values()) or 1.0
+        report.write(f"Profiled time by stage ({sum(len(f) for f in by_stage.values())} parts):\n")
+        for name in sorted(stats, key=_stage_order):
+            report.write(f"   {name:<14}{stats[name].total_tt:>10.2f}s {100 * stats[name].total_tt / total:>6.1f}%\n")
+        for name in sorted(stats, key=_stage_order):
+            stats[name].dump_stats(os.path.join(out_dir, f"{name}.prof"))
+            report.write(f"\n===== {name} (top {top} by cumulative time) =====\n")
+            stats[name].sort_stats("cumulative").print_stats(top)
+
+    if collapsed:
+        merged = Counter()
+        for path in collapsed:
+            with open(path, 'r') as f:
+                for line in f:
+                    stack, _, n = line.rstrip("\n").rpartition(" ")
+                    merged[stack] += int(n)
+        with open(os.path.join(out_dir, "profile.collapsed"), 'w') as f:
+            for stack, n in sorted(merged.items()):
+                f.write(f"{stack} {n}\n")
+        total = sum(merged.values()) or 1
+        per_stage, self_time = Counter(), {}
+        for stack, n in merged.items():
+            frames = stack.split(";")
+            per_stage[frames[0]] += n
+            self_time.setdefault(frames[0], Counter())[frames[-1]] += n
+        report.write(f"Samples by stage ({total} samples, {len(collapsed)} parts):\n")
+        for name in sorted(per_stage, key=_stage_order):
+            report.write(f"   {name:<14}{per_stage[name]:>10} {100 * per_stage[name] / total:>6.1f}%\n")
+        for name in sorted(self_time, key=_stage_order):
+            report.write(f"\n===== {name} (top {top} by self samples) =====\n")
+            for func, n in self_time[name].most_common(top):
+                report.write(f"   {n:>8} {100 * n / total:>6.1f}%  {func}\n")
+
+    path = os.path.join(out_dir, "profile_report.txt")
+    with open(path, 'w') as f:
+        f.write(report.getvalue())
+    clear_profile_parts(out_dir)
+    return path
@@ -0,0 +1,280 @@
+import os
+import json
+import hashlib
+import glob
+import yaml
+import networkx as nx
+from vts_core.geodata import load_localities
+from typing import Dict, List, Optional
+
+LIBRARY_FILENAME = "route_library.json"
+LIBRARY_VERSION = 3 # 3: graph fingerprint includes a node checksum
+
+# Diverse alternatives (penalty method): every accepted path makes its edges more
+# expensive for the next search; candidates too similar or too long are rejected.
+DEFAULT_ALTERNATIVES = 3
+ALT_PENALTY_FACTOR = 1.4
+ALT_MAX_OVERLAP = 0.8 # Max share of a candidate's length shared with any accepted path
+ALT_MAX_STRETCH = 1.3 # Max length relative to the base (shortest) path
+
+def node_checksum(network) -> str:
+    """SHA-1 of the node coordinates in node index order (what library node indices refer to)."""
+    return hashlib.sha1(json.dumps(network.node_list).encode()).hexdigest()
+
+class RouteLibrary:
+    """
+    Compiled routes for one zone: waypoints snapped to graph node indices and
+    precomputed base (noise-free) leg paths between them.
+
+    Node indices refer to `RoadNetwork.node_list`, so a library is only valid for
+    the road graph it was compiled from (checked via the `graph` fingerprint: node
+    and edge counts plus a checksum of the node list).
+    Each leg also carries up to k-1 diverse alternatives to the base path.
+    """
+    def __init__(self, data: Dict):
+        self.data = data
+        self.zone = data.get("zone")
+        self.graph_info = data.get("graph", {})
+        self.routes: List[Dict] = data.get("routes", [])
+        self.templates: Dict[str, Dict] = {t["template_id"]: t for t in data.get("templates", [])}
+        self.legs: Dict[str, Dict] = data.get("legs", {})
+        self.depots: Dict[str, int] = data.get("depots", {})
+        self.weight: str = data.get("weight", "weight") # Edge attribute the legs minimise ('time' = travel time)
+
+    def matches(self, network) -> bool:
+        # A roads.geojson edit that keeps the node count still moves node indices: compare the checksum too
+        return (self.data.get("version") == LIBRARY_VERSION and
+                self.graph_info.get("node_count") == len(network.node_list) and
+                self.graph_info.get("edge_count") == network.graph.number_of_edges() and
+                self.graph_info.get("node_checksum") == node_checksum(network))
+
+    def leg_alternatives(self, u_idx: int, v_idx: int) -> List[List[int]]:
+        """Base path first, then the stored alternatives ([] if the leg was not compiled)."""
+        leg, reverse = self.legs.get(f"{u_idx}>{v_idx}"), False
+        if not leg:
+            # Roads are added in both directions, so a reversed leg is a valid path
+            leg, reverse = self.legs.get(f"{v_idx}>{u_idx}"), True
+        if not leg:
+            return []
+        paths = [leg["nodes"]] + [alt["nodes"] for alt in leg.get("alternatives", [])]
+        return [p[::-1] for p in paths] if reverse else paths
+
+def diverse_paths(network, source, target, k: int = DEFAULT_ALTERNATIVES, penalty: float = ALT_PENALTY_FACTOR,
+                  max_overlap: float = ALT_MAX_OVERLAP, max_stretch: float = ALT_MAX_STRETCH, weight: str = 'weight') -> List[List]:
+    """
+    Up to k node paths from source to target: the shortest path, then alternatives
+    found by repeatedly penalising the edges of previous results. `weight` is the
+    edge attribute minimised (and measured for overlap/stretch).
+    """
+    graph = network.graph
+    try:
+        base = nx.shortest_path(graph, source, target, weight=weight)
+    except nx.NetworkXNoPath:
+        return []
+
+    def edge_lengths(path):
+        return {(a, b): graph[a][b][weight] for a, b in zip(path, path[1:])}
+
+    accepted = [base]
+    accepted_edges = [set(edge_lengths(base))]
+    base_len = sum(edge_lengths(base).values())
+    penalties = {}
+
+    def penalise(path):
+        for a, b in zip(path, path[1:]):
+            # Roads are two-way: penalise both directions so the reverse leg diverges too
+            penalties[(a, b)] = penalties.get((a, b), 1.0) * penalty
+            penalties[(b, a)] = penalties.get((b, a), 1.0) * penalty
+
+    def penalised_weight(u, v, d):
+        return d[weight] * penalties.get((u, v), 1.0)
+
+    penalise(base)
+    for _ in range(3 * k):
+        if len(accepted) >= k: break
+        cand = nx.shortest_path(graph, source, target, weight=penalised_weight)
+        penalise(cand)
+        lengths = edge_lengths(cand)
+        cand_len = sum(lengths.values())
+        if cand_len > max_stretch * base_len or cand_len == 0:
+            continue
+        cand_edges = set(lengths)
+        too_similar = False
+        for edges in accepted_edges:
+            shared = sum(w for e, w in lengths.items() if e in edges or (e[1], e[0]) in edges)
+            if shared / cand_len > max_overlap:
+                too_similar = True
+                break
+        if too_similar:
+            continue
+        accepted.append(cand)
+        accepted_edges.append(cand_edges)
+    return accepted
+
+def load_locality_centroids(localities_path: str) -> Dict[str, Dict]:
+    """locality_id -> {'name', 'lon', 'lat'} for every feature with a locality_id."""
+    locs = load_localities(localities_path)
+    out = {}
+    for loc_id, name, lon, lat in zip(locs.ids, locs.names, locs.lon.tolist(), locs.lat.tolist()):
+        if not loc_id: continue
+        out[loc_id] = {"name": name or loc_id, "lon": lon, "lat": lat}
+    return out
+
+def load_route_templates(templates_dir: str) -> List[Dict]:
+    """
+    Reads configs/routes/<zone>/*.yaml. Template files carry `template_id`; the
+    optional template_locality_map.yaml supplies `allowed_localities` fallbacks.
+    """
+    templates, locality_map = [], {}
+    if not templates_dir or not os.path.isdir(templates_dir):
+        return templates
+    for path in sorted(glob.glob(os.path.join(templates_dir, "*.yaml"))):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = yaml.safe_load(f) or {}
+        if "template_id" in data:
+            templates.append(data)
+        elif "templates" in data:
+            locality_map.update(data["templates"])
+
+    for tpl in templates:
+        pool = tpl.get("locality_pool") or {}
+        include = pool.get("include") or locality_map.get(tpl["template_id"], {}).get("allowed_localities", [])
+        exclude = set(pool.get("exclude") or [])
+        tpl["_pool"] = [loc for loc in include if loc not in exclude]
+    return templates
+
+def compile_route_library(network, zone_name: str, routes_file: str = None, templates_dir: str = None,
+                          localities_path: str = None, depots: Dict[str, tuple] = None,
+                          alternatives: int = DEFAULT_ALTERNATIVES, weight: str = 'weight') -> Dict:
+    """
+    Snaps predefined routes (routes.json), route templates (configs/routes) and
+    vehicle depots onto the road graph and precomputes up to `alternatives` diverse
+    paths per leg: consecutive route stops, every pair of pool localities, and
+    each depot to the route ends / template pools.
+    `depots` maps a vehicle imei to its (lat, lon) depot. `weight` is the edge
+    attribute legs minimise ('time' for free-flow travel time).
+    """
+    nodes = network.node_list
+    index = network.node_index
+    legs = {}
+
+    def snap(lon, lat):
+        node = network._get_nearest_node((lat, lon))
+        return index[node] if node is not None else None
+
+    def add_leg(u_idx, v_idx):
+        if u_idx is None or v_idx is None or u_idx == v_idx: return
+        key = f"{u_idx}>{v_idx}"
+        if key in legs or f"{v_idx}>{u_idx}" in legs: return
+        paths = diverse_paths(network, nodes[u_idx], nodes[v_idx], k=alternatives, weight=weight)
+        if not paths: return
+        encoded = []
+        for path in paths:
+            _, length = network.assemble_path(path)
+            encoded.append({"nodes": [index[n] for n in path], "length_m": round(length, 2)})
+        legs[key] = dict(encoded[0], alternatives=encoded[1:])
+
+    # 1. Predefined routes
+    routes = []
+    if routes_file and os.path.exists(routes_file):
+        with open(routes_file, 'r') as rf:
+            raw_routes = json.load(rf).get("routes", [])
+        for r in raw_routes:
+            snapped = []
+            for pt in r.get("waypoints", []):
+                s = snap(pt[0], pt[1])
+                # Drop unsnappable points and consecutive waypoints landing on the same node
+                if s is not None and (not snapped or snapped[-1] != s):
+                    snapped.append(s)
+            if not snapped: continue
+            for a, b in zip(snapped, snapped[1:]):
+                add_leg(a, b)
+            routes.append({
+                "route_id": r["route_id"],
+                "name": r.get("name", r["route_id"]),
+                "nodes": snapped,
+                "stops": r.get("stops", [])
+            })
+
+    # 2. Route templates (locality pools)
+    templates = []
+    centroids = load_locality_centroids(localities_path)
+    for tpl in load_route_templates(templates_dir):
+        pool = []
+        for loc_id in tpl["_pool"]:
+            loc = centroids.get(loc_id)
+            if not loc:
+                print(f"⚠️ {tpl['template_id']}: locality {loc_id} not found, skipped.")
+                continue
+            node = snap(loc["lon"], loc["lat"])
+            if node is not None:
+                pool.append({"locality_id": loc_id, "name": loc["name"], "node": node})
+        if not pool: continue
+        
+        depot_node = None
+        start_end = tpl.get("start_end") or {}
+        if start_end.get("locality_id") in centroids:
+            loc = centroids[start_end["locality_id"]]
+            depot_node = snap(loc["lon"], loc["lat"])
+        
+        endpoints = [p["node"] for p in pool] + ([depot_node] if depot_node is not None else [])
+        for a in endpoints:
+            for b in endpoints:
+                add_leg(a, b)
+        
+        templates.append({
+            "template_id": tpl["template_id"],
+            "vehicle_type": tpl.get("vehicle_type"),
+            "depot": depot_node,
+            "localities": pool,
+            "daily_stops": tpl.get("daily_stops", {"min": 3, "max": 6}),
+            "dwell_rules": tpl.get("dwell_rules", {}),
+            "expected_distance_km": (tpl.get("route_characteristics") or {}).get("expected_distance_km")
+        })
+
+    # 3. Vehicle depots: legs out to (and back from) every route end and template pool
+    depot_nodes = {}
+    for imei, (lat, lon) in (depots or {}).items():
+        node = snap(lon, lat)
+        if node is None: continue
+        depot_nodes[str(imei)] = node
+        for r in routes:
+            add_leg(node, r["nodes"][0])
+            add_leg(node, r["nodes"][-1])
+        for tpl in templates:
+            if tpl["depot"] is None:
+                for loc in tpl["localities"]:
+                    add_leg(node, loc["node"])
+
+    return {
+        "version": LIBRARY_VERSION,
+        "zone": zone_name,
+        "graph": {"node_count": len(nodes), "edge_count": network.graph.number_of_edges(), "node_checksum": node_checksum(network)},
+        "weight": weight,
+        "routes": routes,
+        "templates": templates,
+        "depots": depot_nodes,
+        "legs": legs
+    }
+
+def save_route_library(library: Dict, zone_dir: str) -> str:
+    path = os.path.join(zone_dir, LIBRARY_FILENAME)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(library, f, separators=(",", ":"))
+    return path
+
+def load_route_library(zone_dir: str) -> Optional[RouteLibrary]:
+    """Reads a compiled library (None if the zone has none). Cached via vts_core.zones."""
+    path = os.path.join(zone_dir, LIBRARY_FILENAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return RouteLibrary(json.load(f))
+
+def load_predefined_routes(zone_dir: str) -> List[Dict]:
+    """Raw routes.json entries (uncompiled fallback). Cached via vts_core.zones."""
+    path = os.path.join(zone_dir, "routes.json")
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r') as rf:
+        return json.load(rf).get("routes", [])
@@ -0,0 +1,159 @@
+import math
+import heapq
+import weakref
+from itertools import count
+from typing import Callable, Dict, List
+
+import networkx as nx
+
+# Point-to-point searches over a RoadNetwork graph that report how many nodes
+# they settle: plain Dijkstra (reference), A* with a straight-line lower bound,
+# and bidirectional Dijkstra. `weight` is an edge attribute name or a networkx
+# style function weight(u, v, data).
+
+METERS_PER_DEGREE = 111139.0
+NOISE_FLOOR = 0.95 # Lowest per-edge factor applied by the engine's stochastic search
+
+_SCALES = weakref.WeakKeyDictionary() # graph -> {weight attribute: heuristic scale}
+
+def _weight_fn(weight) -> Callable:
+    if callable(weight):
+        return weight
+    return lambda u, v, d: d.get(weight, 1)
+
+def _unwind(pred: Dict, node) -> List:
+    path = [node]
+    while pred[path[-1]] is not None:
+        path.append(pred[path[-1]])
+    return path[::-1]
+
+def dijkstra_path(graph, source, target, weight='weight', stats: Dict = None) -> List:
+    w = _weight_fn(weight)
+    dist, pred, done = {source: 0.0}, {source: None}, set()
+    c = count()
+    heap = [(0.0, next(c), source)]
+    while heap:
+        d, _, u = heapq.heappop(heap)
+        if u in done: continue
+        done.add(u)
+        if u == target: break
+        for v, data in graph._adj[u].items():
+            if v in done: continue
+            nd = d + w(u, v, data)
+            if nd < dist.get(v, math.inf):
+                dist[v], pred[v] = nd, u
+                heapq.heappush(heap, (nd, next(c), v))
+    _count(stats, len(done))
+    if target not in done:
+        raise nx.NetworkXNoPath(f"No path between {source} and {target}")
+    return _unwind(pred, target)
+
+def heuristic_scale(network) -> float:
+    """
+    Cost per degree of straight-line node distance that never overestimates the
+    remaining (noisy) path cost in the network's weight_attr (meters, or seconds
+    for travel time). Node coordinates are rounded, so a few short edges are
+    shorter than the chord between their nodes; the scale is lowered to cover
+    them, which keeps the heuristic consistent.
+    """
+    attr = getattr(network, "weight_attr", "weight")
+    # Cached per graph object: views (zones, travel time, per-day wrappers) share their graph's scale
+    scales = _SCALES.setdefault(network.graph, {})
+    if attr not in scales:
+        ratio = 1.0 if attr == 'weight' else math.inf
+        for u, v, d in network.graph.edges(data=True):
+            chord = math.hypot(u[0] - v[0], u[1] - v[1]) * METERS_PER_DEGREE
+            if chord > 0:
+                ratio = min(ratio, d[attr] / chord)
+        scales[attr] = NOISE_FLOOR * (ratio if ratio < math.inf else 0.0) * METERS_PER_DEGREE
+    return scales[attr]
+
+def astar_path(network, source, target, weight='weight', stats: Dict = None) -> List:
+    w = _weight_fn(weight)
+    k = heuristic_scale(network)
+    tx, ty = target
+
+    def h(n):
+        return k * math.hypot(n[0] - tx, n[1] - ty)
+
+    graph = network.graph
+    dist, pred, done = {source: 0.0}, {source: None}, set()
+    c = count()
+    heap = [(h(source), next(c), 0.0, source)]
+    while heap:
+        _, _, d, u = heapq.heappop(heap)
+        if u in done: continue
+        done.add(u)
+        if u == target: break
+        for v, data in graph._adj[u].items():
+            if v in done: continue
+            nd = d + w(u, v, data)
+            if nd < dist.get(v, math.inf):
+                dist[v], pred[v] = nd, u
+                heapq.heappush(heap, (nd + h(v), next(c), nd, v))
+    _count(stats, len(done))
+    if target not in done:
+        raise nx.NetworkXNoPath(f"No path between {source} and {target}")
+    return _unwind(pred, target)
+
+def bidirectional_dijkstra_path(graph, source, target, weight='weight', stats: Dict = None) -> List:
+    """Alternates forward (successors) and backward (predecessors) searches; stops when their radii meet the best path."""
+    if source == target:
+        _count(stats, 1)
+        return [source]
+    w = _weight_fn(weight)
+    dist = [{source: 0.0}, {target: 0.0}]
+    pred = [{source: None}, {target: None}]
+    done = [set(), set()]
+    adj = [graph._succ, graph._pred]
+    c = count()
+    heaps = [[(0.0, next(c), source)], [(0.0, next(c), target)]]
+    best, meet = math.inf, None
+
+    while heaps[0] and heaps[1]:
+        if heaps[0][0][0] + heaps[1][0][0] >= best:
+            break
+        side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+        d, _, u = heapq.heappop(heaps[side])
+        if u in done[side]: continue
+        done[side].add(u)
+        for v, data in adj[side][u].items():
+            # Backward search walks edge v -> u
+            nd = d + (w(u, v, data) if side == 0 else w(v, u, data))
+            if nd < dist[side].get(v, math.inf):
+                dist[side][v], pred[side][v] = nd, u
+                heapq.heappush(heaps[side], (nd, next(c), v))
+                if v in dist[1 - side] and nd + dist[1 - side][v] < best:
+                    best, meet = nd + dist[1 - side][v], v
+    _count(stats, len(done[0]) + len(done[1]))
+    if meet is None:
+        raise nx.NetworkXNoPath(f"No path between {source} and {target}")
+    return _unwind(pred[0], meet) + _unwind(pred[1], meet)[::-1][1:]
+
+def _count(stats, settled):
+    if stats is not None:
+        stats["queries"] = stats.get("queries", 0) + 1
+        stats["settled"] = stats.get("settled", 0) + settled
+        stats["last_settled"] = settled
+
+SEARCHES = {
+    "dijkstra": lambda network, s, t, weight, stats: dijkstra_path(network.graph, s, t, weight, stats),
+    "astar": astar_path,
+    "bidirectional": lambda network, s, t, weight, stats: bidirectional_dijkstra_path(network.graph, s, t, weight, stats),
+}
+
+class SearchNetwork:
+    """
+    A network view whose path queries run one of SEARCHES and count settled nodes
+    (stats: queries, settled, last_settled).
+    """
+    def __init__(self, network, method: str = "astar"):
+        self.network = network
+        self.method = method
+        self.stats: Dict = {}
+
+    def shortest_path_nodes(self, start_node, end_node, weight='weight', attr=None):
+        return SEARCHES[self.method](self.network, start_node, end_node, weight, self.stats)
+
+    def __getattr__(self, name):
+        return getattr(self.network, name)
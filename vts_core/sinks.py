@@ -0,0 +1,348 @@
+import os
+import json
+import time
+import socket
+import logging
+import itertools
+from abc import ABC, abstractmethod
+from pathlib import Path
+from dataclasses import dataclass
+from urllib.parse import urlsplit, parse_qsl
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from vts_core.archive import append_days, archive_path, resolve_codec
+
+logger = logging.getLogger(__name__)
+
+# Output sinks for telemetry. SimulationStore.write_telemetry turns a vehicle-day
+# into one columnar TelemetryBatch and hands it to every enabled sink, so each
+# format is produced in the same pass instead of by a tool re-reading Parquet.
+# A sink buffers batches and writes them when its flush policy says so: every
+# flush_days vehicle-days, flush_rows rows or flush_s seconds (whichever comes
+# first; 0/None disables a trigger), and always on close().
+#
+# Sinks are chosen with a spec like "parquet,archive,csv?flush_days=20,udp://host:5005"
+# (see build_sinks). Paths follow the existing layout under the store's base_dir.
+
+@dataclass
+class TelemetryBatch:
+    imei: str
+    date: str
+    vehicle_name: str
+    frame: pd.DataFrame # timestamp, lat, lon, speed, heading, device_id (sinks must not modify it)
+
+def make_batch(imei: str, date_str: str, records: list, vehicle_name: str) -> TelemetryBatch:
+    df = pd.DataFrame(records)
+    # Ensure timestamp is datetime for parquet efficiency
+    if not df.empty and isinstance(df.iloc[0]['timestamp'], str):
+        df['timestamp'] = pd.to_datetime(df['timestamp'])
+    return TelemetryBatch(str(imei), date_str, vehicle_name, df)
+
+def telemetry_path(base_dir, imei: str, date_str: str) -> Path:
+    # Parquet Path: data/telemetry/year=2023/month=01/
+    year, month, _ = date_str.split("-")
+    return Path(base_dir) / "telemetry" / f"year={year}" / f"month={month}" / f"{imei}_{date_str}.parquet"
+
+def tracker_path(base_dir, vehicle_name: str, date_str: str, ext: str = "txt", root: str = "tracker") -> Path:
+    # Text Log Path: data/tracker/{Vehicle Name}/{Year}/{Month}/{Date}.txt
+    year, month, _ = date_str.split("-")
+    return Path(base_dir) / root / vehicle_name / year / month / f"{date_str}.{ext}"
+
+def _timestamps(frame: pd.DataFrame) -> pd.Series:
+    ts = frame["timestamp"]
+    if not pd.api.types.is_datetime64_any_dtype(ts):
+        ts = pd.to_datetime(ts, errors="coerce", format="mixed")
+    return ts
+
+def _column(frame: pd.DataFrame, name: str) -> list:
+    return frame[name].tolist() if name in frame.columns else [0.0] * len(frame)
+
+def format_nmea_lines(frame: pd.DataFrame, imei: str) -> List[str]:
+    """
+    Tracker lines of a batch, column-wise. Same text as SimulationStore._format_log_line
+    per record (rows whose timestamp does not parse are dropped, as there).
+    """
+    if frame.empty:
+        return []
+    ts = _timestamps(frame)
+    valid = ts.notna().to_numpy()
+    packet = ts.dt.strftime("%y%m%d%H%M%S").tolist()
+    clock = ts.dt.strftime("%H%M%S.000").tolist()
+    lat, lon = frame["lat"].to_numpy(dtype=float), frame["lon"].to_numpy(dtype=float)
+    # decimal_to_nmea on whole columns: degrees and minutes
+    lat_deg, lon_deg = np.abs(lat).astype(int), np.abs(lon).astype(int)
+    lat_min, lon_min = (np.abs(lat) - lat_deg) * 60, (np.abs(lon) - lon_deg) * 60
+    speed, heading = _column(frame, "speed"), _column(frame, "heading")
+    return [
+        f"imei:{imei},tracker,{p},,F,{c},A,"
+        f"{ld:02d}{lm:07.4f},{'N' if la >= 0 else 'S'},{od:03d}{om:07.4f},{'E' if lo >= 0 else 'W'},"
+        f"{s:.2f},{h:.2f};"
+        for p, c, ld, lm, la, od, om, lo, s, h, ok in zip(packet, clock, lat_deg.tolist(), lat_min.tolist(), lat.tolist(),
+                                                          lon_deg.tolist(), lon_min.tolist(), lon.tolist(), speed, heading, valid)
+        if ok
+    ]
+
+def geojson_features(frame: pd.DataFrame, imei: str, vehicle_name: str) -> List[Dict]:
+    """Point features as written by tools/export_geojson.py."""
+    frame = frame.sort_values("timestamp")
+    stamps = _timestamps(frame).dt.strftime("%Y-%m-%d %H:%M:%S").tolist()
+    return [
+        {"type": "Feature",
+         "properties": {"timestamp": t, "speed": f"{s:.1f} kts", "heading": f"{h:.1f}", "imei": imei, "vehicle": vehicle_name},
+         "geometry": {"type": "Point", "coordinates": [lon, lat]}}
+        for t, s, h, lon, lat in zip(stamps, _column(frame, "speed"), _column(frame, "heading"),
+                                     frame["lon"].tolist(), frame["lat"].tolist())
+    ]
+
+class Sink(ABC):
+    name = "sink"
+
+    def __init__(self, base_dir, flush_days: int = 1, flush_rows: int = None, flush_s: float = None):
+        self.base_dir = Path(base_dir)
+        self.flush_days = flush_days
+        self.flush_rows = flush_rows
+        self.flush_s = flush_s
+        self.bytes_written = 0
+        self._pending: List[TelemetryBatch] = []
+        self._rows = 0
+        self._last_flush = time.monotonic()
+
+    def write(self, batch: TelemetryBatch) -> int:
+        """Buffers the batch; returns the bytes written if that triggered a flush."""
+        self._pending.append(batch)
+        self._rows += len(batch.frame)
+        if (self.flush_days and len(self._pending) >= self.flush_days) or \
+                (self.flush_rows and self._rows >= self.flush_rows) or \
+                (self.flush_s is not None and time.monotonic() - self._last_flush >= self.flush_s):
+            return self.flush()
+        return 0
+
+    def flush(self) -> int:
+        batches, self._pending, self._rows = self._pending, [], 0
+        self._last_flush = time.monotonic()
+        written = self._write_batches(batches) if batches else 0
+        self.bytes_written += written
+        return written
+
+    def close(self) -> int:
+        return self.flush()
+
+    @abstractmethod
+    def _write_batches(self, batches: List[TelemetryBatch]) -> int:
+        """Writes the buffered batches; returns the bytes written."""
+
+class ParquetSink(Sink):
+    """data/telemetry/year=YYYY/month=MM/{imei}_{date}.parquet (the source of truth)."""
+    name = "parquet"
+
+    def _write_batches(self, batches):
+        written = 0
+        for b in batches:
+            path = telemetry_path(self.base_dir, b.imei, b.date)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            b.frame.to_parquet(path, index=False)
+            written += path.stat().st_size
+        return written
+
+class NmeaTextSink(Sink):
+    """data/tracker/{vehicle}/{YYYY}/{MM}/{date}.txt, one NMEA line per record."""
+    name = "nmea"
+
+    def _write_batches(self, batches):
+        written = 0
+        for b in batches:
+            path = tracker_path(self.base_dir, b.vehicle_name, b.date)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "w") as f:
+                f.writelines(line + "\n" for line in format_nmea_lines(b.frame, b.imei))
+            written += path.stat().st_size
+        return written
+
+class CsvSink(Sink):
+    """data/csv/{vehicle}/{YYYY}/{MM}/{date}.csv with the telemetry columns plus imei."""
+    name = "csv"
+
+    def _write_batches(self, batches):
+        written = 0
+        for b in batches:
+            path = tracker_path(self.base_dir, b.vehicle_name, b.date, ext="csv", root="csv")
+            path.parent.mkdir(parents=True, exist_ok=True)
+            b.frame.assign(imei=b.imei).to_csv(path, index=False)
+            written += path.stat().st_size
+        return written
+
+class GeoJsonSink(Sink):
+    """data/exported_geojson/{vehicle}/{date}.geojson, a FeatureCollection of points."""
+    name = "geojson"
+
+    def _write_batches(self, batches):
+        written = 0
+        for b in batches:
+            path = self.base_dir / "exported_geojson" / b.vehicle_name / f"{b.date}.geojson"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "w") as f:
+                json.dump({"type": "FeatureCollection", "features": geojson_features(b.frame, b.imei, b.vehicle_name)}, f)
+            written += path.stat().st_size
+        return written
+
+class ArrowIpcSink(Sink):
+    """
+    Arrow IPC stream files data/arrow/part-{pid}-{n}.arrows (telemetry plus imei and
+    date columns), one record batch per flush. Read with pyarrow.ipc.open_stream.
+    """
+    name = "arrow"
+    _parts = itertools.count()
+
+    def __init__(self, base_dir, flush_days: int = 0, flush_rows: int = 65536, flush_s: float = None):
+        super().__init__(base_dir, flush_days, flush_rows, flush_s)
+        self._writer = None
+        self._file = None
+        self._schema = None
+        self.path = None
+
+    def _write_batches(self, batches):
+        import pyarrow as pa
+        import pyarrow.ipc as ipc
+        frame = pd.concat([b.frame.assign(imei=b.imei, date=b.date) for b in batches], ignore_index=True)
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        if self._writer is not None and not table.schema.equals(self._schema):
+            try:
+                table = table.cast(self._schema)
+            except (pa.ArrowInvalid, ValueError):
+                self._close_writer() # Columns changed: continue in a new part
+        before = self._file.tell() if self._file else 0
+        if self._writer is None:
+            (self.base_dir / "arrow").mkdir(parents=True, exist_ok=True)
+            self.path = self.base_dir / "arrow" / f"part-{os.getpid()}-{next(self._parts)}.arrows"
+            self._file = open(self.path, "wb")
+            self._writer = ipc.new_stream(self._file, table.schema)
+            self._schema = table.schema
+            before = 0
+        self._writer.write_table(table)
+        self._file.flush()
+        return self._file.tell() - before
+
+    def _close_writer(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._file.close()
+            self._writer = self._file = None
+
+    def close(self):
+        written = self.flush()
+        self._close_writer()
+        return written
+
+class StreamSink(Sink):
+    """
+    NMEA lines to a tracking server: tcp://host:port (one connection, reopened on
+    failure) or udp://host:port (datagrams of up to datagram_bytes). Lines that
+    cannot be delivered are counted in `dropped`, the run goes on.
+    """
+    name = "stream"
+
+    def __init__(self, base_dir, url: str, flush_days: int = 1, flush_rows: int = None, flush_s: float = None,
+                 datagram_bytes: int = 1400, timeout: float = 5.0):
+        super().__init__(base_dir, flush_days, flush_rows, flush_s)
+        parts = urlsplit(url)
+        self.protocol, self.address = parts.scheme, (parts.hostname, parts.port)
+        self.datagram_bytes = datagram_bytes
+        self.timeout = timeout
+        self.dropped = 0
+        self._sock = None
+
+    def _connect(self):
+        if self._sock is None:
+            if self.protocol == "tcp":
+                self._sock = socket.create_connection(self.address, timeout=self.timeout)
+            else:
+                self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        return self._sock
+
+    def _write_batches(self, batches):
+        lines = [line + "\n" for b in batches for line in format_nmea_lines(b.frame, b.imei)]
+        payload = "".join(lines).encode()
+        try:
+            sock = self._connect()
+            if self.protocol == "tcp":
+                sock.sendall(payload)
+            else:
+                chunk = []
+                size = 0
+                for line in lines:
+                    if chunk and size + len(line) > self.datagram_bytes:
+                        sock.sendto("".join(chunk).encode(), self.address)
+                        chunk, size = [], 0
+                    chunk.append(line)
+                    size += len(line)
+                if chunk:
+                    sock.sendto("".join(chunk).encode(), self.address)
+            return len(payload)
+        except OSError as e:
+            if not self.dropped:
+                logger.warning(f"⚠️ {self.protocol}://{self.address[0]}:{self.address[1]} unavailable ({e}); dropping lines")
+            self.dropped += len(lines)
+            self._close_socket()
+            return 0
+
+    def _close_socket(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def close(self):
+        written = self.flush()
+        self._close_socket()
+        return written
+
+class ArchiveSink(Sink):
+    """
+    Tracker text as compressed vehicle-month archives (--sinks "parquet,archive?codec=gzip").
+    Buffers a month of vehicle-days by default, so each archive's index is rewritten once per flush.
+    """
+    name = "archive"
+
+    def __init__(self, base_dir, codec: str = "zstd", level: int = None, flush_days: int = 31,
+                 flush_rows: int = None, flush_s: float = None):
+        super().__init__(base_dir, flush_days, flush_rows, flush_s)
+        self.codec = resolve_codec(codec)
+        self.level = level
+
+    def _write_batches(self, batches):
+        by_archive = {}
+        for b in batches:
+            path = archive_path(self.base_dir / "tracker", b.vehicle_name, b.date, self.codec)
+            by_archive.setdefault(path, {})[b.date] = [line + "\n" for line in format_nmea_lines(b.frame, b.imei)]
+        return sum(append_days(path, days, self.codec, self.level) for path, days in by_archive.items())
+
+SINKS = {cls.name: cls for cls in (ParquetSink, NmeaTextSink, ArchiveSink, CsvSink, GeoJsonSink, ArrowIpcSink)}
+STREAM_SCHEMES = ("tcp", "udp")
+
+def _option(value: str):
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return None if value.lower() in ("", "none") else value
+
+def build_sinks(spec: str, base_dir) -> List[Sink]:
+    """Sinks from "parquet,nmea,csv?flush_days=20,arrow?flush_rows=100000,udp://127.0.0.1:5005"."""
+    sinks = []
+    for item in filter(None, (s.strip() for s in spec.split(","))):
+        target, _, query = item.partition("?")
+        options = {k: _option(v) for k, v in parse_qsl(query, keep_blank_values=True)}
+        scheme = target.split("://")[0] if "://" in target else None
+        if scheme in STREAM_SCHEMES:
+            sinks.append(StreamSink(base_dir, target, **options))
+        elif target in SINKS:
+            sinks.append(SINKS[target](base_dir, **options))
+        else:
+            raise ValueError(f"Unknown sink {target!r} (expected {', '.join(SINKS)} or tcp://host:port / udp://host:port)")
+    return sinks
+
+def default_sinks(base_dir, enable_legacy_logs: bool = True) -> List[Sink]:
+    return [ParquetSink(base_dir)] + ([NmeaTextSink(base_dir)] if enable_legacy_logs else [])
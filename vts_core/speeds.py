@@ -0,0 +1,68 @@
+import re
+import numpy as np
+from typing import Dict, List
+
+# Free-flow speeds by OSM road class (`highway` property of roads.geojson), in km/h.
+# Urban values: what a loaded municipal truck manages on an empty road, not the
+# posted limit. A numeric `maxspeed` tag overrides the class value.
+FREE_FLOW_KMH = {
+    "motorway": 60.0, "trunk": 45.0, "primary": 40.0, "secondary": 35.0, "tertiary": 30.0,
+    "motorway_link": 40.0, "trunk_link": 35.0, "primary_link": 30.0, "secondary_link": 25.0, "tertiary_link": 25.0,
+    "unclassified": 25.0, "residential": 20.0, "road": 20.0,
+    "service": 15.0, "track": 12.0, "living_street": 10.0,
+    "footway": 6.0, "path": 6.0, "pedestrian": 6.0, "cycleway": 6.0, "steps": 3.0,
+}
+DEFAULT_KMH = 20.0
+KMH_PER_KNOT = 1.852
+
+# Road class groups sharing one congestion curve (vts_core.congestion)
+ROAD_GROUPS = ("arterial", "collector", "local")
+_GROUP_OF = {
+    "motorway": 0, "trunk": 0, "primary": 0, "motorway_link": 0, "trunk_link": 0, "primary_link": 0,
+    "secondary": 1, "tertiary": 1, "secondary_link": 1, "tertiary_link": 1, "unclassified": 1,
+}
+LOCAL = 2
+
+_NUMBER = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(mph)?", re.IGNORECASE)
+
+def parse_maxspeed(value) -> float:
+    """km/h of an OSM maxspeed tag ("40", "30 mph"); NaN for zone codes like "IN:urban" or missing tags."""
+    if value is None:
+        return np.nan
+    m = _NUMBER.match(str(value))
+    if not m:
+        return np.nan
+    kmh = float(m.group(1))
+    return kmh * 1.609344 if m.group(2) else kmh
+
+def free_flow_kmh(properties: List[Dict]) -> np.ndarray:
+    """One free-flow speed (km/h) per road, in the order of `properties` (RoadArrays.properties)."""
+    by_class = np.fromiter((FREE_FLOW_KMH.get((p.get("highway") or "").split(";")[0], DEFAULT_KMH) for p in properties),
+                           dtype=np.float64, count=len(properties))
+    posted = np.fromiter((parse_maxspeed(p.get("maxspeed")) for p in properties), dtype=np.float64, count=len(properties))
+    return np.where(np.isfinite(posted) & (posted > 0), posted, by_class)
+
+def road_groups(properties: List[Dict]) -> np.ndarray:
+    """Index into ROAD_GROUPS per road (anything below a collector is local)."""
+    return np.fromiter((_GROUP_OF.get((p.get("highway") or "").split(";")[0], LOCAL) for p in properties),
+                       dtype=np.int8, count=len(properties))
+
+def travel_seconds(length_m, kmh):
+    return np.asarray(length_m) / (np.asarray(kmh) / 3.6)
+
+class TravelTimeNetwork:
+    """
+    A network view whose searches minimise free-flow travel time (edge attribute
+    'time', seconds) instead of length. Planners read the attribute through
+    `weight_attr`; everything else is delegated.
+    """
+    weight_attr = "time"
+
+    def __init__(self, network):
+        self.network = network
+
+    def shortest_path_nodes(self, start_node, end_node, weight='time', attr='time'):
+        return self.network.shortest_path_nodes(start_node, end_node, weight=weight, attr=attr)
+
+    def __getattr__(self, name):
+        return getattr(self.network, name)
@@ -1,15 +1,24 @@
 import sqlite3
 import pandas as pd
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from shapely.geometry import LineString
 import json
 import datetime
 import os
 
-from vts_core.utils import decimal_to_nmea, get_hemisphere
+from vts_core.utils import decimal_to_nmea, get_hemisphere, encode_polyline, decode_polyline
+from vts_core.trajectory import Trajectory
+from vts_core.sinks import Sink, make_batch, default_sinks, telemetry_path, tracker_path
+
+PLAN_COLUMNS = [
+    "vehicle_imei", "date", "route_id", "start_time", "end_time",
+    "distance_km", "site_locations", "stops", "path_polyline", "speed_profile"
+]
 
 class SimulationStore:
-    def __init__(self, base_dir: str = "data", enable_legacy_logs: bool = True):
+    def __init__(self, base_dir: str = "data", enable_legacy_logs: bool = True, plan_batch_size: int = 50,
+                 sinks: List[Sink] = None):
         self.base_dir = Path(base_dir)
         self.enable_legacy_logs = enable_legacy_logs
         self.base_dir.mkdir(parents=True, exist_ok=True)
@@ -18,6 +27,10 @@ class SimulationStore:
         self.db_path = self.base_dir / "simulation_metadata.db"
         self._init_db()
         
+        # Mission plans are buffered and written with one transaction per batch
+        self.plan_batch_size = plan_batch_size
+        self._pending_plans: List[tuple] = []
+        
         # Main Telemetry storage (Parquet)
         self.telemetry_dir = self.base_dir / "telemetry"
         self.telemetry_dir.mkdir(exist_ok=True)
@@ -25,11 +38,25 @@ class SimulationStore:
         # Legacy/Custom Text Log storage
         self.legacy_dir = self.base_dir / "output" / "tracker"
         self.legacy_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Continuous trajectories (optional, created on first write)
+        self.trajectory_dir = self.base_dir / "trajectories"
+
+        # Bytes of telemetry, tracker logs and trajectories written through this store
+        self.bytes_written = 0
+
+        # Output formats of write_telemetry (vts_core.sinks); default Parquet + tracker text
+        self.sinks = sinks if sinks is not None else default_sinks(self.base_dir, enable_legacy_logs)
+
+    def _connect(self):
+        # Batch workers share the DB file; wait for locks instead of failing
+        return sqlite3.connect(self.db_path, timeout=30)
 
     def _init_db(self):
         """Creates metadata tables if they don't exist."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS vehicles (
                 imei TEXT PRIMARY KEY,
@@ -37,48 +64,166 @@ class SimulationStore:
                 zone_id TEXT
             )
         """)
+        # One planned mission per vehicle-day (route, path, sites, stops, shift hours)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS daily_plans (
+                vehicle_imei TEXT NOT NULL,
+                date TEXT NOT NULL,
+                route_id TEXT,
+                start_time TEXT,
+                end_time TEXT,
+                distance_km REAL,
+                site_locations TEXT,
+                stops TEXT,
+                path_polyline TEXT,
+                speed_profile TEXT,
+                PRIMARY KEY (vehicle_imei, date)
+            )
+        """)
+        # Databases created before free-flow speed profiles were stored
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(daily_plans)")}
+        if "speed_profile" not in columns:
+            cursor.execute("ALTER TABLE daily_plans ADD COLUMN speed_profile TEXT")
+        conn.commit()
+        conn.close()
+
+    # --- Vehicles ---
+    def register_vehicle(self, vehicle_data: Dict):
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO vehicles (imei, config_json, zone_id) VALUES (?, ?, ?)",
+            (str(vehicle_data["imei"]), json.dumps(vehicle_data, default=str), vehicle_data.get("zone_id"))
+        )
+        conn.commit()
+        conn.close()
+
+    def get_vehicle_count(self) -> int:
+        conn = self._connect()
+        count = conn.execute("SELECT COUNT(*) FROM vehicles").fetchone()[0]
+        conn.close()
+        return count
+
+    # --- Daily Plans ---
+    @staticmethod
+    def _plan_row(date: str, vehicle_imei: str, route_id: Optional[str] = None,
+                  start_time: Optional[str] = None, end_time: Optional[str] = None,
+                  distance_km: Optional[float] = None, site_locations: Optional[List[float]] = None,
+                  stops: Optional[List[Dict]] = None, geometry: Optional[LineString] = None,
+                  speed_profile: Optional[List] = None) -> tuple:
+        return (
+            str(vehicle_imei), date, route_id, start_time, end_time, distance_km,
+            json.dumps(site_locations) if site_locations is not None else None,
+            json.dumps(stops) if stops is not None else None,
+            encode_polyline(geometry.coords) if geometry is not None else None,
+            json.dumps(speed_profile) if speed_profile is not None else None
+        )
+
+    def save_daily_plan(self, date: str, vehicle_imei: str, **plan):
+        """Writes one plan immediately (replaces any existing plan for that vehicle-day)."""
+        self.save_daily_plans([self._plan_row(date, vehicle_imei, **plan)])
+
+    def save_daily_plans(self, rows: List[tuple], replace: bool = True):
+        """Writes plan rows in one transaction; with replace=False, vehicle-days that already have a plan keep it."""
+        if not rows: return
+        placeholders = ", ".join("?" * len(PLAN_COLUMNS))
+        conn = self._connect()
+        conn.executemany(
+            f"INSERT OR {'REPLACE' if replace else 'IGNORE'} INTO daily_plans ({', '.join(PLAN_COLUMNS)}) VALUES ({placeholders})",
+            rows
+        )
         conn.commit()
         conn.close()
 
+    def buffer_daily_plan(self, date: str, vehicle_imei: str, **plan):
+        """Queues a plan; the queue is written as one batch when full or on flush_daily_plans()."""
+        self._pending_plans.append(self._plan_row(date, vehicle_imei, **plan))
+        if len(self._pending_plans) >= self.plan_batch_size:
+            self.flush_daily_plans()
+
+    def flush_daily_plans(self):
+        rows, self._pending_plans = self._pending_plans, []
+        self.save_daily_plans(rows)
+
+    def get_daily_plan(self, vehicle_imei: str, date: str) -> Optional[Dict]:
+        """Returns the stored plan with its path decoded to a LineString, or None."""
+        conn = self._connect()
+        row = conn.execute(
+            f"SELECT {', '.join(PLAN_COLUMNS)} FROM daily_plans WHERE vehicle_imei=? AND date=?",
+            (str(vehicle_imei), date)
+        ).fetchone()
+        conn.close()
+        if row is None:
+            return None
+        
+        plan = dict(zip(PLAN_COLUMNS, row))
+        plan["site_locations"] = json.loads(plan["site_locations"]) if plan["site_locations"] else []
+        plan["stops"] = json.loads(plan["stops"]) if plan["stops"] else []
+        plan["speed_profile"] = json.loads(plan["speed_profile"]) if plan["speed_profile"] else None
+        polyline = plan.pop("path_polyline")
+        plan["geometry"] = LineString(decode_polyline(polyline)) if polyline else None
+        return plan
+
+    def list_daily_plans(self, vehicle_imei: str = None, start_date: str = None, end_date: str = None) -> pd.DataFrame:
+        """Audit view of stored plans (without the encoded path)."""
+        query = "SELECT vehicle_imei, date, route_id, start_time, end_time, distance_km, site_locations, stops FROM daily_plans WHERE 1=1"
+        params = []
+        if vehicle_imei:
+            query += " AND vehicle_imei=?"; params.append(str(vehicle_imei))
+        if start_date:
+            query += " AND date>=?"; params.append(start_date)
+        if end_date:
+            query += " AND date<=?"; params.append(end_date)
+        query += " ORDER BY vehicle_imei, date"
+        
+        conn = self._connect()
+        df = pd.read_sql_query(query, conn, params=params)
+        conn.close()
+        return df
+
     def write_telemetry(self, imei: str, date_str: str, records: list, vehicle_name: str):
         """
-        Writes simulation data to:
+        Hands the vehicle-day to every sink; by default:
         1. Parquet (Efficient binary format for maps/analytics)
         2. Text Log (data/tracker/{VehicleName}/{Year}/{Month}/{Date}.txt)
         """
         if not records:
             return
+        batch = make_batch(imei, date_str, records, vehicle_name)
+        for sink in self.sinks:
+            self.bytes_written += sink.write(batch)
+
+    def close(self):
+        """Flushes whatever the sinks still buffer (and plans not yet written)."""
+        self.flush_daily_plans()
+        for sink in self.sinks:
+            self.bytes_written += sink.close()
+
+    def telemetry_path(self, imei: str, date_str: str) -> Path:
+        return telemetry_path(self.base_dir, imei, date_str)
 
-        # --- 1. Setup File Paths ---
+    def tracker_path(self, vehicle_name: str, date_str: str) -> Path:
+        return tracker_path(self.base_dir, vehicle_name, date_str)
+
+    def _trajectory_path(self, imei: str, date_str: str) -> Path:
         year, month, _ = date_str.split("-")
-        
-        # Parquet Path: data/telemetry/year=2023/month=01/
-        parquet_dir = self.telemetry_dir / f"year={year}" / f"month={month}"
-        parquet_dir.mkdir(parents=True, exist_ok=True)
-        parquet_path = parquet_dir / f"{imei}_{date_str}.parquet"
-        
-        # Text Log Path: data/tracker/{Vehicle Name}/{Year}/{Month}/
-        # User Req: "data - Vehicle Name - Year - Month"
-        # base_dir is "data", so we put "tracker" inside.
-        tracker_dir = self.base_dir / "tracker" / vehicle_name / year / month
-        tracker_dir.mkdir(parents=True, exist_ok=True)
-        log_path = tracker_dir / f"{date_str}.txt"
-
-        # --- 2. Write Parquet (Source of Truth) ---
-        df = pd.DataFrame(records)
-        # Ensure timestamp is datetime for parquet efficiency
-        if not df.empty and isinstance(df.iloc[0]['timestamp'], str):
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            
-        df.to_parquet(parquet_path, index=False)
-
-        if self.enable_legacy_logs:
-            # --- 3. Write Custom Text Log ---
-            with open(log_path, "w") as f:
-                for r in records:
-                    line = self._format_log_line(r, imei)
-                    if line:
-                        f.write(line + "\n")
+        return self.trajectory_dir / f"year={year}" / f"month={month}" / f"{imei}_{date_str}.npz"
+
+    def write_trajectory(self, imei: str, date_str: str, trajectory: Trajectory) -> Path:
+        """
+        Persists the compact time->distance trajectory of a vehicle-day:
+        data/trajectories/year=YYYY/month=MM/{imei}_{date}.npz
+        """
+        path = self._trajectory_path(imei, date_str)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        trajectory.save(path)
+        self.bytes_written += path.stat().st_size
+        return path
+
+    def read_trajectory(self, imei: str, date_str: str):
+        path = self._trajectory_path(imei, date_str)
+        if not path.exists():
+            return None
+        return Trajectory.load(path)
 
     def _format_log_line(self, r: Dict, imei: str) -> str:
         """Helper to format a single log line."""
@@ -139,5 +284,6 @@ class SimulationStore:
                     line = self._format_log_line(r, imei)
                     if line:
                         f.write(line + "\n")
+            self.bytes_written += log_path.stat().st_size
         except Exception as e:
             print(f"⚠️ Error converting Parquet for {vehicle_name}/{date_str}: {e}")
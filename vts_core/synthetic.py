@@ -0,0 +1,245 @@
+import json
+import math
+import yaml
+import random
+import hashlib
+from pathlib import Path
+from typing import Dict, List
+from datetime import datetime, timedelta
+
+# Synthetic zone data in the project's formats, for tests and benchmarks that
+# must not depend on the bundled Bangalore zones.
+
+def write_grid_zone(zone_dir, size=6, spacing=0.002, origin=(77.60, 12.90)):
+    """
+    Writes a small synthetic zone (size x size street grid) in the project's
+    formats: roads.geojson, localities.geojson and routes.json.
+    """
+    zone_dir = Path(zone_dir)
+    zone_dir.mkdir(parents=True, exist_ok=True)
+    lon0, lat0 = origin
+    features = []
+    for i in range(size):
+        for j in range(size):
+            x, y = lon0 + i * spacing, lat0 + j * spacing
+            if i + 1 < size:
+                features.append({"type": "Feature", "properties": {"highway": "residential" if j % 3 else "primary"},
+                                 "geometry": {"type": "LineString", "coordinates": [[x, y], [x + spacing / 2, y], [x + spacing, y]]}})
+            if j + 1 < size:
+                features.append({"type": "Feature", "properties": {"highway": "residential"},
+                                 "geometry": {"type": "LineString", "coordinates": [[x, y], [x, y + spacing]]}})
+    (zone_dir / "roads.geojson").write_text(json.dumps({"type": "FeatureCollection", "features": features}))
+
+    localities = []
+    for k, (i, j) in enumerate([(1, 1), (4, 1), (4, 4), (1, 4)], start=1):
+        cx, cy = lon0 + i * spacing, lat0 + j * spacing
+        h = spacing / 4
+        localities.append({"type": "Feature",
+                           "properties": {"locality_id": f"T_LOC_{k:02d}", "name": f"Locality {k}"},
+                           "geometry": {"type": "Polygon", "coordinates": [[[cx - h, cy - h], [cx + h, cy - h], [cx + h, cy + h], [cx - h, cy + h], [cx - h, cy - h]]]}})
+    (zone_dir / "localities.geojson").write_text(json.dumps({"type": "FeatureCollection", "features": localities}))
+
+    routes = [{"route_id": "RT_T_01", "name": "Route 1",
+               "waypoints": [[lon0 + spacing, lat0 + spacing], [lon0 + 4 * spacing, lat0 + 4 * spacing], [lon0 + spacing, lat0 + 4 * spacing]],
+               "stops": ["Locality 1", "Locality 3", "Locality 4"]}]
+    (zone_dir / "routes.json").write_text(json.dumps({"routes": routes}))
+    return zone_dir
+
+def write_vehicle_yaml(path, name, imei, zone_dir, depot, start_date="2022-01-01", end_date="2024-12-31"):
+    """Vehicle config (nested VTS format) for a synthetic zone; depot is (lat, lon)."""
+    zone_dir = Path(zone_dir)
+    data = {
+        "vehicle": {"name": name, "imei": str(imei), "device_id": name, "vehicle_type": "Synthetic",
+                    "max_speed_knots": 25.0, "depot_lat": float(depot[0]), "depot_lon": float(depot[1]), "enabled": True},
+        "zone": {"name": zone_dir.name, "roads_geojson": str(zone_dir / "roads.geojson"),
+                 "localities_file": str(zone_dir / "localities.geojson")},
+        "shift": {"start_time": "09:00", "end_time": "19:00", "sampling_interval_seconds": 900},
+        "simulation_window": {"start_date": start_date, "end_date": end_date},
+    }
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(data, f, sort_keys=False)
+    return path
+
+def write_external_log(path, vehicle_names, points, start_date, days, per_day=3, seed=0):
+    """
+    Manual check-in CSV in the consolidated-report layout read by ExternalLogProvider:
+    per_day entries per vehicle and day at random (lat, lon) points.
+    """
+    rng = random.Random(seed)
+    day0 = datetime.strptime(start_date, "%Y-%m-%d")
+    lines = ["Vehicle Description,Device-ID,Date,Time,OdometerKm,Lat/Lon,Address"]
+    for name in vehicle_names:
+        for d in range(days):
+            date = (day0 + timedelta(days=d)).strftime("%d/%m/%Y")
+            for _ in range(per_day):
+                lat, lon = rng.choice(points)
+                t = f"{rng.randint(9, 18):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}"
+                lines.append(f"{name},{name},{date},{t},{rng.randint(1000, 90000)},{lat:.4f}/{lon:.4f},Synthetic")
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+def telemetry_records(n, date="2023-01-02", seed=0, start_hour=7, interval_s=37, device_id="V01",
+                      bbox=(-13.5, -78.0, 13.5, 78.0)):
+    """
+    n telemetry records in the agent's layout, interval_s apart from start_hour, at random
+    points of bbox (lat_min, lon_min, lat_max, lon_max; the default spans all hemispheres).
+    """
+    rng = random.Random(seed)
+    t0 = datetime.strptime(date, "%Y-%m-%d") + timedelta(hours=start_hour)
+    lat_min, lon_min, lat_max, lon_max = bbox
+    return [{"timestamp": t0 + timedelta(seconds=interval_s * i), "lat": rng.uniform(lat_min, lat_max),
+             "lon": rng.uniform(lon_min, lon_max), "speed": rng.uniform(0, 30), "heading": rng.uniform(0, 360),
+             "device_id": device_id} for i in range(n)]
+
+# --- Parameterised generator (tools/generate_synthetic.py) ---
+# Layouts are built in spacing units (one unit ~ one block) and scaled to degrees
+# around `origin`. Every layout is connected; classes follow a simple hierarchy
+# (primary arterials, secondary collectors, residential streets) so travel time
+# and congestion modes see realistic mixes.
+
+TOPOLOGIES = ("grid", "radial", "organic")
+SPACING_DEG = 0.0015 # ~165 m blocks
+ARTERIAL_EVERY = 8
+COLLECTOR_EVERY = 4
+
+def _line_class(k: int) -> str:
+    if k % ARTERIAL_EVERY == 0:
+        return "primary"
+    return "secondary" if k % COLLECTOR_EVERY == 0 else "residential"
+
+def _grid_layout(nodes, rng):
+    side = max(2, round(math.sqrt(nodes)))
+    points = [(i, j) for i in range(side) for j in range(side)]
+    edges = []
+    for i in range(side):
+        for j in range(side):
+            a = i * side + j
+            if i + 1 < side:
+                edges.append((a, a + side, _line_class(j), None))
+            if j + 1 < side:
+                edges.append((a, a + 1, _line_class(i), None))
+    return points, edges
+
+def _radial_layout(nodes, rng, spokes=8):
+    """Concentric rings (about one node per unit of arc) with links to the next ring in; `spokes` primary radials."""
+    points, edges, rings = [(0.0, 0.0)], [], [[0]]
+    r = 0
+    while len(points) < nodes:
+        r += 1
+        m = max(spokes, round(2 * math.pi * r))
+        ring = list(range(len(points), len(points) + m))
+        points += [(r * math.cos(2 * math.pi * j / m), r * math.sin(2 * math.pi * j / m)) for j in range(m)]
+        inner = rings[-1]
+        radial = {round(k * m / spokes) % m for k in range(spokes)}
+        for j, a in enumerate(ring):
+            b = ring[(j + 1) % m]
+            mid_angle = 2 * math.pi * (j + 0.5) / m
+            edges.append((a, b, _line_class(r), (r * math.cos(mid_angle), r * math.sin(mid_angle))))
+            # Link inwards to the closest-angle node of the previous ring
+            edges.append((a, inner[round(j * len(inner) / m) % len(inner)], "primary" if j in radial else "residential", None))
+        rings.append(ring)
+    return points, edges
+
+def _organic_layout(nodes, rng, jitter=0.35, extra=0.35):
+    """Jittered grid, random spanning tree plus a share of the remaining links, bent streets."""
+    side = max(2, round(math.sqrt(nodes)))
+    points = [(i + rng.uniform(-jitter, jitter), j + rng.uniform(-jitter, jitter)) for i in range(side) for j in range(side)]
+    candidates = []
+    for i in range(side):
+        for j in range(side):
+            a = i * side + j
+            if i + 1 < side:
+                candidates.append((a, a + side, _line_class(j) if j % COLLECTOR_EVERY == 0 else "residential"))
+            if j + 1 < side:
+                candidates.append((a, a + 1, _line_class(i) if i % COLLECTOR_EVERY == 0 else "residential"))
+            if i + 1 < side and j + 1 < side:
+                candidates.append((a, a + side + 1, "residential") if rng.random() < 0.5 else (a + 1, a + side, "residential"))
+    rng.shuffle(candidates)
+
+    parent = list(range(len(points)))
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    edges = []
+    for a, b, highway in candidates:
+        ra, rb = find(a), find(b)
+        # Arterials / collectors are kept whole; streets only for connectivity or by chance
+        if ra != rb or highway != "residential" or rng.random() < extra:
+            parent[ra] = rb
+            (ax, ay), (bx, by) = points[a], points[b]
+            bend = rng.uniform(-0.15, 0.15)
+            mid = ((ax + bx) / 2 - (by - ay) * bend, (ay + by) / 2 + (bx - ax) * bend)
+            edges.append((a, b, highway, mid))
+    return points, edges
+
+LAYOUTS = {"grid": _grid_layout, "radial": _radial_layout, "organic": _organic_layout}
+
+def generate_zone(zone_dir, nodes=1000, topology="grid", localities=20, routes=None, seed=0,
+                  origin=(77.50, 12.90), spacing=SPACING_DEG) -> Dict:
+    """
+    Writes roads.geojson, localities.geojson and routes.json for a synthetic zone of
+    about `nodes` intersections. Returns a summary with the node points as (lat, lon)
+    (for depots, see generate_fleet).
+    """
+    if topology not in LAYOUTS:
+        raise ValueError(f"Unknown topology {topology!r} (expected one of {', '.join(TOPOLOGIES)})")
+    zone_dir = Path(zone_dir)
+    zone_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    units, edges = LAYOUTS[topology](nodes, rng)
+    lon0, lat0 = origin
+    lonlat = lambda p: [round(lon0 + p[0] * spacing, 6), round(lat0 + p[1] * spacing, 6)]
+    points = [lonlat(p) for p in units]
+
+    features = []
+    for a, b, highway, mid in edges:
+        coords = [points[a], lonlat(mid), points[b]] if mid is not None else [points[a], points[b]]
+        features.append({"type": "Feature", "properties": {"highway": highway},
+                         "geometry": {"type": "LineString", "coordinates": coords}})
+    with open(zone_dir / "roads.geojson", "w") as f:
+        json.dump({"type": "FeatureCollection", "features": features}, f)
+
+    prefix = zone_dir.name.split("_")[0].upper()
+    h = spacing * 0.3
+    sites = rng.sample(range(len(points)), min(localities, len(points)))
+    locs = []
+    for k, n in enumerate(sites, start=1):
+        cx, cy = points[n]
+        locs.append({"type": "Feature", "properties": {"locality_id": f"{prefix}_LOC_{k:04d}", "name": f"{prefix} Locality {k}"},
+                     "geometry": {"type": "Polygon", "coordinates": [[[cx - h, cy - h], [cx + h, cy - h], [cx + h, cy + h], [cx - h, cy + h], [cx - h, cy - h]]]}})
+    with open(zone_dir / "localities.geojson", "w") as f:
+        json.dump({"type": "FeatureCollection", "features": locs}, f)
+
+    route_list = []
+    for k in range(1, (max(1, len(sites) // 4) if routes is None else routes) + 1):
+        if len(sites) < 2:
+            break
+        stops = rng.sample(range(len(sites)), min(rng.randint(3, 6), len(sites)))
+        route_list.append({"route_id": f"RT_{prefix}_{k:03d}", "name": f"{prefix} Route {k}",
+                           "waypoints": [points[sites[s]] for s in stops],
+                           "stops": [locs[s]["properties"]["name"] for s in stops]})
+    with open(zone_dir / "routes.json", "w") as f:
+        json.dump({"routes": route_list}, f)
+
+    return {"zone": zone_dir.name, "topology": topology, "nodes": len(points), "roads": len(features),
+            "localities": len(locs), "routes": len(route_list), "points": [(lat, lon) for lon, lat in points]}
+
+def generate_fleet(vehicles_dir, zone_dir, points, vehicles, depots=None, seed=0,
+                   start_date="2022-01-01", end_date="2024-12-31") -> List[Path]:
+    """`vehicles` YAMLs for the zone, sharing `depots` depot nodes (default: one per 25 vehicles) picked from points (lat, lon)."""
+    rng = random.Random(seed)
+    zone_dir = Path(zone_dir)
+    prefix = zone_dir.name.split("_")[0].upper()
+    depot_points = rng.sample(list(points), min(depots or max(1, vehicles // 25), len(points)))
+    # IMEIs are 15 digits and unique per zone prefix (stable across runs with the same arguments)
+    base = 860000000000000 + int(hashlib.sha256(prefix.encode('utf-8')).hexdigest(), 16) % 10 ** 8 * 10 ** 5
+    return [write_vehicle_yaml(Path(vehicles_dir) / f"{prefix}_V{i:05d}.yaml", f"{prefix}_V{i:05d}", base + i, zone_dir,
+                               depot_points[i % len(depot_points)], start_date, end_date)
+            for i in range(1, vehicles + 1)]
@@ -0,0 +1,143 @@
+import json
+import random
+import numpy as np
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional
+
+from vts_core.utils import calculate_bearing
+
+# Same flat-earth scale the agent uses for path progress
+METERS_PER_DEGREE = 111139.0
+KNOTS_PER_MPS = 1.0 / 0.514444
+
+@dataclass
+class Trajectory:
+    """
+    Compact continuous record of one simulated vehicle-day.
+
+    Position is a piecewise-linear function of time: `knots_t` (seconds since
+    midnight) -> `knots_d` (meters along `path`). Forced external checkpoints are
+    kept separately since they are off-path snaps, not motion.
+    """
+    imei: str
+    date: str
+    device_id: str
+    vehicle_name: str
+    shift_start_s: int
+    shift_end_s: int
+    path: np.ndarray                      # (N, 2) lon/lat of the mission path
+    knots_t: np.ndarray                   # (K,) int32 seconds since midnight
+    knots_d: np.ndarray                   # (K,) float32 meters along path
+    checkpoints: np.ndarray = field(default_factory=lambda: np.zeros((0, 3)))  # (t, lat, lon)
+
+    def __post_init__(self):
+        self.path = np.asarray(self.path, dtype=np.float64)
+        self.knots_t = np.asarray(self.knots_t, dtype=np.int32)
+        self.knots_d = np.asarray(self.knots_d, dtype=np.float32)
+        self.checkpoints = np.asarray(self.checkpoints, dtype=np.float64).reshape(-1, 3)
+
+        # Cumulative vertex distance in meters (path progress units)
+        seg = np.hypot(np.diff(self.path[:, 0]), np.diff(self.path[:, 1])) * METERS_PER_DEGREE
+        self._vertex_d = np.concatenate([[0.0], np.cumsum(seg)])
+
+    # --- Geometry helpers ---
+    def _position(self, d: np.ndarray):
+        """Lon/lat arrays at path distances `d` (meters)."""
+        d = np.clip(d, 0.0, self._vertex_d[-1])
+        lon = np.interp(d, self._vertex_d, self.path[:, 0])
+        lat = np.interp(d, self._vertex_d, self.path[:, 1])
+        return lon, lat
+
+    def distance_at(self, t: np.ndarray) -> np.ndarray:
+        return np.interp(t, self.knots_t, self.knots_d.astype(np.float64))
+
+    def speed_at(self, t: np.ndarray) -> np.ndarray:
+        """Knots, taken as the slope of the knot segment containing `t`."""
+        t = np.asarray(t, dtype=np.float64)
+        idx = np.clip(np.searchsorted(self.knots_t, t, side='right') - 1, 0, len(self.knots_t) - 2)
+        dt = (self.knots_t[idx + 1] - self.knots_t[idx]).astype(np.float64)
+        dd = (self.knots_d[idx + 1] - self.knots_d[idx]).astype(np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mps = np.where(dt > 0, dd / dt, 0.0)
+        return np.maximum(mps, 0.0) * KNOTS_PER_MPS
+
+    # --- Resampling ---
+    def resample(self, interval_seconds: int, jitter_seconds: int = 0, rng: Optional[random.Random] = None) -> List[dict]:
+        """
+        Produces telemetry records (same shape the agent emits) at a new sampling
+        interval, without re-running planning or physics.
+        """
+        rng = rng or random.Random(f"{self.imei}_{self.date}_{interval_seconds}")
+        times = []
+        t = self.shift_start_s
+        while t < self.shift_end_s:
+            if jitter_seconds:
+                times.append(min(max(t + rng.randint(-jitter_seconds, jitter_seconds), self.shift_start_s), self.shift_end_s - 1))
+            else:
+                times.append(t)
+            t += interval_seconds
+
+        times = np.array(sorted(set(times)), dtype=np.int64)
+        d = self.distance_at(times)
+        lon, lat = self._position(d)
+        lon_ahead, lat_ahead = self._position(d + 5.0)
+        speed = self.speed_at(times)
+
+        day_start = datetime.strptime(self.date, "%Y-%m-%d")
+        records = []
+        for i, ts in enumerate(times):
+            records.append({
+                "timestamp": day_start + timedelta(seconds=int(ts)),
+                "lat": float(lat[i]),
+                "lon": float(lon[i]),
+                "speed": float(speed[i]),
+                "heading": calculate_bearing(lat[i], lon[i], lat_ahead[i], lon_ahead[i]),
+                "device_id": self.device_id
+            })
+
+        # Forced checkpoints bypass the shift filter, exactly like the agent
+        for ev_t, ev_lat, ev_lon in self.checkpoints:
+            d_ev = self.distance_at(np.array([ev_t]))
+            lon_a, lat_a = self._position(d_ev)
+            lon_b, lat_b = self._position(d_ev + 5.0)
+            records.append({
+                "timestamp": day_start + timedelta(seconds=int(ev_t)),
+                "lat": float(ev_lat),
+                "lon": float(ev_lon),
+                "speed": 0.0,
+                "heading": calculate_bearing(lat_a[0], lon_a[0], lat_b[0], lon_b[0]),
+                "device_id": self.device_id
+            })
+
+        records.sort(key=lambda r: r['timestamp'])
+        return records
+
+    # --- Persistence ---
+    def save(self, path: Path):
+        meta = {
+            "imei": self.imei, "date": self.date, "device_id": self.device_id,
+            "vehicle_name": self.vehicle_name,
+            "shift_start_s": self.shift_start_s, "shift_end_s": self.shift_end_s
+        }
+        np.savez_compressed(
+            path,
+            meta=np.array(json.dumps(meta)),
+            path=self.path,
+            knots_t=self.knots_t,
+            knots_d=self.knots_d,
+            checkpoints=self.checkpoints
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "Trajectory":
+        with np.load(path) as data:
+            meta = json.loads(str(data['meta']))
+            return cls(
+                path=data['path'],
+                knots_t=data['knots_t'],
+                knots_d=data['knots_d'],
+                checkpoints=data['checkpoints'],
+                **meta
+            )
@@ -45,4 +45,46 @@ def get_hemisphere(val, is_lon=False):
     """Returns the NMEA hemisphere character (N/S/E/W)."""
     if is_lon:
         return 'E' if val >= 0 else 'W'
-    return 'N' if val >= 0 else 'S'
\ No newline at end of file
+    return 'N' if val >= 0 else 'S'
+
+def encode_polyline(coords, precision=7):
+    """
+    Encodes [(lon, lat), ...] with the Google polyline algorithm (lat first).
+    Precision 7 keeps ~1cm, enough to round-trip the OSM road coordinates.
+    """
+    factor = 10 ** precision
+    out = []
+    prev_lat = prev_lon = 0
+    for lon, lat in coords:
+        ilat = int(round(lat * factor))
+        ilon = int(round(lon * factor))
+        for delta in (ilat - prev_lat, ilon - prev_lon):
+            v = ~(delta << 1) if delta < 0 else (delta << 1)
+            while v >= 0x20:
+                out.append(chr((0x20 | (v & 0x1f)) + 63))
+                v >>= 5
+            out.append(chr(v + 63))
+        prev_lat, prev_lon = ilat, ilon
+    return "".join(out)
+
+def decode_polyline(encoded, precision=7):
+    """Inverse of encode_polyline. Returns [(lon, lat), ...]."""
+    factor = 10 ** precision
+    coords = []
+    index = lat = lon = 0
+    length = len(encoded)
+    while index < length:
+        deltas = []
+        for _ in range(2):
+            shift = result = 0
+            while True:
+                b = ord(encoded[index]) - 63
+                index += 1
+                result |= (b & 0x1f) << shift
+                shift += 5
+                if b < 0x20: break
+            deltas.append(~(result >> 1) if result & 1 else (result >> 1))
+        lat += deltas[0]
+        lon += deltas[1]
+        coords.append((lon / factor, lat / factor))
+    return coords
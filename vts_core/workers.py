@@ -0,0 +1,129 @@
+import os
+import queue
+import pickle
+import traceback
+import multiprocessing as mp
+from typing import Callable, Iterable
+
+from vts_core.memory import rss_mb
+
+# A process pool for batch runs that keeps workers inside a memory budget: after
+# every task a worker checks its RSS and retires when above budget_mb; the pool
+# starts a fresh one in its place (maxtasksperchild, but driven by memory).
+# A worker that dies mid-task (e.g. OOM-killed) is replaced as well and its task
+# reported through `lost` instead of hanging the run like multiprocessing.Pool.
+
+def _worker_loop(inbox, results, func, initializer, initargs, budget_mb):
+    if initializer:
+        initializer(*initargs)
+    pid = os.getpid()
+    while True:
+        item = inbox.get()
+        if item is None:
+            break
+        index, task = item
+        try:
+            value = (True, func(task))
+        except Exception as e:
+            try:
+                pickle.dumps(e)
+            except Exception:
+                e = RuntimeError(f"{type(e).__name__}: {e}") # Not picklable: only its text crosses
+            value = (False, (e, traceback.format_exc()))
+        rss = rss_mb()
+        retire = bool(budget_mb and rss and rss > budget_mb)
+        results.put((pid, index, value, rss, retire))
+        if retire:
+            break
+
+class RemoteTraceback(Exception):
+    """The worker-side traceback, chained as the cause of an exception re-raised in the parent."""
+    def __str__(self):
+        return self.args[0]
+
+class RecyclingPool:
+    def __init__(self, processes: int, initializer: Callable = None, initargs: tuple = (), budget_mb: float = None):
+        self.processes = processes
+        self.initializer = initializer
+        self.initargs = initargs
+        self.budget_mb = budget_mb
+        self.recycled = 0 # Workers retired over budget
+        self.lost = 0 # Workers that died mid-task
+        self.peak_rss_mb = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False # Workers are shut down when imap_unordered's generator finishes or is closed
+
+    def imap_unordered(self, func: Callable, tasks: Iterable, lost: Callable = None):
+        """
+        Yields func(task) in completion order. A task whose worker died yields
+        lost(task, reason) (or raises when lost is None); exceptions raised by func
+        are re-raised here with the worker's traceback as their cause, as Pool does.
+        """
+        tasks = list(tasks)
+        pending = list(enumerate(tasks))[::-1] # Popped from the end, in order
+        result_q = mp.Queue()
+        workers, running = {}, {} # pid -> (Process, inbox), pid -> task index
+
+        # The parent hands out one task at a time, so it always knows what a dead worker held
+        def assign(pid):
+            if pending:
+                index, task = pending.pop()
+                workers[pid][1].put((index, task))
+                running[pid] = index
+
+        def spawn():
+            inbox = mp.Queue()
+            p = mp.Process(target=_worker_loop, args=(inbox, result_q, func, self.initializer, self.initargs, self.budget_mb), daemon=True)
+            p.start()
+            workers[p.pid] = (p, inbox)
+            assign(p.pid)
+
+        for _ in range(min(self.processes, len(tasks))):
+            spawn()
+        remaining = len(tasks)
+        try:
+            while remaining:
+                try:
+                    pid, index, (ok, value), rss, retire = result_q.get(timeout=1.0)
+                except queue.Empty:
+                    # Workers that died without reporting (killed, segfault) lose their task
+                    for pid, (p, _) in list(workers.items()):
+                        if p.exitcode is None:
+                            continue
+                        del workers[pid]
+                        index = running.pop(pid, None)
+                        if pending:
+                            spawn()
+                        if index is not None:
+                            self.lost += 1
+                            remaining -= 1
+                            reason = f"worker {pid} died (exit code {p.exitcode})"
+                            if lost is None:
+                                raise RuntimeError(f"{reason} on task {index}")
+                            yield lost(tasks[index], reason)
+                    continue
+                running.pop(pid, None)
+                remaining -= 1
+                self.peak_rss_mb = max(self.peak_rss_mb, rss or 0.0)
+                if retire:
+                    workers.pop(pid)[0].join()
+                    self.recycled += 1
+                    if pending:
+                        spawn()
+                else:
+                    assign(pid)
+                if not ok:
+                    error, tb = value
+                    raise error from RemoteTraceback(tb)
+                yield value
+        finally:
+            for _, inbox in workers.values():
+                inbox.put(None)
+            for p, _ in workers.values():
+                p.join(timeout=5)
+                if p.is_alive():
+                    p.terminate()
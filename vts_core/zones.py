@@ -0,0 +1,128 @@
+import os
+import json
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from vts_core.graph import RoadNetwork
+from vts_core.geodata import load_localities, LocalityArrays
+from vts_core.routes import RouteLibrary, load_route_library, load_predefined_routes
+from vts_core.city import load_city_graph
+from vts_core.congestion import load_congestion_config, CONGESTION_FILENAME
+from vts_core.profiling import stage
+
+DEFAULT_ZONE_CACHE_MB = 512
+
+# Rough per-object overheads of the networkx graph (dict-of-dicts), measured on SE_Zone
+_GRAPH_BYTES_PER_EDGE = 700
+_GRAPH_BYTES_PER_NODE = 200
+
+def _file_stamp(path: Optional[str]):
+    """mtime of a source file (None if missing), used to spot rewritten artifacts."""
+    try:
+        return os.path.getmtime(path) if path else None
+    except OSError:
+        return None
+
+def estimate_nbytes(artifact) -> int:
+    if artifact is None:
+        return 0
+    if isinstance(artifact, RoadNetwork):
+        # CityNetwork included (its lazily built partition graphs are not counted)
+        return (artifact.coords.nbytes + artifact.geom_offsets.nbytes +
+                _GRAPH_BYTES_PER_EDGE * artifact.graph.number_of_edges() +
+                _GRAPH_BYTES_PER_NODE * len(artifact.node_list))
+    if isinstance(artifact, LocalityArrays):
+        return artifact.lon.nbytes + artifact.lat.nbytes + 100 * len(artifact)
+    if isinstance(artifact, RouteLibrary):
+        # Parsed JSON is several times its compact text size
+        return 4 * len(json.dumps(artifact.data, separators=(",", ":")))
+    return 4 * len(json.dumps(artifact))
+
+class ZoneRegistry:
+    """
+    Process-wide, lazily filled cache of zone artifacts (road graph, localities,
+    route library, routes.json, congestion curves, merged city graph), keyed by directory.
+
+    Whole zones are kept in least-recently-used order; once the estimated size
+    of all cached zones exceeds `max_bytes`, the oldest zones are dropped (the
+    zone just used is never evicted). Artifacts whose source file changed on
+    disk are rebuilt.
+    """
+    def __init__(self, max_bytes: int = DEFAULT_ZONE_CACHE_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._zones: "OrderedDict[str, Dict]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _get(self, zone_dir: str, key: tuple, source: str, loader):
+        zone_dir = os.path.normpath(zone_dir)
+        zone = self._zones.setdefault(zone_dir, {})
+        self._zones.move_to_end(zone_dir)
+
+        stamp = _file_stamp(source)
+        entry = zone.get(key)
+        if entry and entry["stamp"] == stamp:
+            self.hits += 1
+            return entry["value"]
+
+        self.misses += 1
+        with stage("graph_load"):
+            value = loader()
+        zone[key] = {"value": value, "stamp": stamp, "nbytes": estimate_nbytes(value)}
+        self._evict(keep=zone_dir)
+        return value
+
+    def _evict(self, keep: str):
+        while self.nbytes > self.max_bytes and len(self._zones) > 1:
+            oldest = next(iter(self._zones))
+            if oldest == keep: break
+            del self._zones[oldest]
+            self.evictions += 1
+
+    @property
+    def nbytes(self) -> int:
+        return sum(e["nbytes"] for zone in self._zones.values() for e in zone.values())
+
+    def network(self, roads_path: str, localities_path: str = None) -> RoadNetwork:
+        return self._get(os.path.dirname(roads_path), ("network", roads_path, localities_path), roads_path,
+                         lambda: RoadNetwork(roads_path, localities_path=localities_path))
+
+    def city_network(self, path: str):
+        """Merged city graph (None if the file is missing); cached like a zone of its own."""
+        return self._get(os.path.dirname(path), ("city", path), path, lambda: load_city_graph(path))
+
+    def localities(self, zone_dir: str) -> LocalityArrays:
+        path = os.path.join(zone_dir, "localities.geojson")
+        return self._get(zone_dir, ("localities",), path, lambda: load_localities(path))
+
+    def route_library(self, zone_dir: str) -> Optional[RouteLibrary]:
+        return self._get(zone_dir, ("library",), os.path.join(zone_dir, "route_library.json"),
+                         lambda: load_route_library(zone_dir))
+
+    def predefined_routes(self, zone_dir: str) -> List[Dict]:
+        return self._get(zone_dir, ("routes",), os.path.join(zone_dir, "routes.json"),
+                         lambda: load_predefined_routes(zone_dir))
+
+    def congestion(self, zone_dir: str) -> Dict:
+        """Time-of-day congestion curves (defaults unless the zone has a congestion.json)."""
+        return self._get(zone_dir, ("congestion",), os.path.join(zone_dir, CONGESTION_FILENAME),
+                         lambda: load_congestion_config(zone_dir))
+
+    def stats(self) -> Dict:
+        return {"zones": len(self._zones), "nbytes": self.nbytes,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+    def clear(self):
+        self._zones.clear()
+
+_REGISTRY = ZoneRegistry()
+
+def get_zone_registry() -> ZoneRegistry:
+    return _REGISTRY
+
+def configure_zone_registry(max_mb: float) -> ZoneRegistry:
+    """Sets the memory budget of the process-wide registry (e.g. once per worker)."""
+    _REGISTRY.max_bytes = int(max_mb * 1024 * 1024)
+    _REGISTRY._evict(keep=None)
+    return _REGISTRY